@@ -18,6 +18,11 @@ from Bio import Alphabet
 from Bio.Alphabet import IUPAC
 from Bio.Seq import Seq
 from Bio.SubsMat import FreqTable
+try:
+    from Bio.Align.ArrayAlignment import ArrayAlignment as _ArrayAlignment
+except ImportError:
+    #NumPy is missing, so the letters will be counted in Python
+    _ArrayAlignment = None
 
 # Expected random distributions for 20-letter protein, and
 # for 4-letter nucleotide alphabets
@@ -35,9 +40,94 @@ class SummaryInfo(object):
     def __init__(self, alignment):
         """Initialize with the alignment to calculate information on.
            ic_vector attribute. A dictionary. Keys: column numbers. Values:
+
+        The letters in each column of the alignment are counted the first
+        time they are needed, and the counts kept for the other methods, so
+        the alignment should not be changed after this.
         """
         self.alignment = alignment
         self.ic_vector = {}
+        self._column_counts = {}
+        self._pair_counts = None
+
+    def _get_column_counts(self, weighted=False):
+        """Count the letters in each column of the alignment (PRIVATE).
+
+        Returns a list with a dictionary for each column, mapping the
+        letters present to the number of times they occur, or if weighted
+        is true, to the sum of the weights of the records ('weight' in their
+        annotations, default 1.0).  The whole alignment is counted in a
+        single pass (using NumPy if it is installed) and the result cached.
+        """
+        weighted = bool(weighted)
+        try:
+            return self._column_counts[weighted]
+        except KeyError:
+            pass
+        alignment = self.alignment
+        length = alignment.get_alignment_length()
+        if _ArrayAlignment is not None \
+        and isinstance(alignment, _ArrayAlignment):
+            records, weights, array_align = None, None, alignment
+        else:
+            records = list(alignment)
+            weights = None
+            if weighted:
+                weights = [record.annotations.get('weight', 1.0)
+                           for record in records]
+            array_align = None
+            if _ArrayAlignment is not None \
+            and all(len(record) == length for record in records):
+                array_align = _ArrayAlignment(records)
+        if array_align is not None:
+            letters, counts = array_align.column_counts(weights)
+            columns = [dict((letter, count) for letter, count
+                            in zip(letters, column) if count)
+                       for column in counts.T.tolist()]
+        else:
+            # Some sequences may be shorter (old style Alignment objects)
+            columns = [{} for n in range(length)]
+            for i, record in enumerate(records):
+                if weights is None:
+                    weight = 1
+                else:
+                    weight = weights[i]
+                for counts, letter in zip(columns, str(record.seq)):
+                    counts[letter] = counts.get(letter, 0) + weight
+        self._column_counts[weighted] = columns
+        return columns
+
+    def _consensus(self, threshold, ambiguous, require_multiple,
+                   ignore_chars):
+        """Build a consensus string from the column counts (PRIVATE).
+
+        See dumb_consensus for the arguments; letters in ignore_chars are
+        not counted.
+        """
+        consensus = []
+        for atom_dict in self._get_column_counts():
+            # find the most common atom(s) in this column
+            max_atoms = []
+            max_size = 0
+            num_atoms = 0
+            for atom, count in atom_dict.iteritems():
+                if atom in ignore_chars:
+                    continue
+                num_atoms += count
+                if count > max_size:
+                    max_atoms = [atom]
+                    max_size = count
+                elif count == max_size:
+                    max_atoms.append(atom)
+
+            if require_multiple and num_atoms == 1:
+                consensus.append(ambiguous)
+            elif (len(max_atoms) == 1) and ((float(max_size)/float(num_atoms))
+                                         >= threshold):
+                consensus.append(max_atoms[0])
+            else:
+                consensus.append(ambiguous)
+        return "".join(consensus)
 
     def dumb_consensus(self, threshold = .7, ambiguous = "X",
                        consensus_alpha = None, require_multiple = 0):
@@ -65,46 +155,8 @@ class SummaryInfo(object):
         not just 1 sequence and gaps).
         """
         # Iddo Friedberg, 1-JUL-2004: changed ambiguous default to "X"
-        consensus = ''
-
-        # find the length of the consensus we are creating
-        con_len = self.alignment.get_alignment_length()
-
-        # go through each seq item
-        for n in range(con_len):
-            # keep track of the counts of the different atoms we get
-            atom_dict = {}
-            num_atoms = 0
-
-            for record in self.alignment._records:
-                # make sure we haven't run past the end of any sequences
-                # if they are of different lengths
-                if n < len(record.seq):
-                    if record.seq[n] != '-' and record.seq[n] != '.':
-                        if record.seq[n] not in atom_dict:
-                            atom_dict[record.seq[n]] = 1
-                        else:
-                            atom_dict[record.seq[n]] += 1
-
-                        num_atoms = num_atoms + 1
-
-            max_atoms = []
-            max_size = 0
-
-            for atom in atom_dict:
-                if atom_dict[atom] > max_size:
-                    max_atoms = [atom]
-                    max_size = atom_dict[atom]
-                elif atom_dict[atom] == max_size:
-                    max_atoms.append(atom)
-
-            if require_multiple and num_atoms == 1:
-                consensus += ambiguous
-            elif (len(max_atoms) == 1) and ((float(max_size)/float(num_atoms))
-                                         >= threshold):
-                consensus += max_atoms[0]
-            else:
-                consensus += ambiguous
+        consensus = self._consensus(threshold, ambiguous, require_multiple,
+                                    "-.")
 
         # we need to guess a consensus alphabet if one isn't specified
         if consensus_alpha is None:
@@ -121,45 +173,8 @@ class SummaryInfo(object):
         it takes the same is input.
         """
         # Iddo Friedberg, 1-JUL-2004: changed ambiguous default to "X"
-        consensus = ''
-
-        # find the length of the consensus we are creating
-        con_len = self.alignment.get_alignment_length()
-
-        # go through each seq item
-        for n in range(con_len):
-            # keep track of the counts of the different atoms we get
-            atom_dict = {}
-            num_atoms = 0
-
-            for record in self.alignment._records:
-                # make sure we haven't run past the end of any sequences
-                # if they are of different lengths
-                if n < len(record.seq):
-                    if record.seq[n] not in atom_dict:
-                        atom_dict[record.seq[n]] = 1
-                    else:
-                        atom_dict[record.seq[n]] += 1
-
-                    num_atoms += 1
-
-            max_atoms = []
-            max_size = 0
-
-            for atom in atom_dict:
-                if atom_dict[atom] > max_size:
-                    max_atoms = [atom]
-                    max_size = atom_dict[atom]
-                elif atom_dict[atom] == max_size:
-                    max_atoms.append(atom)
-
-            if require_multiple and num_atoms == 1:
-                consensus += ambiguous
-            elif (len(max_atoms) == 1) and ((float(max_size)/float(num_atoms))
-                                         >= threshold):
-                consensus += max_atoms[0]
-            else:
-                consensus += ambiguous
+        consensus = self._consensus(threshold, ambiguous, require_multiple,
+                                    "")
 
         # we need to guess a consensus alphabet if one isn't specified
         if consensus_alpha is None:
@@ -245,22 +260,72 @@ class SummaryInfo(object):
         # get a starting dictionary based on the alphabet of the alignment
         rep_dict, skip_items = self._get_base_replacements(skip_chars)
 
-        # iterate through each record
-        for rec_num1 in range(len(self.alignment._records)):
-            # iterate through each record from one beyond the current record
-            # to the end of the list of records
-            for rec_num2 in range(rec_num1 + 1, len(self.alignment._records)):
-                # for each pair of records, compare the sequences and add
-                # the pertinent info to the dictionary
-                rep_dict = self._pair_replacement(
-                    self.alignment._records[rec_num1].seq,
-                    self.alignment._records[rec_num2].seq,
-                    self.alignment._records[rec_num1].annotations.get('weight',1.0),
-                    self.alignment._records[rec_num2].annotations.get('weight',1.0),
-                    rep_dict, skip_items)
+        # add the replacements seen in the alignment, which are counted
+        # column by column rather than by comparing every pair of records
+        for (residue1, residue2), count in sorted(self._get_pair_counts().items()):
+            # if the two residues are characters we want to count
+            if (residue1 not in skip_items) and (residue2 not in skip_items):
+                try:
+                    rep_dict[(residue1, residue2)] += count
+                # if we get a key error, then we've got a problem with alphabets
+                except KeyError:
+                    raise ValueError("Residues %s, %s not found in alphabet %s"
+                                     % (residue1, residue2,
+                                        self.alignment._alphabet))
 
         return rep_dict
 
+    def _get_pair_counts(self):
+        """Count the replacements between all pairs of records (PRIVATE).
+
+        Returns a dictionary mapping pairs of residues (residue1, residue2)
+        to the sum, over every column and every pair of records where the
+        first record has residue1 and a later record has residue2, of the
+        product of the record weights.  This is the same as adding up
+        _pair_replacement for every pair of records, but instead of comparing
+        the records two at a time, each column keeps a running (weighted)
+        count of the residues seen so far in the earlier records.  This needs
+        time proportional to the number of records times the alignment
+        length times the number of different residues, rather than the
+        square of the number of records.  The result is cached.
+        """
+        if self._pair_counts is not None:
+            return self._pair_counts
+        alignment = self.alignment
+        length = alignment.get_alignment_length()
+        if _ArrayAlignment is not None \
+        and isinstance(alignment, _ArrayAlignment):
+            records, weights, array_align = None, None, alignment
+        else:
+            records = list(alignment)
+            weights = [record.annotations.get('weight', 1.0)
+                       for record in records]
+            array_align = None
+            if _ArrayAlignment is not None \
+            and all(len(record) == length for record in records):
+                array_align = _ArrayAlignment(records)
+        pair_counts = {}
+        if array_align is not None:
+            letters, counts = array_align.pair_counts(weights)
+            counts = counts.tolist()
+            for i, residue1 in enumerate(letters):
+                for j, residue2 in enumerate(letters):
+                    if counts[i][j]:
+                        pair_counts[(residue1, residue2)] = counts[i][j]
+        else:
+            # The residues seen so far in each column, with their weights.
+            # Some sequences may be shorter (old style Alignment objects).
+            seen = [{} for n in range(length)]
+            for weight, record in zip(weights, records):
+                for column, residue2 in zip(seen, str(record.seq)):
+                    for residue1, count in column.iteritems():
+                        key = (residue1, residue2)
+                        pair_counts[key] = pair_counts.get(key, 0) \
+                                           + count * weight
+                    column[residue2] = column.get(residue2, 0) + weight
+        self._pair_counts = pair_counts
+        return pair_counts
+
     def _pair_replacement(self, seq1, seq2, weight1, weight2,
                           start_dict, ignore_chars):
         """Compare two sequences and generate info on the replacements seen.
@@ -312,10 +377,8 @@ class SummaryInfo(object):
             #letters are not defined!  We must build a list of the
             #letters used...
             set_letters = set()
-            for record in self.alignment:
-                #Note the built in set does not have a union_update
-                #which was provided by the sets module's Set
-                set_letters = set_letters.union(record.seq)
+            for counts in self._get_column_counts():
+                set_letters.update(counts)
             list_letters = list(set_letters)
             list_letters.sort()
             all_letters = "".join(list_letters)
@@ -337,6 +400,7 @@ class SummaryInfo(object):
         """
         base_dictionary = {}
         all_letters = self._get_all_letters()
+        skip_items = list(skip_items)
 
         # if we have a gapped alphabet we need to find the gap character
         # and drop it out
@@ -381,7 +445,8 @@ class SummaryInfo(object):
 
         # if we have a gap char, add it to stuff to ignore
         if isinstance(self.alignment._alphabet, Alphabet.Gapped):
-            chars_to_ignore.append(self.alignment._alphabet.gap_char)
+            chars_to_ignore = chars_to_ignore + \
+                              [self.alignment._alphabet.gap_char]
 
         for char in chars_to_ignore:
             all_letters = all_letters.replace(char, '')
@@ -393,19 +458,12 @@ class SummaryInfo(object):
             left_seq = self.dumb_consensus()
 
         pssm_info = []
-        # now start looping through all of the sequences and getting info
+        columns = self._get_column_counts(weighted=True)
+        # now start looping through all of the columns and getting info
         for residue_num in range(len(left_seq)):
             score_dict = self._get_base_letters(all_letters)
-            for record in self.alignment._records:
-                try:
-                    this_residue = record.seq[residue_num]
-                # if we hit an index error we've run out of sequence and
-                # should not add new residues
-                except IndexError:
-                    this_residue = None
-
-                if this_residue and this_residue not in chars_to_ignore:
-                    weight = record.annotations.get('weight', 1.0)
+            for this_residue, weight in columns[residue_num].iteritems():
+                if this_residue not in chars_to_ignore:
                     try:
                         score_dict[this_residue] += weight
                     # if we get a KeyError then we have an alphabet problem
@@ -457,13 +515,14 @@ class SummaryInfo(object):
         content is calculated.
         """
         # if no end was specified, then we default to the end of the sequence
+        length = len(self.alignment[0].seq)
         if end is None:
-            end = len(self.alignment._records[0].seq)
+            end = length
 
-        if start < 0 or end > len(self.alignment._records[0].seq):
+        if start < 0 or end > length:
             raise ValueError("Start (%s) and end (%s) are not in the \
                     range %s to %s"
-                    % (start, end, 0, len(self.alignment._records[0].seq)))
+                    % (start, end, 0, length))
         # determine random expected frequencies, if necessary
         random_expected = None
         if not e_freq_table:
@@ -487,9 +546,9 @@ class SummaryInfo(object):
             all_letters = all_letters.replace(char, '')
 
         info_content = {}
+        columns = self._get_column_counts(weighted=True)
         for residue_num in range(start, end):
-            freq_dict = self._get_letter_freqs(residue_num,
-                                               self.alignment._records,
+            freq_dict = self._get_letter_freqs(columns[residue_num],
                                                all_letters, chars_to_ignore)
             # print freq_dict,
             column_score = self._get_column_info_content(freq_dict,
@@ -505,13 +564,12 @@ class SummaryInfo(object):
             self.ic_vector[i] = info_content[i]
         return total_info
 
-    def _get_letter_freqs(self, residue_num, all_records, letters, to_ignore):
+    def _get_letter_freqs(self, column_counts, letters, to_ignore):
         """Determine the frequency of specific letters in the alignment.
 
         Arguments:
-        o residue_num - The number of the column we are getting frequencies
-        from.
-        o all_records - All of the SeqRecords in the alignment.
+        o column_counts - The (weighted) counts of the letters in the
+        column we are getting frequencies from, as a dictionary.
         o letters - The letters we are interested in getting the frequency
         for.
         o to_ignore - Letters we are specifically supposed to ignore.
@@ -524,18 +582,16 @@ class SummaryInfo(object):
         freq_info = self._get_base_letters(letters)
 
         total_count = 0
-        # collect the count info into the dictionary for all the records
-        for record in all_records:
-            try:
-                if record.seq[residue_num] not in to_ignore:
-                    weight = record.annotations.get('weight',1.0)
-                    freq_info[record.seq[residue_num]] += weight
-                    total_count += weight
-            # getting a key error means we've got a problem with the alphabet
-            except KeyError:
-                raise ValueError("Residue %s not found in alphabet %s"
-                                 % (record.seq[residue_num],
-                                    self.alignment._alphabet))
+        # collect the count info into the dictionary for the column
+        for letter, weight in column_counts.iteritems():
+            if letter not in to_ignore:
+                # getting a key error means we've got a problem with the
+                # alphabet
+                if letter not in freq_info:
+                    raise ValueError("Residue %s not found in alphabet %s"
+                                     % (letter, self.alignment._alphabet))
+                freq_info[letter] += weight
+                total_count += weight
 
         if total_count == 0:
             # This column must be entirely ignored characters
@@ -676,7 +732,7 @@ def print_info_content(summary_info,fout=None,rep_record=0):
     fout = fout or sys.stdout
     if not summary_info.ic_vector:
         summary_info.information_content()
-    rep_sequence = summary_info.alignment._records[rep_record].seq
+    rep_sequence = summary_info.alignment[rep_record].seq
     positions = summary_info.ic_vector.keys()
     positions.sort()
     for pos in positions:
@@ -0,0 +1,388 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Multiple sequence alignments held as a NumPy array of letters.
+
+The MultipleSeqAlignment class holds a list of SeqRecord objects, so taking
+a column of an alignment means visiting every row.  The ArrayAlignment class
+defined here instead keeps the letters in a two dimensional NumPy array of
+bytes (one row per sequence, one column per alignment column), which makes
+column access cheap and lets per-column statistics be calculated with array
+operations.  This needs NumPy.
+
+You can make an ArrayAlignment from a MultipleSeqAlignment (or any list or
+iterator of SeqRecord objects of the same length):
+
+>>> from Bio import AlignIO
+>>> from Bio.Align.ArrayAlignment import ArrayAlignment
+>>> align = ArrayAlignment(AlignIO.read("Clustalw/opuntia.aln", "clustal"))
+>>> print align
+SingleLetterAlphabet() alignment with 7 rows and 156 columns
+TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273285|gb|AF191659.1|AF191
+TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273284|gb|AF191658.1|AF191
+TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273287|gb|AF191661.1|AF191
+TATACATAAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273286|gb|AF191660.1|AF191
+TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273290|gb|AF191664.1|AF191
+TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273289|gb|AF191663.1|AF191
+TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273291|gb|AF191665.1|AF191
+
+The letters are in the array attribute, with the usual NumPy shape of
+(rows, columns):
+
+>>> align.array.shape
+(7, 156)
+
+Indexing works as for a MultipleSeqAlignment, giving a SeqRecord for a
+row, a string for a column, or a sub-alignment.  Sub-alignments made with
+slices share the array of the original alignment (they are NumPy views),
+so no letters are copied:
+
+>>> print align[:, 7]
+TTTATTT
+>>> sub = align[:, 6:10]
+>>> print sub[3].seq
+TAAA
+>>> sub.array.base is not None
+True
+
+The letters in each column can be counted in one go:
+
+>>> letters, counts = align[:, 6:10].column_counts()
+>>> letters
+'AT'
+>>> counts.tolist()
+[[0, 1, 7, 7], [7, 6, 0, 0]]
+
+Finally, you can turn the alignment back into a MultipleSeqAlignment:
+
+>>> print align[:2, :10].to_alignment()
+SingleLetterAlphabet() alignment with 2 rows and 10 columns
+TATACATTAA gi|6273285|gb|AF191659.1|AF191
+TATACATTAA gi|6273284|gb|AF191658.1|AF191
+
+Only the identifier, name and description of each record are kept, not
+any other annotation or features.
+"""
+
+import numpy
+
+from Bio import Alphabet
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Align import MultipleSeqAlignment
+from Bio._py3k import _as_bytes, _as_string
+
+
+class ArrayAlignment(object):
+    """Multiple sequence alignment held as a NumPy array of letters.
+
+    The array attribute is a two dimensional NumPy array of unsigned bytes,
+    with a row for each sequence.  See the module docstring for examples.
+    """
+
+    def __init__(self, records, alphabet=None, annotations=None):
+        """Initialize a new ArrayAlignment object.
+
+        Arguments:
+         - records - A MultipleSeqAlignment, or list (or iterator) of
+                     SeqRecord objects whose sequences are all the same
+                     length.  This may be an empty list.
+         - alphabet - The alphabet for the whole alignment.  If omitted,
+                      the alphabet of the MultipleSeqAlignment or a
+                      consensus of the record alphabets is used.
+         - annotations - Information about the whole alignment
+                         (dictionary).  If omitted, the annotations of a
+                         MultipleSeqAlignment are copied.
+        """
+        if isinstance(records, (MultipleSeqAlignment, ArrayAlignment)):
+            if alphabet is None:
+                alphabet = records._alphabet
+            if annotations is None:
+                annotations = dict(records.annotations)
+        if isinstance(records, ArrayAlignment):
+            array, info = records.array.copy(), list(records._info)
+        else:
+            rows, info, alphabets = [], [], []
+            for record in records:
+                if not isinstance(record, SeqRecord):
+                    raise TypeError("New sequence is not a SeqRecord object")
+                rows.append(_as_bytes(str(record.seq)))
+                info.append((record.id, record.name, record.description))
+                alphabets.append(record.seq.alphabet)
+            if rows:
+                length = len(rows[0])
+            else:
+                length = 0
+            array = numpy.empty((len(rows), length), numpy.uint8)
+            for i, row in enumerate(rows):
+                if len(row) != length:
+                    raise ValueError("Sequences must all be the same length")
+                if length:
+                    array[i] = numpy.frombuffer(row, numpy.uint8)
+            if alphabet is None and alphabets:
+                alphabet = Alphabet._consensus_alphabet(alphabets)
+        if alphabet is None:
+            alphabet = Alphabet.single_letter_alphabet
+        elif not (isinstance(alphabet, Alphabet.Alphabet)
+                  or isinstance(alphabet, Alphabet.AlphabetEncoder)):
+            raise ValueError("Invalid alphabet argument")
+        if annotations is None:
+            annotations = {}
+        elif not isinstance(annotations, dict):
+            raise TypeError("annotations argument should be a dict")
+        self.array = array
+        self._info = info
+        self._alphabet = alphabet
+        self.annotations = annotations
+
+    def _view(self, array, info):
+        """Returns a new alignment using the given array and row info (PRIVATE).
+
+        The annotations of the whole alignment are not kept, as with
+        slicing a MultipleSeqAlignment.
+        """
+        view = ArrayAlignment([], self._alphabet)
+        view.array = array
+        view._info = info
+        return view
+
+    def _record(self, row, col_index=slice(None)):
+        """Returns (part of) a row as a SeqRecord (PRIVATE)."""
+        id, name, description = self._info[row]
+        seq = Seq(_as_string(self.array[row, col_index].tostring()),
+                  self._alphabet)
+        return SeqRecord(seq, id=id, name=name, description=description)
+
+    def __len__(self):
+        """Returns the number of sequences (rows) in the alignment."""
+        return self.array.shape[0]
+
+    def get_alignment_length(self):
+        """Returns the number of columns in the alignment."""
+        return self.array.shape[1]
+
+    def __iter__(self):
+        """Iterate over the rows of the alignment as SeqRecord objects."""
+        for row in range(len(self)):
+            yield self._record(row)
+
+    def __str__(self):
+        """Returns a multi-line string summary of the alignment.
+
+        As for a MultipleSeqAlignment, at most 20 rows and 50 columns
+        are shown.
+        """
+        rows = len(self)
+        lines = ["%s alignment with %i rows and %i columns"
+                 % (str(self._alphabet), rows, self.get_alignment_length())]
+        if rows <= 20:
+            indexes = range(rows)
+        else:
+            indexes = range(18) + [None, rows - 1]
+        for row in indexes:
+            if row is None:
+                lines.append("...")
+                continue
+            id = self._info[row][0]
+            if self.get_alignment_length() <= 50:
+                seq = self.array[row].tostring()
+            else:
+                seq = self.array[row, :44].tostring() + _as_bytes("...") \
+                      + self.array[row, -3:].tostring()
+            lines.append("%s %s" % (_as_string(seq), id))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        """Returns a representation of the object for debugging."""
+        return "<%s instance (%i records of length %i, %s) at %x>" % \
+               (self.__class__, len(self), self.get_alignment_length(),
+                repr(self._alphabet), id(self))
+
+    def __getitem__(self, index):
+        """Access part of the alignment.
+
+        This follows MultipleSeqAlignment:
+
+        align[r,c] gives a single character as a string
+        align[r] gives a row as a SeqRecord
+        align[r,:] gives a row as a SeqRecord
+        align[:,c] gives a column as a string
+
+        Anything else gives a sub alignment sharing the same array, e.g.
+        align[0:2] or align[0:2,:] uses only row 0 and 1
+        align[:,1:3] uses only columns 1 and 2
+        align[0:2,1:3] uses only rows 0 & 1 and only cols 1 & 2
+        """
+        if isinstance(index, int):
+            return self._record(index)
+        elif isinstance(index, slice):
+            return self._view(self.array[index], self._info[index])
+        elif len(index) != 2:
+            raise TypeError("Invalid index type.")
+
+        row_index, col_index = index
+        if isinstance(row_index, int):
+            if isinstance(col_index, int):
+                return chr(self.array[row_index, col_index])
+            return self._record(row_index, col_index)
+        elif isinstance(col_index, int):
+            return _as_string(self.array[row_index, col_index].tostring())
+        else:
+            return self._view(self.array[row_index, col_index],
+                              self._info[row_index])
+
+    def to_alignment(self):
+        """Returns the alignment as a MultipleSeqAlignment object."""
+        return MultipleSeqAlignment(iter(self), self._alphabet,
+                                    dict(self.annotations))
+
+    def format(self, format):
+        """Returns the alignment as a string in the specified file format.
+
+        See the MultipleSeqAlignment format method.
+        """
+        return self.to_alignment().format(format)
+
+    def _check_weights(self, weights):
+        """Returns the weights as an array, or None (PRIVATE)."""
+        if weights is None:
+            return None
+        weights = numpy.asarray(weights, float)
+        if weights.shape != (len(self),):
+            raise ValueError("Need one weight for each row")
+        return weights
+
+    def _letter_indexes(self):
+        """Find the letters used in the alignment (PRIVATE).
+
+        Returns a string of the letters present, in sorted order, and an
+        array mapping each byte value to the index of the letter in that
+        string.  This means count tables need only have a row for each
+        letter used rather than for all 256 byte values.
+        """
+        array = self.array
+        present = numpy.zeros(256, bool)
+        for row in range(len(self)):
+            present[array[row]] = True
+        codes = numpy.flatnonzero(present)
+        indexes = numpy.zeros(256, numpy.intp)
+        indexes[codes] = numpy.arange(len(codes))
+        return _as_string(codes.astype(numpy.uint8).tostring()), indexes
+
+    def column_counts(self, weights=None):
+        """Count the letters in each column, returns a tuple (letters, counts).
+
+        Arguments:
+         - weights - Optional sequence of weights, one for each row.
+
+        letters is a string of the letters present in the alignment, in
+        sorted order, and counts is an array with a row for each of these
+        letters and a column for each alignment column.  Without weights
+        each entry is the number of times the letter occurs in the column;
+        with weights, it is the sum of the weights of the rows where it
+        does.
+        """
+        array = self.array
+        rows, cols = array.shape
+        weights = self._check_weights(weights)
+        letters, indexes = self._letter_indexes()
+        if weights is None:
+            table = numpy.zeros((len(letters), cols), int)
+        else:
+            table = numpy.zeros((len(letters), cols), float)
+        col_indexes = numpy.arange(cols)
+        for row in range(rows):
+            if weights is None:
+                table[indexes[array[row]], col_indexes] += 1
+            else:
+                table[indexes[array[row]], col_indexes] += weights[row]
+        return letters, table
+
+    def pair_counts(self, weights=None):
+        """Count the pairs of letters aligned in the same column.
+
+        Arguments:
+         - weights - Optional sequence of weights, one for each row.
+
+        Returns a tuple (letters, counts), where letters is a string of the
+        letters present in the alignment, in sorted order, and counts is a
+        square array.  Entry [i, j] counts how often letters[i] in one row
+        is in the same column as letters[j] in a later row, summed over all
+        pairs of rows and all columns.  With weights, each pair of rows adds
+        the product of their weights instead of one.
+
+        >>> from Bio.Seq import Seq
+        >>> from Bio.SeqRecord import SeqRecord
+        >>> align = ArrayAlignment([SeqRecord(Seq("AC"), id="Alpha"),
+        ...                         SeqRecord(Seq("AT"), id="Beta"),
+        ...                         SeqRecord(Seq("CT"), id="Gamma")])
+        >>> letters, counts = align.pair_counts()
+        >>> letters
+        'ACT'
+        >>> counts.tolist()
+        [[1, 2, 0], [0, 0, 2], [0, 0, 1]]
+
+        Rather than comparing every pair of rows, this keeps a running
+        count of the letters seen so far in each column, so the time taken
+        grows with the number of rows times the number of columns times
+        the number of different letters.
+        """
+        array = self.array
+        rows, cols = array.shape
+        weights = self._check_weights(weights)
+        letters, indexes = self._letter_indexes()
+        size = len(letters)
+        # Letters (or weights) seen so far in each column
+        seen = numpy.zeros((size, cols), float)
+        counts = numpy.zeros(size * size, float)
+        # The index of pair (i, j) in counts is i * size + j
+        offsets = numpy.arange(size)[:, numpy.newaxis] * size
+        col_indexes = numpy.arange(cols)
+        for row in range(rows):
+            row_letters = indexes[array[row]]
+            if weights is None:
+                weight = 1
+            else:
+                weight = weights[row]
+            if row:
+                counts += weight * numpy.bincount(
+                    (offsets + row_letters).ravel(), seen.ravel(),
+                    size * size)
+            seen[row_letters, col_indexes] += weight
+        counts = counts.reshape(size, size)
+        if weights is None:
+            counts = counts.round().astype(int)
+        return letters, counts
+
+    def letter_counts(self, letter):
+        """Returns an array of the number of times letter occurs in each column.
+        """
+        code = ord(letter)
+        array = self.array
+        rows, cols = array.shape
+        counts = numpy.zeros(cols, int)
+        # Compare a block of rows at a time, to limit the memory used
+        step = max(1, 1000000 // max(cols, 1))
+        for start in range(0, rows, step):
+            counts += (array[start:start + step] == code).sum(axis=0)
+        return counts
+
+    def gap_fractions(self, gap_char="-"):
+        """Returns an array of the fraction of each column which is gaps.
+
+        >>> from Bio.Seq import Seq
+        >>> from Bio.SeqRecord import SeqRecord
+        >>> align = ArrayAlignment([SeqRecord(Seq("AC-T"), id="Alpha"),
+        ...                         SeqRecord(Seq("A--T"), id="Beta")])
+        >>> align.gap_fractions().tolist()
+        [0.0, 0.5, 1.0, 0.0]
+        """
+        if not len(self):
+            return numpy.zeros(self.get_alignment_length())
+        return self.letter_counts(gap_char) / float(len(self))
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
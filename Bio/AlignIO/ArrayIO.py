@@ -0,0 +1,239 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Binary alignment files which can be memory mapped (needs NumPy).
+
+Very large alignments (e.g. whole genome alignments, or alignments of many
+thousands of 16S sequences) are slow to load and take a lot of memory as
+MultipleSeqAlignment objects.  This module defines a simple binary file
+format holding the letters of a single alignment as a fixed width matrix of
+bytes (one row per sequence), followed by a table of the record identifiers
+and a table of annotations for the whole alignment.
+
+Such a file is opened using a NumPy memory map, giving an ArrayAlignment
+(see Bio.Align.ArrayAlignment) whose array is read from the disk only as
+needed.  This means taking a few rows, a block of columns, or counting the
+letters in some columns, only reads the parts of the file used.
+
+You would typically make the binary file once using the convert function,
+which takes any alignment file format supported by Bio.AlignIO:
+
+>>> from Bio.AlignIO import ArrayIO
+>>> ArrayIO.convert("Clustalw/opuntia.aln", "clustal", "opuntia.msa")
+7
+
+Then open it as often as you like with the load function:
+
+>>> align = ArrayIO.load("opuntia.msa")
+>>> print align[2:4, 40:60]
+SingleLetterAlphabet() alignment with 2 rows and 20 columns
+AAAGAAAGAATATATA---- gi|6273287|gb|AF191661.1|AF191
+AAAGAAAGAATATATA---- gi|6273286|gb|AF191660.1|AF191
+>>> print align[:, 7]
+TTTATTT
+
+As with any ArrayAlignment, the rows can be turned into SeqRecord objects,
+but only the identifier, name and description of each record are kept:
+
+>>> record = align[0]
+>>> print record.id
+gi|6273285|gb|AF191659.1|AF191
+>>> print record.seq[:30]
+TATACATTAAAGAAGGGGGATGCGGATAAA
+>>> del align, record
+>>> import os
+>>> os.remove("opuntia.msa")
+
+The file layout (all integers are big endian and unsigned) is:
+
+ - The header, the 8 byte file signature followed by four 64 bit integers:
+   the number of rows, the number of columns, and the offsets of the
+   identifier table and the annotation table.
+ - The letters, row by row, starting immediately after the header.
+ - The identifier table, giving the id, name and description of each row.
+ - The annotation table, a 32 bit count followed by that many key/value
+   pairs, for the string valued annotations of the whole alignment.
+
+Each string in the tables is written as a 32 bit length followed by the
+bytes of the string.
+"""
+
+# For using with statement in Python 2.5 or Jython
+from __future__ import with_statement
+
+import struct
+
+import numpy
+
+from Bio.Alphabet import single_letter_alphabet
+from Bio.File import as_handle
+from Bio.Align.ArrayAlignment import ArrayAlignment
+from Bio._py3k import _as_bytes, _as_string
+
+_MAGIC = _as_bytes("BioMSA\x00\x01")
+_HEADER = ">8sQQQQ"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+
+
+def _write_string(handle, text):
+    """Write a string with its length to a binary handle (PRIVATE)."""
+    data = _as_bytes(text)
+    handle.write(struct.pack(">I", len(data)))
+    handle.write(data)
+
+
+def _read_string(handle):
+    """Read a string written by _write_string (PRIVATE)."""
+    size = struct.unpack(">I", handle.read(4))[0]
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError("Premature end of file")
+    return _as_string(data)
+
+
+def write(records, handle, annotations=None):
+    """Write an alignment to a binary file, returns the number of rows.
+
+    Arguments:
+     - records     - The alignment as a MultipleSeqAlignment, ArrayAlignment,
+                     or any list or iterator of SeqRecord objects whose
+                     sequences are all the same length.
+     - handle      - File handle object to write to (opened in binary mode,
+                     and which supports seek), or filename as string.
+     - annotations - Optional dictionary of annotations for the whole
+                     alignment.  Defaults to the annotations attribute of
+                     the alignment, if any.
+
+    The records are written one at a time, so an iterator of SeqRecord
+    objects (e.g. from Bio.SeqIO.parse) does not need to be held in memory.
+    Only the string valued annotations of the alignment are kept.
+    """
+    if annotations is None:
+        annotations = getattr(records, "annotations", {})
+    with as_handle(handle, "wb") as fp:
+        start = fp.tell()
+        #Write the header again when the size of the alignment is known
+        fp.write(struct.pack(_HEADER, _MAGIC, 0, 0, 0, 0))
+        info = []
+        length = None
+        if isinstance(records, ArrayAlignment):
+            #Can copy the letters directly
+            for row in range(len(records)):
+                fp.write(records.array[row].tostring())
+            info = records._info
+            length = records.get_alignment_length()
+        else:
+            for record in records:
+                data = _as_bytes(str(record.seq))
+                if length is None:
+                    length = len(data)
+                elif len(data) != length:
+                    raise ValueError("Sequences must all be the same length")
+                fp.write(data)
+                info.append((record.id, record.name, record.description))
+        if length is None:
+            length = 0
+        info_offset = fp.tell() - start
+        for id, name, description in info:
+            _write_string(fp, id)
+            _write_string(fp, name)
+            _write_string(fp, description)
+        annotation_offset = fp.tell() - start
+        annotations = sorted((key, value) for (key, value)
+                             in annotations.items()
+                             if isinstance(value, basestring))
+        fp.write(struct.pack(">I", len(annotations)))
+        for key, value in annotations:
+            _write_string(fp, key)
+            _write_string(fp, value)
+        end = fp.tell()
+        fp.seek(start)
+        fp.write(struct.pack(_HEADER, _MAGIC, len(info), length,
+                             info_offset, annotation_offset))
+        fp.seek(end)
+    return len(info)
+
+
+def load(filename, alphabet=single_letter_alphabet):
+    """Open a binary alignment file as a memory mapped ArrayAlignment.
+
+    Arguments:
+     - filename - The name of the file (as a string).
+     - alphabet - Optional alphabet for the alignment, as this is not
+                  recorded in the file.
+
+    The array attribute of the returned alignment is a read only NumPy
+    memory map of the letters in the file.  The identifiers and annotations
+    are read into memory.
+    """
+    handle = open(filename, "rb")
+    try:
+        header = handle.read(_HEADER_SIZE)
+        if len(header) != _HEADER_SIZE:
+            raise ValueError("File too short to be a binary alignment")
+        magic, rows, cols, info_offset, annotation_offset = \
+               struct.unpack(_HEADER, header)
+        if magic != _MAGIC:
+            raise ValueError("Not a binary alignment file (signature %r)"
+                             % magic)
+        if info_offset != _HEADER_SIZE + rows * cols:
+            raise ValueError("Bad identifier table offset %i, expected %i"
+                             % (info_offset, _HEADER_SIZE + rows * cols))
+        handle.seek(info_offset)
+        info = []
+        for row in xrange(rows):
+            id = _read_string(handle)
+            name = _read_string(handle)
+            description = _read_string(handle)
+            info.append((id, name, description))
+        if handle.tell() != annotation_offset:
+            raise ValueError("Bad annotation table offset %i"
+                             % annotation_offset)
+        annotations = {}
+        for i in xrange(struct.unpack(">I", handle.read(4))[0]):
+            key = _read_string(handle)
+            annotations[key] = _read_string(handle)
+    finally:
+        handle.close()
+    if rows and cols:
+        array = numpy.memmap(filename, numpy.uint8, "r", _HEADER_SIZE,
+                             (rows, cols))
+    else:
+        #Can't memory map nothing
+        array = numpy.zeros((rows, cols), numpy.uint8)
+    alignment = ArrayAlignment([], alphabet, annotations)
+    alignment.array = array
+    alignment._info = info
+    return alignment
+
+
+def convert(in_file, in_format, out_file, alphabet=None):
+    """Convert an alignment file into a binary file, returns the number of rows.
+
+    Arguments:
+     - in_file   - an input handle or filename
+     - in_format - input file format, lower case string
+     - out_file  - an output handle or filename
+     - alphabet  - optional alphabet to assume when reading the input
+
+    The input must hold a single alignment.  For file formats read by
+    Bio.SeqIO (such as "fasta") the records are written out one by one as
+    they are parsed, so the whole alignment is never held in memory.  Other
+    formats are read using Bio.AlignIO.read(...).
+    """
+    from Bio import AlignIO, SeqIO
+
+    with as_handle(in_file, "rU") as in_handle:
+        if in_format in AlignIO._FormatToIterator:
+            records = AlignIO.read(in_handle, in_format, alphabet=alphabet)
+        elif in_format in SeqIO._FormatToIterator:
+            records = SeqIO.parse(in_handle, in_format, alphabet)
+        else:
+            raise ValueError("Unknown format '%s'" % in_format)
+        return write(records, out_file)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -186,6 +186,23 @@ class PhylipIterator(AlignmentIterator):
         return seq_id, seq
 
     def next(self):
+        rows = self._next_rows()
+        if rows is None:
+            raise StopIteration
+        ids, seqs = rows
+        records = (SeqRecord(Seq(s, self.alphabet),
+                             id=i, name=i, description=i)
+                   for (i, s) in zip(ids, seqs))
+        return MultipleSeqAlignment(records, self.alphabet)
+
+    def _next_rows(self):
+        """Read the next alignment as lists of identifiers and sequences (PRIVATE).
+
+        Returns a tuple (ids, seqs) of two lists of strings, or None at the
+        end of the file.  This does the parsing for the next() method, and
+        is also used by Bio.AlignIO.parse_arrays(...), which avoids making
+        a SeqRecord for each row.
+        """
         handle = self.handle
 
         try:
@@ -197,7 +214,7 @@ class PhylipIterator(AlignmentIterator):
             line = handle.readline()
 
         if not line:
-            raise StopIteration
+            return None
         line = line.strip()
         parts = filter(None, line.split())
         if len(parts) != 2:
@@ -256,10 +273,7 @@ class PhylipIterator(AlignmentIterator):
             if not line:
                 break  # end of file
 
-        records = (SeqRecord(Seq("".join(s), self.alphabet),
-                             id=i, name=i, description=i)
-                   for (i, s) in zip(ids, seqs))
-        return MultipleSeqAlignment(records, self.alphabet)
+        return ids, ["".join(s) for s in seqs]
 
 
 # Relaxed Phylip
@@ -370,7 +384,11 @@ class SequentialPhylipIterator(PhylipIterator):
     the next. According to the PHYLIP documentation for input file formatting,
     newlines and spaces may optionally be entered at any point in the sequences.
     """
-    def next(self):
+    def _next_rows(self):
+        """Read the next alignment as lists of identifiers and sequences (PRIVATE).
+
+        See the PhylipIterator class for details.
+        """
         handle = self.handle
 
         try:
@@ -382,7 +400,7 @@ class SequentialPhylipIterator(PhylipIterator):
             line = handle.readline()
 
         if not line:
-            raise StopIteration
+            return None
         line = line.strip()
         parts = filter(None, line.split())
         if len(parts) != 2:
@@ -432,10 +450,7 @@ class SequentialPhylipIterator(PhylipIterator):
                 self._header = line
                 break
 
-        records = (SeqRecord(Seq(s, self.alphabet),
-                             id=i, name=i, description=i)
-                   for (i, s) in zip(ids, seqs))
-        return MultipleSeqAlignment(records, self.alphabet)
+        return ids, seqs
 
 
 if __name__ == "__main__":
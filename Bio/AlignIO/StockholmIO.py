@@ -133,6 +133,7 @@ __docformat__ = "epytext en"  # not just plaintext
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.Align import MultipleSeqAlignment
+from Bio.Alphabet import single_letter_alphabet
 from Interfaces import AlignmentIterator, SequentialAlignmentWriter
 
 
@@ -294,6 +295,21 @@ class StockholmIterator(AlignmentIterator):
 
     For consistency with BioPerl and EMBOSS we call this the "stockholm"
     format.
+
+    Very large families (e.g. from Pfam-A.full) are read one alignment at a
+    time, with each row accumulated as a list of its interleaved blocks and
+    only joined into a string once the alignment is complete. If you do not
+    need the meta-data, use meta_data=False to skip all the GF, GS and GR
+    lines without parsing them. Via Bio.AlignIO, use the "stockholm-nometa"
+    format for this:
+
+    >>> from Bio import AlignIO
+    >>> for alignment in AlignIO.parse("Stockholm/simple.sth",
+    ...                                "stockholm-nometa"):
+    ...     for record in alignment:
+    ...         print record.id, len(record), len(record.letter_annotations)
+    AP001509.1 104 0
+    AE007476.1 104 0
     """
 
     #These dictionaries should be kept in sync with those
@@ -310,6 +326,19 @@ class StockholmIterator(AlignmentIterator):
                        "OC": "organism_classification",
                        "LO": "look"}
 
+    def __init__(self, handle, seq_count=None,
+                 alphabet=single_letter_alphabet, meta_data=True):
+        """Create a StockholmIterator object.
+
+        handle    - input file
+        seq_count - optional, expected number of records per alignment
+        alphabet  - optional, e.g. Bio.Alphabet.generic_protein
+        meta_data - optional boolean, set to False to ignore all the GF,
+                    GS and GR meta-data lines (faster, less memory).
+        """
+        AlignmentIterator.__init__(self, handle, seq_count, alphabet)
+        self.meta_data = meta_data
+
     def next(self):
         try:
             line = self._header
@@ -329,11 +358,15 @@ class StockholmIterator(AlignmentIterator):
         # We do not check for this - perhaps we should, and verify that
         # if present it agrees with our parsing.
 
+        #Each sequence (and GR entry) is held as a list of its interlaced
+        #blocks, and joined once at the end (repeated string addition and
+        #list membership tests get very slow with big PFAM families).
         seqs = {}
         ids = []
         gs = {}
         gr = {}
         gf = {}
+        meta_data = self.meta_data
         passed_end_alignment = False
         while 1:
             line = self.handle.readline()
@@ -360,10 +393,14 @@ class StockholmIterator(AlignmentIterator):
                     raise ValueError("Could not split line into identifier "
                                       + "and sequence:\n" + line)
                 id, seq = parts
-                if id not in ids:
+                try:
+                    seqs[id].append(seq)
+                except KeyError:
+                    seqs[id] = [seq]
                     ids.append(id)
-                seqs.setdefault(id, '')
-                seqs[id] += seq.replace(".", "-")
+            elif not meta_data:
+                #Comment line or meta-data, which we've been told to ignore
+                pass
             elif len(line) >= 5:
                 #Comment line or meta-data
                 if line[:5] == "#=GF ":
@@ -401,8 +438,8 @@ class StockholmIterator(AlignmentIterator):
                     if id not in gr:
                         gr[id] = {}
                     if feature not in gr[id]:
-                        gr[id][feature] = ""
-                    gr[id][feature] += text.strip()  # append to any previous entry
+                        gr[id][feature] = []
+                    gr[id][feature].append(text.strip())  # add to any previous entry
                     #TODO - Should we check the length matches the alignment length?
                     #       For iterlaced sequences the GR data can be split over
                     #       multiple lines
@@ -411,6 +448,11 @@ class StockholmIterator(AlignmentIterator):
         assert len(seqs) <= len(ids)
         #assert len(gs)   <= len(ids)
         #assert len(gr)   <= len(ids)
+        for id in seqs:
+            seqs[id] = "".join(seqs[id]).replace(".", "-")
+        for id in gr:
+            for feature in gr[id]:
+                gr[id][feature] = "".join(gr[id][feature])
 
         self.ids = ids
         self.sequences = seqs
@@ -424,7 +466,7 @@ class StockholmIterator(AlignmentIterator):
                 raise ValueError("Found %i records in this alignment, told to expect %i"
                                  % (len(ids), self.records_per_alignment))
 
-            alignment_length = len(seqs.values()[0])
+            alignment_length = len(seqs[ids[0]])
             records = []  # Alignment obj will put them all in a list anyway
             for id in ids:
                 seq = seqs[id]
@@ -443,7 +485,8 @@ class StockholmIterator(AlignmentIterator):
                 if end is not None:
                     record.annotations["end"] = end
 
-                self._populate_meta_data(id, record)
+                if meta_data:
+                    self._populate_meta_data(id, record)
                 records.append(record)
             alignment = MultipleSeqAlignment(records, self.alphabet)
 
@@ -534,6 +577,15 @@ class StockholmIterator(AlignmentIterator):
                 record.letter_annotations["GR:" + feature] = seq_col_data[feature]
 
 
+def _StockholmNoMetaIterator(handle, seq_count=None,
+                             alphabet=single_letter_alphabet):
+    """Stockholm iterator skipping the GF, GS and GR meta-data (PRIVATE).
+
+    This is the "stockholm-nometa" format in Bio.AlignIO.
+    """
+    return StockholmIterator(handle, seq_count, alphabet, meta_data=False)
+
+
 if __name__ == "__main__":
     from Bio._utils import run_doctest
     run_doctest()
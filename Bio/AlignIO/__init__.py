@@ -51,6 +51,15 @@ different multiple sequence alignments as possible.  One common example
 is the output of the tool seqboot in the PHLYIP suite.  Sometimes there
 can be a file header and footer, as seen in the EMBOSS alignment output.
 
+For files holding many alignments, such as the bootstrap replicates from
+seqboot, the function Bio.AlignIO.parse_arrays(...) may be faster.  It
+takes the same arguments as Bio.AlignIO.parse(...), but gives ArrayAlignment
+objects (which need NumPy) holding the letters in an array, rather than
+creating a SeqRecord for every row of every alignment.
+
+For very large alignments, see also the module Bio.AlignIO.ArrayIO which
+can convert an alignment into a binary file that can be memory mapped.
+
 Output
 ======
 Use the function Bio.AlignIO.write(...), which takes a complete set of
@@ -111,6 +120,9 @@ names are also used in Bio.SeqIO and include the following:
  - phylip-sequential - Sequential PHYLIP.
  - phylip-relaxed - PHYLIP like format allowing longer names.
  - stockholm - A richly annotated alignment file format used by PFAM.
+ - stockholm-nometa - Stockholm, skipping all the GF, GS and GR meta-data
+               lines (faster for large families when only the sequences
+               are needed).
 
 Note that while Bio.AlignIO can read all the above file formats, it cannot
 write to all of them.
@@ -142,6 +154,7 @@ __docformat__ = "epytext en"  # not just plaintext
 from Bio.Align import MultipleSeqAlignment
 from Bio.Align.Generic import Alignment
 from Bio.Alphabet import Alphabet, AlphabetEncoder, _get_base_alphabet
+from Bio.Alphabet import single_letter_alphabet
 from Bio.File import as_handle
 
 import StockholmIO
@@ -163,6 +176,7 @@ _FormatToIterator = {  # "fasta" is done via Bio.SeqIO
                      "phylip-sequential": PhylipIO.SequentialPhylipIterator,
                      "phylip-relaxed": PhylipIO.RelaxedPhylipIterator,
                      "stockholm": StockholmIO.StockholmIterator,
+                     "stockholm-nometa": StockholmIO._StockholmNoMetaIterator,
                      }
 
 _FormatToWriter = {  # "fasta" is done via Bio.SeqIO
@@ -371,6 +385,142 @@ def parse(handle, format, seq_count=None, alphabet=None):
             yield a
 
 
+def _phylip_rows(iterator):
+    """Iterate over PHYLIP alignments as (row info, sequences) tuples (PRIVATE).
+
+    The identifier is used as the name and description too, as done when
+    making the SeqRecord objects.
+    """
+    for ids, seqs in iter(iterator._next_rows, None):
+        yield [(i, i, i) for i in ids], seqs
+
+
+def _fasta_rows(handle, seq_count=None):
+    """Iterate over FASTA alignments as (row info, sequences) tuples (PRIVATE).
+
+    The records are split into alignments as done by parse(...), i.e. using
+    seq_count, or with all the records in a single alignment.
+    """
+    from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+    info = []
+    seqs = []
+    for title, seq in SimpleFastaParser(handle):
+        try:
+            first_word = title.split(None, 1)[0]
+        except IndexError:
+            first_word = ""
+        info.append((first_word, first_word, title))
+        seqs.append(seq)
+        if len(seqs) == seq_count:
+            yield info, seqs
+            info = []
+            seqs = []
+    if seq_count and seqs:
+        raise ValueError("Check seq_count argument, not enough sequences?")
+    elif seqs:
+        yield info, seqs
+
+
+#Formats which parse_arrays can read without making SeqRecord objects,
+#besides "fasta":
+_FormatToRowIterator = {"phylip": PhylipIO.PhylipIterator,
+                        "phylip-sequential": PhylipIO.SequentialPhylipIterator,
+                        "phylip-relaxed": PhylipIO.RelaxedPhylipIterator,
+                        }
+
+
+def _rows_to_arrays(rows, alphabet, reuse):
+    """Turn (row info, sequences) tuples into ArrayAlignment objects (PRIVATE).
+
+    If reuse is true, an alignment with the same number of rows and columns
+    as the one before is written into the same array, and if the rows have
+    the same identifiers, the same list of row information is used too.
+    """
+    import numpy
+    from Bio.Align.ArrayAlignment import ArrayAlignment
+    from Bio._py3k import _as_bytes
+
+    array = None
+    info = None
+    for new_info, seqs in rows:
+        if seqs:
+            length = len(seqs[0])
+        else:
+            length = 0
+        for seq in seqs:
+            if len(seq) != length:
+                raise ValueError("Sequences must all be the same length")
+        letters = numpy.frombuffer(_as_bytes("".join(seqs)), numpy.uint8)
+        shape = (len(seqs), length)
+        if reuse and array is not None and array.shape == shape:
+            array.ravel()[:] = letters
+        else:
+            array = letters.reshape(shape).copy()
+        if not (reuse and new_info == info):
+            info = new_info
+        alignment = ArrayAlignment([], alphabet)
+        alignment.array = array
+        alignment._info = info
+        yield alignment
+
+
+def parse_arrays(handle, format, seq_count=None, alphabet=None, reuse=False):
+    """Iterate over an alignment file as ArrayAlignment objects.
+
+    Arguments:
+     - handle    - handle to the file, or the filename as a string.
+     - format    - string describing the file format.
+     - seq_count - Optional integer, number of sequences expected in each
+                   alignment.  Recommended for fasta format files.
+     - alphabet  - optional Alphabet object, useful when the sequence type
+                   cannot be automatically inferred from the file itself
+                   (e.g. fasta, phylip, clustal)
+     - reuse     - Optional boolean, default False.  If True, consecutive
+                   alignments with the same shape share one NumPy array,
+                   which is overwritten each time.  Copy any alignment you
+                   want to keep before asking for the next one.
+
+    This gives the same alignments as the parse(...) function, but as
+    ArrayAlignment objects (see Bio.Align.ArrayAlignment, which needs
+    NumPy), and only the identifier, name and description of each row are
+    kept.  For the "fasta" and "phylip" formats (including the sequential
+    and relaxed variants) the letters go straight into a NumPy array,
+    without making any SeqRecord objects.  This is intended for files
+    holding many alignments, like the bootstrap replicates written by the
+    PHYLIP tool seqboot::
+
+        from Bio import AlignIO
+        for alignment in AlignIO.parse_arrays("outfile", "phylip"):
+            print alignment.array.shape
+
+    Other file formats are read using parse(...) and then converted.
+    """
+    #Try and give helpful error messages:
+    if not isinstance(format, basestring):
+        raise TypeError("Need a string for the file format (lower case)")
+    if seq_count is not None and not isinstance(seq_count, int):
+        raise TypeError("Need integer for seq_count (sequences per alignment)")
+    if format == "fasta" or format in _FormatToRowIterator:
+        if alphabet is None:
+            alphabet = single_letter_alphabet
+        elif not (isinstance(alphabet, Alphabet) or
+                  isinstance(alphabet, AlphabetEncoder)):
+            raise ValueError("Invalid alphabet, %s" % repr(alphabet))
+        with as_handle(handle, 'rU') as fp:
+            if format == "fasta":
+                rows = _fasta_rows(fp, seq_count)
+            else:
+                rows = _phylip_rows(_FormatToRowIterator[format](fp, seq_count))
+            for alignment in _rows_to_arrays(rows, alphabet, reuse):
+                yield alignment
+    else:
+        from Bio.Align.ArrayAlignment import ArrayAlignment
+
+        for alignment in parse(handle, format, seq_count, alphabet):
+            yield ArrayAlignment(alignment)
+
+
 def read(handle, format, seq_count=None, alphabet=None):
     """Turns an alignment file into a single MultipleSeqAlignment object.
 
@@ -29,6 +29,7 @@ PSIBlastParser           Parses output from psi-blast.
 Iterator                 Iterates over a file of blast results.
 
 _Scanner                 Scans output from standalone BLAST.
+_StreamScanner           Scans output from standalone BLAST line by line.
 _BlastConsumer           Consumes output from blast.
 _PSIBlastConsumer        Consumes output from psi-blast.
 _HeaderConsumer          Consumes header information.
@@ -39,6 +40,7 @@ _DatabaseReportConsumer  Consumes database report information.
 _ParametersConsumer      Consumes parameters information.
 
 Functions:
+parse           Iterates over the records in a file of blast results.
 blastall        Execute blastall (OBSOLETE).
 blastpgp        Execute blastpgp (OBSOLETE).
 rpsblast        Execute rpsblast (OBSOLETE).
@@ -1689,6 +1691,804 @@ class Iterator(object):
         return iter(self.next, None)
 
 
+# Classifies the start of each line of a plain text BLAST report, so the
+# states of _StreamScanner only need one regular expression match per line.
+# The alternatives are tried in order, and the name of the matching one is
+# given by the lastgroup attribute of the match.
+_LINE_KIND = re.compile(r"""
+    (?P<blank>[\r\n])
+  | (?P<boundary>BLAST|.BLAST|<\?xml\ )
+  | (?P<query_header>Query=)
+  | (?P<query>Query)
+  | (?P<sbjct>Sbjct)
+  | (?P<score>\ Score)
+  | (?P<spaces>\ {5})
+  | (?P<title>>)
+  | (?P<database>\ \ Database)
+  | (?P<lambda>Lambda)
+  | (?P<round>Searching|Results\ from\ round)
+""", re.VERBOSE)
+_score_e_re = re.compile(r'Score +E')
+
+# Steps of the parameters section, in the order _Scanner tries them.  Each
+# step is a list of alternatives and a flag saying whether the step is
+# required.  An alternative is a line prefix (or a compiled regular
+# expression to search for), the name of the consumer method, and the steps
+# to try next if it matches (before the rest).
+_HSP_STEPS_GAPPED = [
+    ([("Number of HSP's successfully", 'noevent', [])], True),
+    ([("Number of extra gapped extensions", 'noevent', [])], False),
+]
+_HSP_STEPS_PRELIM = [
+    ([("Number of HSP's successfully", 'hsps_prelim_gapped', [])], True),
+    ([("Number of HSP's that", 'hsps_prelim_gap_attempted', [])], True),
+    ([("Number of HSP's gapped", 'hsps_gapped', [])], True),
+]
+_HSP_STEPS_BETTER = [
+    ([("Number of HSP's gapped:", 'noevent', _HSP_STEPS_GAPPED)], False),
+    ([("Number of HSP's successfully", 'hsps_prelim_gapped',
+       _HSP_STEPS_PRELIM[1:])], True),
+]
+_PARAMETER_STEPS = [
+    ([('Matrix', 'matrix', [])], False),
+    ([('Gap', 'gap_penalties', [])], False),
+    ([('Number of Sequences', 'num_sequences', [])], False),
+    ([('Number of Hits', 'num_hits', [])], False),
+    ([('Number of Sequences', 'num_sequences', [])], False),
+    ([('Number of extensions', 'num_extends', [])], False),
+    ([('Number of successful', 'num_good_extends', [])], False),
+    ([('Number of sequences', 'num_seqs_better_e', [])], False),
+    ([("Number of HSP's better", 'hsps_no_gap', _HSP_STEPS_BETTER),
+      ("Number of HSP's gapped", 'noevent', _HSP_STEPS_GAPPED[:1])], False),
+    ([(re.compile(r"[Ll]ength of query"), 'query_length', [])], False),
+    ([(re.compile(r"[Ll]ength of \s*[Dd]atabase"), 'database_length', [])],
+     False),
+    ([('Length adjustment', 'noevent', [])], False),
+    ([('effective HSP', 'effective_hsp_length', [])], False),
+    ([(re.compile(r'[Ee]ffective length of query'), 'effective_query_length',
+       [])], False),
+    ([(re.compile(r'[Ee]ffective length of \s*[Dd]atabase'),
+       'effective_database_length', [])], False),
+    ([(re.compile(r'[Ee]ffective search space:'), 'effective_search_space',
+       [])], False),
+    ([(re.compile(r'[Ee]ffective search space used'),
+       'effective_search_space_used', [])], False),
+    ([('frameshift', 'frameshift', [])], False),
+    ([('T', 'threshold', [])], False),
+    ([('Neighboring words threshold', 'threshold', [])], False),
+    ([('A', 'window_size', [])], False),
+    ([('Window for multiple hits', 'window_size', [])], False),
+    ([('X1', 'dropoff_1st_pass', [])], False),
+    ([('X2', 'gap_x_dropoff', [])], False),
+    ([('X3', 'gap_x_dropoff_final', [])], False),
+    ([('S1', 'gap_trigger', [])], False),
+    ([('S2', 'blast_cutoff', [])], False),
+]
+
+
+class _StreamScanner(object):
+    """Scan plain text BLAST output line by line (PRIVATE).
+
+    This sends the same events to the consumer as _Scanner, but reads the
+    handle directly rather than through an UndoHandle, and splits the
+    records itself (in the same way as Iterator), so no record is ever held
+    as text.  Each line is classified once by _LINE_KIND, then handled by
+    the method for the current state, which calls the consumer and sets the
+    next state.  A state method returns True if the line should be handled
+    again by the new state.
+
+    The noevent calls of _Scanner are not made.  If alignments is False,
+    the alignment sections are skipped without calling the consumer.
+    """
+    def __init__(self, consumer, alignments=True):
+        self._consumer = consumer
+        self._alignments = alignments
+
+    def parse(self, handle):
+        """Iterates over the records in the handle."""
+        # lines before the first 'Query=' line, which are the header of
+        # each new style record (which starts with its 'Query=' line)
+        header = None
+        lines = []
+        query = False
+        self._found = False
+        self._start()
+        for line in handle:
+            match = _LINE_KIND.match(line)
+            if match is None:
+                kind = None
+            else:
+                kind = match.lastgroup
+            if (kind == 'boundary' and self._lines_seen) or \
+                    (kind == 'query_header' and query):
+                record = self._finish()
+                if record is not None:
+                    yield record
+                self._start()
+                query = False
+                if header is None:
+                    lines = []
+                if kind == 'query_header' and header and 'BLAST' not in line:
+                    for header_line in header:
+                        self._feed(header_line)
+            self._lines_seen = True
+            if kind == 'query_header':
+                query = True
+                if header is None:
+                    header = lines
+            elif header is None and not query:
+                lines.append(line)
+            while self._state(line, kind):
+                pass
+        record = self._finish()
+        if record is not None:
+            yield record
+        elif lines and not self._found:
+            # as with _Scanner, text without a report is an error
+            self._expect('', "a 'BLAST' line")
+
+    def _feed(self, line):
+        match = _LINE_KIND.match(line)
+        if match is None:
+            kind = None
+        else:
+            kind = match.lastgroup
+        while self._state(line, kind):
+            pass
+
+    def _start(self):
+        self._lines_seen = False
+        self._in_record = False
+        self._state = self._start_state
+
+    def _finish(self):
+        """Ends the current record and returns it (if any).
+
+        The end of a record is only allowed where _Scanner allows it (e.g.
+        after an HSP, or after the database report), so truncated records
+        raise a ValueError.
+        """
+        # an empty line is never read from a handle, so it marks the end
+        while self._state('', 'eof'):
+            pass
+        if self._in_record:
+            return self._consumer.data
+        return None
+
+    def _expect(self, line, description):
+        """Raises a ValueError for an unexpected line."""
+        if not line:
+            raise ValueError("Unexpected end of BLAST report, expected %s"
+                             % description)
+        raise ValueError("Expected %s, but got:\n%s" % (description, line))
+
+    # -- header
+
+    def _start_state(self, line, kind):
+        # skip anything before the start of the report
+        if 'BLAST' in line:
+            self._found = True
+            self._in_record = True
+            self._query_seen = False
+            self._database_seen = False
+            self._consumer.start_header()
+            self._consumer.version(line)
+            self._state = self._header_state
+        elif kind == 'eof':
+            self._state = self._end_state
+
+    def _header_state(self, line, kind):
+        if kind == 'blank' or line.startswith('<pre>'):
+            return
+        if line.startswith('Reference'):
+            self._consumer.reference(line)
+            self._state = self._reference_state
+        elif line.startswith('RID:'):
+            self._consumer.reference(line)
+        elif kind == 'query_header':
+            self._query_seen = True
+            self._consumer.query_info(line)
+            if self._database_seen:
+                self._state = self._new_query_state
+            else:
+                self._state = self._old_query_state
+        elif line.startswith('Database:'):
+            self._state = self._database_state
+            return True
+        elif kind == 'eof':
+            self._expect(line, 'the query and database')
+        else:
+            raise ValueError("Invalid header?")
+
+    def _reference_state(self, line, kind):
+        # references are terminated by a blank line or the RID line
+        if kind == 'blank' or kind == 'eof' or line.startswith('RID'):
+            self._state = self._header_state
+            return kind != 'blank'
+        self._consumer.reference(line)
+
+    def _database_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the database')
+        self._consumer.database_info(line)
+        if line.rstrip().endswith('total letters'):
+            self._database_seen = True
+            if self._query_seen:
+                self._state = self._header_end_state
+            else:
+                self._state = self._header_state
+
+    def _old_query_state(self, line, kind):
+        # e.g. "Query= test" then "(140 letters)" up to a blank line
+        if kind == 'eof':
+            self._expect(line, 'the database')
+        elif kind == 'blank':
+            self._state = self._old_query_end_state
+        else:
+            self._consumer.query_info(line)
+
+    def _old_query_end_state(self, line, kind):
+        if kind != 'blank':
+            self._state = self._database_state
+            return True
+
+    def _new_query_state(self, line, kind):
+        # e.g. "Query= test" then (maybe after a blank line) "Length=140"
+        if kind == 'eof':
+            self._expect(line, 'the query length')
+        self._consumer.query_info(line)
+        if line.startswith('Length='):
+            self._state = self._new_query_length_state
+
+    def _new_query_length_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the descriptions')
+        if not line.strip() or "Score     E" in line:
+            self._state = self._header_end_state
+            return True
+        self._consumer.query_info(line)
+
+    def _header_end_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the descriptions')
+        if kind != 'blank':
+            self._consumer.end_header()
+            self._state = self._rounds_state
+            return True
+
+    # -- descriptions
+
+    def _rounds_state(self, line, kind):
+        # each round starts with a 'Searching...' line, a 'Results from
+        # round' line, the 'Score     E' line or a 'No hits found' line
+        if kind == 'round' or _score_e_re.search(line) is not None or \
+                'No hits found' in line:
+            self._consumer.start_descriptions()
+            self._state = self._searching_state
+        else:
+            self._state = self._database_report_state
+        return True
+
+    def _searching_state(self, line, kind):
+        self._state = self._search_errors_state
+        return not line.startswith('Searching')
+
+    def _search_errors_state(self, line, kind):
+        if kind == 'eof':
+            raise ValueError("Unexpected end of blast report.  " +
+                  "Looks suspiciously like a PSI-BLAST crash.")
+        if "ERROR:" in line or line.startswith("done"):
+            # warnings and errors from BLASTN 2.2.3, which are left for
+            # BlastErrorParser
+            self._state = self._search_error_lines_state
+        else:
+            self._state = self._results_state
+        return True
+
+    def _search_error_lines_state(self, line, kind):
+        if line.startswith('done'):
+            self._state = self._results_state
+        elif "ERROR:" not in line:
+            self._expect(line, "the 'done' line")
+
+    def _results_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'eof':
+            self._expect(line, 'the descriptions')
+        self._state = self._description_header_state
+        if line.startswith('Results'):
+            self._consumer.round(line)
+        else:
+            return True
+
+    def _description_header_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'eof':
+            self._expect(line, 'the descriptions')
+        if _score_e_re.search(line) is not None:
+            self._consumer.description_header(line)
+            self._state = self._sequences_producing_state
+            return
+        self._state = self._no_hits_state
+        if 'No hits found' in line:
+            self._consumer.no_hits(line)
+        else:
+            return True
+
+    def _no_hits_state(self, line, kind):
+        if kind == 'eof':
+            # a report may end after 'No hits found'
+            self._consumer.end_descriptions()
+            self._state = self._end_state
+        elif kind != 'blank':
+            self._consumer.end_descriptions()
+            self._state = self._alignments_state
+            return True
+
+    def _sequences_producing_state(self, line, kind):
+        if not line.startswith('Sequences producing'):
+            self._expect(line, "the 'Sequences producing' line")
+        self._consumer.description_header(line)
+        self._state = self._model_sequences_state
+
+    def _model_sequences_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the descriptions')
+        self._state = self._descriptions_start_state
+        if line.startswith('Sequences used in model'):
+            self._consumer.model_sequences(line)
+        else:
+            return True
+
+    def _descriptions_start_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'eof':
+            self._expect(line, 'the descriptions')
+        if kind == 'database' and line.startswith('  Database:'):
+            # BLAT output has no descriptions and no alignments
+            self._consumer.end_descriptions()
+            self._state = self._alignments_state
+        elif line.startswith('Sequences not found'):
+            self._state = self._nonmodel_state
+        else:
+            self._state = self._descriptions_state
+        return True
+
+    def _descriptions_state(self, line, kind):
+        if kind == 'blank':
+            self._state = self._nonmodel_state
+        elif kind == 'eof':
+            self._expect(line, 'the end of the descriptions')
+        else:
+            self._consumer.description(line)
+
+    def _nonmodel_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'eof':
+            self._expect(line, 'the alignments')
+        if line.startswith('Sequences not found'):
+            self._consumer.nonmodel_sequences(line)
+            self._state = self._nonmodel_start_state
+        else:
+            self._state = self._converged_state
+            return True
+
+    def _nonmodel_start_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'eof':
+            self._expect(line, 'the alignments')
+        if line.startswith('CONVERGED') or kind == 'title' or \
+                line.startswith('QUERY'):
+            self._state = self._converged_state
+        else:
+            self._state = self._nonmodel_descriptions_state
+        return True
+
+    def _nonmodel_descriptions_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the end of the descriptions')
+        if kind == 'blank':
+            self._state = self._converged_state
+            return
+        self._consumer.description(line)
+
+    def _converged_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'eof':
+            self._expect(line, 'the alignments')
+        self._state = self._descriptions_end_state
+        if line.startswith('CONVERGED'):
+            self._consumer.converged(line)
+        else:
+            return True
+
+    def _descriptions_end_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the alignments')
+        if kind != 'blank':
+            self._consumer.end_descriptions()
+            self._state = self._alignments_state
+            return True
+
+    # -- alignments
+
+    def _alignments_state(self, line, kind):
+        if line.startswith('ALIGNMENTS'):
+            # qblast inserts a helpful line here
+            self._state = self._alignments_start_state
+            return
+        self._state = self._alignments_start_state
+        return True
+
+    def _alignments_start_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the alignments')
+        if kind == 'database' or kind == 'lambda' or \
+                line.startswith('Effective'):
+            self._state = self._rounds_state
+        elif kind == 'title':
+            if self._alignments:
+                self._state = self._pairwise_state
+            else:
+                self._state = self._skip_title_state
+        elif self._alignments:
+            self._consumer.start_alignment()
+            self._state = self._masterslave_state
+        else:
+            self._state = self._skip_masterslave_state
+        return True
+
+    def _pairwise_state(self, line, kind):
+        if kind != 'title':
+            self._state = self._rounds_state
+            return True
+        self._consumer.start_alignment()
+        self._consumer.title(line)
+        self._state = self._title_state
+
+    def _title_state(self, line, kind):
+        stripped = line.lstrip()
+        if stripped.startswith('Length =') or stripped.startswith('Length='):
+            self._consumer.length(line)
+            self._state = self._title_end_state
+        elif kind == 'blank':
+            raise ValueError("I missed the Length in an alignment header")
+        elif kind == 'eof':
+            self._expect(line, "the alignment's Length line")
+        else:
+            self._consumer.title(line)
+
+    def _title_end_state(self, line, kind):
+        # older versions of BLAST have a line with some spaces
+        if kind == 'blank' or line.startswith('          '):
+            self._state = self._hsp_start_state
+        else:
+            self._expect(line, "a blank line")
+
+    def _hsp_start_state(self, line, kind):
+        if kind == 'score':
+            self._consumer.start_hsp()
+            self._consumer.score(line)
+            self._state = self._identities_state
+        else:
+            self._consumer.end_alignment()
+            self._state = self._pairwise_state
+            return True
+
+    def _identities_state(self, line, kind):
+        if not line.startswith(' Identities'):
+            self._expect(line, "the ' Identities' line")
+        self._consumer.identities(line)
+        self._state = self._strand_state
+
+    def _strand_state(self, line, kind):
+        self._state = self._frame_state
+        if line.startswith(' Strand'):
+            self._consumer.strand(line)
+        else:
+            return True
+
+    def _frame_state(self, line, kind):
+        self._state = self._hsp_header_end_state
+        if line.startswith(' Frame'):
+            self._consumer.frame(line)
+        else:
+            return True
+
+    def _hsp_header_end_state(self, line, kind):
+        if kind != 'blank':
+            self._expect(line, "a blank line")
+        self._state = self._hsp_block_state
+
+    def _hsp_block_state(self, line, kind):
+        # Blastn adds an extra line filled with spaces before Query
+        if kind == 'spaces':
+            self._state = self._hsp_query_state
+        else:
+            self._state = self._hsp_query_state
+            return True
+
+    def _hsp_query_state(self, line, kind):
+        if kind != 'query':
+            self._expect(line, "the 'Query' line")
+        self._consumer.query(line)
+        self._state = self._hsp_align_state
+
+    def _hsp_align_state(self, line, kind):
+        if kind != 'spaces':
+            self._expect(line, "the alignment line")
+        self._consumer.align(line)
+        self._state = self._hsp_sbjct_state
+
+    def _hsp_sbjct_state(self, line, kind):
+        if kind != 'sbjct':
+            self._expect(line, "the 'Sbjct' line")
+        self._consumer.sbjct(line)
+        self._state = self._hsp_block_end_state
+
+    def _hsp_block_end_state(self, line, kind):
+        if kind == 'blank':
+            return
+        if kind == 'query' or kind == 'spaces':
+            self._state = self._hsp_block_state
+        else:
+            self._consumer.end_hsp()
+            self._state = self._hsp_start_state
+        return True
+
+    def _masterslave_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the end of the alignment')
+        if kind == 'round' or kind == 'database':
+            self._consumer.end_alignment()
+            self._state = self._rounds_state
+            return True
+        elif kind != 'blank':
+            self._consumer.multalign(line)
+
+    def _skip_title_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, "the alignment's Length line")
+        if line.lstrip().startswith('Length'):
+            # as with the alignments parsed, the report may only end after
+            # the blank line following the Length line, or after an HSP
+            self._skip_end = 'length'
+            self._state = self._skip_pairwise_state
+
+    def _skip_pairwise_state(self, line, kind):
+        if kind == 'title':
+            self._state = self._skip_title_state
+        elif kind == 'eof':
+            if self._skip_end is not True:
+                self._expect(line, 'the end of the alignment')
+            self._state = self._rounds_state
+            return True
+        elif kind == 'database' or line.startswith('  Subset') or \
+                not (kind == 'blank' or line[0] == ' ' or kind == 'query'
+                     or kind == 'sbjct'):
+            self._state = self._rounds_state
+            return True
+        elif self._skip_end == 'length':
+            self._skip_end = kind == 'blank' or line.startswith('          ')
+        elif kind == 'sbjct':
+            self._skip_end = True
+        elif kind != 'blank':
+            self._skip_end = False
+
+    def _skip_masterslave_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the end of the alignment')
+        if kind == 'round' or kind == 'database':
+            self._state = self._rounds_state
+            return True
+
+    # -- database report
+
+    def _database_report_state(self, line, kind):
+        if kind == 'eof':
+            self._state = self._end_state
+            return
+        self._consumer.start_database_report()
+        self._state = self._database_name_state
+        if line.startswith('  Subset'):
+            # the next lines give the letters and sequences searched
+            self._skip_lines = 3
+            self._state = self._subset_state
+        else:
+            return True
+
+    def _subset_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the database subset')
+        self._skip_lines -= 1
+        if not self._skip_lines:
+            self._state = self._database_name_state
+
+    def _database_name_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the database report')
+        if kind == 'database':
+            self._consumer.database(line)
+            self._state = self._database_name_end_state
+        else:
+            self._state = self._lambda_state
+            return True
+
+    def _database_name_end_state(self, line, kind):
+        if not line.strip() or line.startswith('BLAST'):
+            # BLAT output ends abruptly here
+            self._consumer.end_database_report()
+            self._state = self._parameters_start_state
+            return True
+        self._state = self._posted_state
+        return True
+
+    def _posted_state(self, line, kind):
+        if line.startswith('    Posted'):
+            self._consumer.posted_date(line)
+            self._state = self._num_letters_state
+        elif kind == 'eof':
+            self._expect(line, "the '    Posted' line")
+        else:
+            self._consumer.database(line)
+
+    def _num_letters_state(self, line, kind):
+        if not line.startswith('  Number of letters'):
+            self._expect(line, "the '  Number of letters' line")
+        self._consumer.num_letters_in_database(line)
+        self._state = self._num_sequences_state
+
+    def _num_sequences_state(self, line, kind):
+        if not line.startswith('  Number of sequences'):
+            self._expect(line, "the '  Number of sequences' line")
+        self._consumer.num_sequences_in_database(line)
+        self._state = self._database_end_state
+
+    def _database_end_state(self, line, kind):
+        # there may not be a line starting with spaces
+        self._state = self._database_next_state
+        return not line.startswith('  ')
+
+    def _database_next_state(self, line, kind):
+        if 'Lambda' in line:
+            self._state = self._lambda_state
+        else:
+            self._state = self._database_name_state
+        return True
+
+    def _lambda_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the Lambda values')
+        if kind == 'lambda':
+            self._state = self._ka_params_state
+        else:
+            # _Scanner drops this line too (e.g. the 'Effective search
+            # space used' line after a BLAST+ query without hits)
+            self._state = self._gapped_blank_state
+
+    def _ka_params_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the Lambda values')
+        try:
+            self._consumer.ka_params(line)
+        except ValueError:
+            pass
+        self._state = self._gapped_blank_state
+
+    def _gapped_blank_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the rest of the database report')
+        self._state = self._gapped_state
+        return kind != 'blank'
+
+    def _gapped_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the rest of the database report')
+        self._state = self._lambda_gap_state
+        if line.startswith('Gapped'):
+            self._consumer.gapped(line)
+        else:
+            return True
+
+    def _lambda_gap_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the rest of the database report')
+        if kind == 'lambda':
+            self._state = self._ka_params_gap_state
+        else:
+            self._state = self._database_report_end_state
+            return True
+
+    def _ka_params_gap_state(self, line, kind):
+        if kind == 'eof':
+            self._expect(line, 'the gapped Lambda values')
+        self._consumer.ka_params_gap(line)
+        self._state = self._database_report_end_state
+
+    def _database_report_end_state(self, line, kind):
+        if kind != 'blank':
+            self._consumer.end_database_report()
+            self._state = self._parameters_start_state
+            return True
+
+    # -- parameters
+
+    def _parameters_start_state(self, line, kind):
+        if not line.strip():
+            # there are no parameters, e.g. Blast 2.2.4 and BLAT
+            self._state = self._end_state
+        else:
+            self._consumer.start_parameters()
+            self._steps = _PARAMETER_STEPS[:]
+            self._state = self._parameters_state
+            return True
+
+    def _parameters_state(self, line, kind):
+        steps = self._steps
+        if kind == 'eof' and len(steps) > 1:
+            # as in _Scanner, the parameters may only end before S2
+            self._expect(line, 'the rest of the parameters')
+        while steps:
+            alternatives, required = steps[0]
+            for test, method, next_steps in alternatives:
+                if isinstance(test, basestring):
+                    found = line.startswith(test)
+                else:
+                    found = test.search(line) is not None
+                if found:
+                    del steps[0]
+                    steps[0:0] = next_steps
+                    if method != 'noevent':
+                        getattr(self._consumer, method)(line)
+                    if method == 'blast_cutoff':
+                        self._consumer.end_parameters()
+                        self._state = self._end_state
+                    return
+            if required:
+                self._expect(line, "the %r line" % alternatives[0][0])
+            del steps[0]
+        # only a blank line (or the end) is allowed in place of S2
+        if line.strip():
+            self._expect(line, "the 'S2' line")
+        self._consumer.end_parameters()
+        self._state = self._end_state
+
+    def _end_state(self, line, kind):
+        # ignore anything after the report (until the next one)
+        pass
+
+
+def parse(handle, psiblast=False, alignments=True):
+    """Iterate over the records in a plain text BLAST file.
+
+    Arguments:
+     - handle     - Handle to a file of plain text BLAST output, which may
+                    contain several reports.
+     - psiblast   - Whether to return Record.PSIBlast objects (as
+                    PSIBlastParser does) rather than Record.Blast objects
+                    (as BlastParser does).
+     - alignments - Whether to parse the alignments. If False, these are
+                    skipped, leaving the alignments of each record empty,
+                    which is much faster if only the descriptions and the
+                    statistics are needed.
+
+    This gives the same records as using an Iterator with a BlastParser (or
+    PSIBlastParser), but reads the file once, line by line, instead of
+    copying each record into memory and then parsing it again.
+    """
+    if psiblast:
+        consumer = _PSIBlastConsumer()
+    else:
+        consumer = _BlastConsumer()
+    return _StreamScanner(consumer, alignments).parse(handle)
+
+
 def blastall(blastcmd, program, database, infile, align_view='7', **keywds):
     """Execute and retrieve data from standalone BLASTPALL as handles (DEPRECATED).
 
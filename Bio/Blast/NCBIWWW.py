@@ -13,15 +13,31 @@ http://blast.ncbi.nlm.nih.gov/
 
 Functions:
 qblast        Do a BLAST search using the QBLAST API.
+qblast_batch  Do several BLAST searches at once using the QBLAST API.
+
+Both functions can keep the results in a local cache directory, so that
+running the same search again does not contact the NCBI at all.
 """
 
+import os
+import tempfile
+import time
+
 try:
     from cStringIO import StringIO
 except ImportError:
     from StringIO import StringIO
 
+try:
+    from hashlib import sha1
+except ImportError:
+    # Python 2.4
+    from sha import new as sha1
+
 from Bio._py3k import _as_string, _as_bytes
 
+NCBI_BLAST_URL = "http://blast.ncbi.nlm.nih.gov/Blast.cgi"
+
 
 def qblast(program, database, sequence,
            auto_format=None,composition_based_statistics=None,
@@ -37,6 +53,7 @@ def qblast(program, database, sequence,
            entrez_links_new_window=None,expect_low=None,expect_high=None,
            format_entrez_query=None,format_object=None,format_type='XML',
            ncbi_gi=None,results_file=None,show_overview=None, megablast=None,
+           url_base=NCBI_BLAST_URL, cache=None, transport=None,
            ):
     """Do a BLAST search using the QBLAST server at NCBI.
 
@@ -61,10 +78,18 @@ def qblast(program, database, sequence,
     and passes the values to the server as is.  More help is available at:
     http://www.ncbi.nlm.nih.gov/BLAST/Doc/urlapi.html
 
+    The following arguments are not sent to the server:
+    url_base       URL of the QBLAST server.  Def. the NCBI.
+    cache          Directory in which to keep the results.  If the same
+                   search (i.e. the same program, database, query and other
+                   parameters) has been run before, its results are read
+                   from this directory instead of running it again.
+    transport      Function taking the URL and the encoded parameters of
+                   each request, and returning a handle to the reply.  Def.
+                   an HTTP POST using urllib2.
+
     """
     import urllib
-    import urllib2
-    import time
 
     assert program in ['blastn', 'blastp', 'blastx', 'tblastn', 'tblastx']
 
@@ -110,21 +135,11 @@ def qblast(program, database, sequence,
         ('WORD_SIZE',word_size),
         ('CMD', 'Put'),
         ]
-    query = [x for x in parameters if x[1] is not None]
-    message = _as_bytes(urllib.urlencode(query))
-
-    # Send off the initial query to qblast.
-    # Note the NCBI do not currently impose a rate limit here, other
-    # than the request not to make say 50 queries at once using multiple
-    # threads.
-    request = urllib2.Request("http://blast.ncbi.nlm.nih.gov/Blast.cgi",
-                              message,
-                              {"User-Agent":"BiopythonClient"})
-    handle = urllib2.urlopen(request)
+    put_query = [x for x in parameters if x[1] is not None]
 
     # Format the "Get" command, which gets the formatted results from qblast
     # Parameters taken from http://www.ncbi.nlm.nih.gov/BLAST/Doc/node6.html on 9 July 2007
-    rid, rtoe = _parse_qblast_ref_page(handle)
+    # (the RID is added before the CMD once the search has been sent)
     parameters = [
         ('ALIGNMENTS',alignments),
         ('ALIGNMENT_VIEW',alignment_view),
@@ -136,31 +151,39 @@ def qblast(program, database, sequence,
         ('FORMAT_OBJECT',format_object),
         ('FORMAT_TYPE',format_type),
         ('NCBI_GI',ncbi_gi),
-        ('RID',rid),
         ('RESULTS_FILE',results_file),
         ('SERVICE',service),
         ('SHOW_OVERVIEW',show_overview),
         ('CMD', 'Get'),
         ]
-    query = [x for x in parameters if x[1] is not None]
-    message = _as_bytes(urllib.urlencode(query))
+    get_query = [x for x in parameters if x[1] is not None]
 
-    # Poll NCBI until the results are ready.  Use a 3 second wait
-    delay = 3.0
-    previous = time.time()
-    while True:
-        current = time.time()
-        wait = previous + delay - current
-        if wait > 0:
-            time.sleep(wait)
-            previous = current + wait
-        else:
-            previous = current
-
-        request = urllib2.Request("http://blast.ncbi.nlm.nih.gov/Blast.cgi",
-                                  message,
-                                  {"User-Agent":"BiopythonClient"})
-        handle = urllib2.urlopen(request)
+    if cache is not None:
+        filename = _cache_filename(cache, put_query, get_query)
+        if os.path.isfile(filename):
+            handle = open(filename, "rb")
+            results = _as_string(handle.read())
+            handle.close()
+            return StringIO(results)
+
+    if transport is None:
+        transport = _urlopen
+
+    # Send off the initial query to qblast.
+    # Note the NCBI do not currently impose a rate limit here, other
+    # than the request not to make say 50 queries at once using multiple
+    # threads.
+    handle = transport(url_base, _as_bytes(urllib.urlencode(put_query)))
+    rid, rtoe = _parse_qblast_ref_page(handle)
+
+    get_query.insert(-1, ('RID', rid))
+    message = _as_bytes(urllib.urlencode(get_query))
+
+    # Poll NCBI until the results are ready, starting after the estimated
+    # time of execution, then waiting a little longer each time.
+    for delay in _poll_delays(rtoe):
+        time.sleep(delay)
+        handle = transport(url_base, message)
         results = _as_string(handle.read())
 
         # Can see an "\n\n" page while results are in progress,
@@ -176,9 +199,153 @@ def qblast(program, database, sequence,
         if status.upper() == "READY":
             break
 
+    if cache is not None:
+        _cache_write(filename, results)
     return StringIO(results)
 
 
+def qblast_batch(program, database, sequences, max_running=3, **keywds):
+    """Do several BLAST searches at once using the QBLAST server at NCBI.
+
+    Arguments:
+     - program     - As for qblast, e.g. "blastn".
+     - database    - As for qblast, e.g. "nr".
+     - sequences   - List of the sequences to search.
+     - max_running - Largest number of searches sent to the server which
+                     have not finished yet.  Def. 3.
+
+    Any other keyword arguments are passed to qblast for each search, e.g.
+    format_type and cache.  Returns a list of handles to the results, in
+    the order of the sequences.  If any of the searches fails, the first
+    error (in the order of the sequences) is raised once the others have
+    finished.
+
+    Rather than waiting for each search in turn, up to max_running searches
+    are sent and waited for at the same time (each by its own thread).  The
+    NCBI ask you not to send many searches at once, so please keep
+    max_running small.  Searches found in the cache do not count, and
+    identical sequences are only searched once.
+    """
+    import threading
+
+    if max_running < 1:
+        raise ValueError("max_running must be a positive integer")
+    sequences = list(sequences)
+    # index of the search for each different sequence (as sent to qblast)
+    searches = {}
+    unique = []
+    for sequence in sequences:
+        if str(sequence) not in searches:
+            searches[str(sequence)] = len(unique)
+            unique.append(sequence)
+    results = [None] * len(unique)
+    errors = [None] * len(unique)
+    # the searches still to be done, taken by the threads in turn
+    pending = list(range(len(unique)))
+    pending.reverse()
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                index = pending.pop()
+            finally:
+                lock.release()
+            try:
+                results[index] = qblast(program, database, unique[index],
+                                        **keywds)
+            except Exception, err:
+                errors[index] = err
+
+    threads = [threading.Thread(target=worker)
+               for i in range(min(max_running, len(unique)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for err in errors:
+        if err is not None:
+            raise err
+    # a separate handle for each sequence, even if searched only once
+    results = [handle.read() for handle in results]
+    return [StringIO(results[searches[str(sequence)]])
+            for sequence in sequences]
+
+
+def _urlopen(url, message):
+    """Sends the encoded parameters to the URL with an HTTP POST (PRIVATE)."""
+    import urllib2
+    request = urllib2.Request(url, message,
+                              {"User-Agent":"BiopythonClient"})
+    return urllib2.urlopen(request)
+
+
+def _poll_delays(rtoe):
+    """Yields the number of seconds to wait before each poll (PRIVATE).
+
+    The first wait is the estimated time of execution (RTOE), and the
+    following waits start at 3 seconds and grow to a minute.
+    """
+    yield max(rtoe, 0)
+    delay = 3.0
+    while True:
+        yield delay
+        delay = min(delay * 1.5, 60.0)
+
+
+def _cache_filename(cache, put_query, get_query):
+    """Returns the cache file name of a search (PRIVATE).
+
+    The name is the SHA1 digest of the search parameters (in the order
+    qblast sends them), so it only depends on what is searched and how the
+    results are formatted.
+    """
+    digest = sha1()
+    for query in put_query, get_query:
+        for key, value in query:
+            digest.update(_as_bytes("%s=%s\n" % (key, value)))
+        digest.update(_as_bytes("\n"))
+    return os.path.join(cache, digest.hexdigest())
+
+
+def _cache_write(filename, results):
+    """Writes the results to the cache file (PRIVATE).
+
+    The results are written to a new temporary file which is then renamed,
+    so that an interrupted write never leaves a partial cache file, and
+    searches writing the same cache file at once (e.g. from other threads
+    or processes) do not get in each other's way.
+    """
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # another search may have just made it
+            if not os.path.isdir(directory):
+                raise
+    fd, temp_filename = tempfile.mkstemp(suffix=".tmp", dir=directory or None)
+    handle = os.fdopen(fd, "wb")
+    try:
+        handle.write(_as_bytes(results))
+    finally:
+        handle.close()
+    try:
+        os.rename(temp_filename, filename)
+    except OSError:
+        # e.g. on Windows if another search wrote the same file first,
+        # in which case that file is kept
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        if not os.path.isfile(filename):
+            raise
+
+
 def _parse_qblast_ref_page(handle):
     """Extract a tuple of RID, RTOE from the 'please wait' page (PRIVATE).
 
@@ -42,6 +42,26 @@ class _XMLparser(ContentHandler):
         self._value = ''
         self._debug = debug
         self._debug_ignore_list = []
+        # dispatch tables of tag name to bound method (or None), filled in
+        # as the tags are found, to save looking up the method every time
+        self._start_methods = {}
+        self._end_methods = {}
+
+    def _get_method(self, table, prefix, name):
+        """Returns the method for a tag from the given dispatch table (PRIVATE).
+
+        table -- dispatch table, self._start_methods or self._end_methods
+        prefix -- '_start_' or '_end_'
+        name -- name of the tag
+
+        Returns None if this class doesn't define such a method.
+        """
+        try:
+            return table[name]
+        except KeyError:
+            method = getattr(self, self._secure_name(prefix + name), None)
+            table[name] = method
+            return method
 
     def _secure_name(self, name):
         """Removes 'dangerous' from tag names
@@ -63,16 +83,17 @@ class _XMLparser(ContentHandler):
         self._tag.append(name)
 
         # Try to call a method (defined in subclasses)
-        method = self._secure_name('_start_' + name)
+        method = self._get_method(self._start_methods, '_start_', name)
 
         #Note could use try / except AttributeError
         #BUT I found often triggered by nested errors...
-        if hasattr(self, method):
-            eval("self.%s()" % method)
+        if method is not None:
+            method()
             if self._debug > 4:
-                print "NCBIXML: Parsed:  " + method
+                print "NCBIXML: Parsed:  " + method.__name__
         elif self._debug > 3:
             # Doesn't exist (yet) and may want to warn about it
+            method = self._secure_name('_start_' + name)
             if method not in self._debug_ignore_list:
                 print "NCBIXML: Ignored: " + method
                 self._debug_ignore_list.append(method)
@@ -99,21 +120,24 @@ class _XMLparser(ContentHandler):
         # DON'T strip any white space, we may need it e.g. the hsp-midline
 
         # Try to call a method (defined in subclasses)
-        method = self._secure_name('_end_' + name)
+        method = self._get_method(self._end_methods, '_end_', name)
         #Note could use try / except AttributeError
         #BUT I found often triggered by nested errors...
-        if hasattr(self, method):
-            eval("self.%s()" % method)
+        if method is not None:
+            method()
             if self._debug > 2:
-                print "NCBIXML: Parsed:  " + method, self._value
+                print "NCBIXML: Parsed:  " + method.__name__, self._value
         elif self._debug > 1:
             # Doesn't exist (yet) and may want to warn about it
+            method = self._secure_name('_end_' + name)
             if method not in self._debug_ignore_list:
                 print "NCBIXML: Ignored: " + method, self._value
                 self._debug_ignore_list.append(method)
 
         # Reset character buffer
         self._value = ''
+        # and forget the tag, so memory doesn't grow over the file
+        self._tag.pop()
 
 
 class BlastParser(_XMLparser):
@@ -633,9 +657,7 @@ def parse(handle, debug=0):
 
         expat_parser.Parse(text, False)
         while blast_parser._records:
-            record = blast_parser._records[0]
-            blast_parser._records = blast_parser._records[1:]
-            yield record
+            yield blast_parser._records.pop(0)
 
         while True:
             #Read in another block of the file...
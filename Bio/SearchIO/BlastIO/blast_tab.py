@@ -10,9 +10,11 @@ import re
 from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._table import SearchTable, _TableReader
 
 
-__all__ = ['BlastTabIndexer', 'BlastTabParser', 'BlastTabWriter']
+__all__ = ['BlastTabIndexer', 'BlastTabParser', 'BlastTabTableReader',
+        'BlastTabWriter']
 
 
 # longname-shortname map
@@ -135,6 +137,33 @@ _DEFAULT_FIELDS = ['qseqid', 'sseqid', 'pident', 'length', 'mismatch',
 _MIN_QUERY_FIELDS = set(['qseqid', 'qacc', 'qaccver'])
 _MIN_HIT_FIELDS = set(['sseqid', 'sacc', 'saccver'])
 
+# column short name to value caster map, used by BlastTabTableReader
+_COLUMN_CASTER = {}
+for _mapping in (_COLUMN_QRESULT, _COLUMN_HIT, _COLUMN_HSP, _COLUMN_FRAG):
+    for _sname, (_attr_name, _caster) in _mapping.items():
+        _COLUMN_CASTER[_sname] = _caster
+del _mapping, _sname, _attr_name, _caster
+
+
+def _prep_fields(fields):
+    """Validates and formats the given fields for use by the parser."""
+    # cast into list if fields is a space-separated string
+    if isinstance(fields, basestring):
+        fields = fields.strip().split(' ')
+    # blast allows 'std' as a proxy for the standard default lists
+    # we want to transform 'std' to its proper column names
+    if 'std' in fields:
+        idx = fields.index('std')
+        fields = fields[:idx] + _DEFAULT_FIELDS + fields[idx+1:]
+    # if set(fields) has a null intersection with minimum required
+    # fields for hit and query, raise an exception
+    if not set(fields).intersection(_MIN_QUERY_FIELDS) or \
+            not set(fields).intersection(_MIN_HIT_FIELDS):
+        raise ValueError("Required query and/or hit ID field not found.")
+
+    return fields
+
+
 # simple function to create BLAST HSP attributes that may be computed if
 # other certain attributes are present
 # This was previously implemented in the HSP objects in the old model
@@ -221,21 +250,7 @@ class BlastTabParser(object):
 
     def _prep_fields(self, fields):
         """Validates and formats the given fields for use by the parser."""
-        # cast into list if fields is a space-separated string
-        if isinstance(fields, basestring):
-            fields = fields.strip().split(' ')
-        # blast allows 'std' as a proxy for the standard default lists
-        # we want to transform 'std' to its proper column names
-        if 'std' in fields:
-            idx = fields.index('std')
-            fields = fields[:idx] + _DEFAULT_FIELDS + fields[idx+1:]
-        # if set(fields) has a null intersection with minimum required
-        # fields for hit and query, raise an exception
-        if not set(fields).intersection(_MIN_QUERY_FIELDS) or \
-                not set(fields).intersection(_MIN_HIT_FIELDS):
-            raise ValueError("Required query and/or hit ID field not found.")
-
-        return fields
+        return _prep_fields(fields)
 
     def _parse_commented_qresult(self):
         """Iterator returning `QueryResult` objects from a commented file."""
@@ -493,6 +508,60 @@ class BlastTabParser(object):
             # else implicit None return
 
 
+class BlastTabTableReader(_TableReader):
+
+    """Columnar reader for the BLAST tabular format.
+
+    This is used by Bio.SearchIO.read_table, and yields SearchTable objects,
+    each holding at most `chunk_size` rows. The values of each field are put
+    straight into a column, without creating any QueryResult, Hit, HSP, or
+    HSPFragment objects, which makes it suitable for very large files.
+
+    Rows can be filtered while the file is read, using `max_evalue` (rows
+    with a higher 'evalue' are skipped) and `min_ident_pct` (rows with a
+    lower 'pident' are skipped). Use `columns` to only keep some of the
+    fields in the table. Set `top_hits` to only keep the rows of the best
+    `top_hits` hits of each query, by their best 'bitscore', as with
+    Bio.SearchIO.top_hits but without creating the objects of the other hits.
+
+    The objects for the rows which are kept can still be created from the
+    tables, see SearchTable. For commented files, these objects do not have
+    the attributes parsed from the comments (e.g. program or target).
+    """
+
+    _casters = _COLUMN_CASTER
+    _query_fields = ('qseqid', 'qacc', 'qaccver')
+    _hit_fields = ('sseqid', 'sacc', 'saccver')
+    _score_field = 'bitscore'
+
+    def __init__(self, handle, comments=False, fields=_DEFAULT_FIELDS,
+            columns=None, chunk_size=100000, max_evalue=None,
+            min_ident_pct=None, top_hits=None):
+        _TableReader.__init__(self, handle, columns, chunk_size, top_hits)
+        self.has_comments = comments
+        self.fields = _prep_fields(fields)
+        self._add_filter('max_evalue', 'evalue', maximum=max_evalue)
+        self._add_filter('min_ident_pct', 'pident', minimum=min_ident_pct)
+
+    def _rows(self):
+        for line in self.handle:
+            if line.startswith('#'):
+                if self.has_comments and line.startswith('# Fields: '):
+                    raw_field_str = line.strip()[len('# Fields: '):]
+                    fields = _prep_fields([_LONG_SHORT_MAP[long_name]
+                            for long_name in raw_field_str.split(', ')])
+                    if fields != self.fields:
+                        self.fields = fields
+                continue
+            values = line.strip().split('\t')
+            if values != ['']:
+                yield self.fields, values, line
+
+    def _make_table(self, fields, names, columns, lines):
+        parser = lambda handle: BlastTabParser(handle, fields=fields)
+        return SearchTable(list(names), columns, lines, parser)
+
+
 class BlastTabIndexer(SearchIndexer):
 
     """Indexer class for BLAST+ tab output."""
@@ -95,17 +95,28 @@ class BlastTextParser(object):
                             bhsp.sbjct_end) - 1
                     frag.hit_end = max(bhsp.sbjct_start, bhsp.sbjct_end)
                     # set query, hit sequences and its annotation
-                    qseq = ''
-                    hseq = ''
-                    midline = ''
-                    for seqtrio in zip(bhsp.query, bhsp.sbjct, bhsp.match):
-                        qchar, hchar, mchar = seqtrio
-                        if qchar == ' ' or hchar == ' ':
-                            assert all([' ' == x for x in seqtrio])
-                        else:
-                            qseq += qchar
-                            hseq += hchar
-                            midline += mchar
+                    if ' ' not in bhsp.query and ' ' not in bhsp.sbjct:
+                        # the usual case, no blank columns to remove
+                        aln_len = min(len(bhsp.query), len(bhsp.sbjct),
+                                len(bhsp.match))
+                        qseq = bhsp.query[:aln_len]
+                        hseq = bhsp.sbjct[:aln_len]
+                        midline = bhsp.match[:aln_len]
+                    else:
+                        qseq = ''
+                        hseq = ''
+                        midline = ''
+                        for seqtrio in zip(bhsp.query, bhsp.sbjct,
+                                bhsp.match):
+                            qchar, hchar, mchar = seqtrio
+                            if qchar == ' ' or hchar == ' ':
+                                assert all([' ' == x for x in seqtrio])
+                            else:
+                                qseq += qchar
+                                hseq += hchar
+                                midline += mchar
+                    # the sequences are only made into SeqRecord objects
+                    # when used (see HSPFragment)
                     frag.query, frag.hit = qseq, hseq
                     frag.aln_annotation['homology'] = midline
 
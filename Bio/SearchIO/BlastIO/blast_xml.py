@@ -75,6 +75,17 @@ _ELEM_FRAG = {
     'Hsp_hseq': ('hit', str),
     'Hsp_qseq': ('query', str),
 }
+# tag - (object, attribute name, caster) dispatch table for the children of
+# each <Hsp> element, so they are all handled in a single pass
+_ELEM_HSP_DISPATCH = {'Hsp_midline': ('midline', None, str)}
+for _target, _mapping in (('hsp', _ELEM_HSP), ('frag', _ELEM_FRAG)):
+    for _tag, (_attr_name, _caster) in _mapping.items():
+        if _tag.endswith('-from') or _tag.endswith('-to'):
+            # coordinates are adjusted after all of them are read
+            _ELEM_HSP_DISPATCH[_tag] = ('coord', _attr_name, _caster)
+        else:
+            _ELEM_HSP_DISPATCH[_tag] = (_target, _attr_name, _caster)
+del _target, _mapping, _tag, _attr_name, _caster
 # dictionary for mapping tag name and meta key name
 _ELEM_META = {
     'BlastOutput_db': ('target', str),
@@ -199,6 +210,8 @@ class BlastXmlParser(object):
         meta = {}
         # dictionary for fallback information
         fallback = {}
+        # parent of the <Iteration> elements, to remove them once parsed
+        self._iterations_elem = None
 
         # parse the preamble part (anything prior to the first result)
         for event, elem in self.xml_iter:
@@ -228,8 +241,11 @@ class BlastXmlParser(object):
                 elem.clear()
                 continue
 
-            if event == 'start' and elem.tag == 'Iteration':
-                break
+            if event == 'start':
+                if elem.tag == 'BlastOutput_iterations':
+                    self._iterations_elem = elem
+                elif elem.tag == 'Iteration':
+                    break
 
         # we only want the version number, sans the program name or date
         if meta.get('version') is not None:
@@ -334,8 +350,11 @@ class BlastXmlParser(object):
                                 value = caster(value)
                             setattr(qresult, val_info[0], value)
 
-                # delete element after we finish parsing it
+                # delete element after we finish parsing it, and drop it
+                # from its parent so memory use stays flat over the file
                 qresult_elem.clear()
+                if self._iterations_elem is not None:
+                    self._iterations_elem.remove(qresult_elem)
                 yield qresult
 
     def _parse_hit(self, root_hit_elem, query_id):
@@ -436,27 +455,43 @@ class BlastXmlParser(object):
         if root_hsp_frag_elem is None:
             root_hsp_frag_elem = []
 
+        # set alphabet, based on program
+        prog = self._meta.get('program')
+        if prog == 'blastn':
+            alphabet = generic_dna
+        elif prog in ['blastp', 'blastx', 'tblastn', 'tblastx']:
+            alphabet = generic_protein
+        else:
+            alphabet = None
+
         for hsp_frag_elem in root_hsp_frag_elem:
             coords = {}  # temporary container for coordinates
+            hsp_attrs = []  # set once the HSP object is created
+            midline = None
             frag = HSPFragment(hit_id, query_id)
-            for key, val_info in _ELEM_FRAG.items():
-                value = hsp_frag_elem.findtext(key)
-                caster = val_info[1]
-
-                # adjust 'from' and 'to' coordinates to 0-based ones
-                if value is not None:
-                    if key.endswith('-from') or key.endswith('-to'):
-                        # store coordinates for further processing
-                        coords[val_info[0]] = caster(value)
-                        continue
-                    # recast only if value is not intended to be str
-                    elif caster is not str:
-                        value = caster(value)
-                    setattr(frag, val_info[0], value)
+            # go through the child elements once, using the dispatch table
+            for child in hsp_frag_elem:
+                try:
+                    target, attr_name, caster = \
+                            _ELEM_HSP_DISPATCH[child.tag]
+                except KeyError:
+                    continue
+                value = child.text or ''
+                # recast only if value is not intended to be str
+                if caster is not str:
+                    value = caster(value)
+                if target == 'frag':
+                    setattr(frag, attr_name, value)
+                elif target == 'hsp':
+                    hsp_attrs.append((attr_name, value))
+                elif target == 'coord':
+                    # store coordinates for further processing
+                    coords[attr_name] = value
+                else:
+                    midline = value
 
             # set the homology characters into aln_annotation dict
-            frag.aln_annotation['homology'] = \
-                    hsp_frag_elem.findtext('Hsp_midline')
+            frag.aln_annotation['homology'] = midline
 
             # process coordinates
             # since 'x-from' could be bigger than 'x-to', we need to figure
@@ -475,21 +510,12 @@ class BlastXmlParser(object):
                     setattr(frag, start_type, min(start, end) - 1)
                     setattr(frag, end_type, max(start, end))
 
-            # set alphabet, based on program
-            prog = self._meta.get('program')
-            if prog == 'blastn':
-                frag.alphabet = generic_dna
-            elif prog in ['blastp', 'blastx', 'tblastn', 'tblastx']:
-                frag.alphabet = generic_protein
+            if alphabet is not None:
+                frag.alphabet = alphabet
 
             hsp = HSP([frag])
-            for key, val_info in _ELEM_HSP.items():
-                value = hsp_frag_elem.findtext(key)
-                caster = val_info[1]
-                if value is not None:
-                    if caster is not str:
-                        value = caster(value)
-                    setattr(hsp, val_info[0], value)
+            for attr_name, value in hsp_attrs:
+                setattr(hsp, attr_name, value)
             # delete element after we finish parsing it
             hsp_frag_elem.clear()
             yield hsp
@@ -575,10 +601,15 @@ class BlastXmlIndexer(SearchIndexer):
         handle = self._handle
         handle.seek(offset)
 
-        qresult_raw = handle.readline()
-        assert qresult_raw.lstrip().startswith(self.qstart_mark)
-        while qend_mark not in qresult_raw:
-            qresult_raw += handle.readline()
+        line = handle.readline()
+        assert line.lstrip().startswith(self.qstart_mark)
+        # only check the new line for the end mark, as searching the whole
+        # (growing) string each time makes this quadratic in the query size
+        lines = [line]
+        while line and qend_mark not in line:
+            line = handle.readline()
+            lines.append(line)
+        qresult_raw = _empty_bytes_string.join(lines)
         assert qresult_raw.rstrip().endswith(qend_mark)
         assert qresult_raw.count(qend_mark) == 1
         # Note this will include any leading and trailing whitespace, in
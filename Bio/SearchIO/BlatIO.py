@@ -51,6 +51,21 @@ to your output file.
     SearchIO.write(qresult, 'header.psl', header=True)
     <stdout> (1, 10, 19, 23)
 
+Very large PSL(X) files (e.g. of whole genome alignments) can also be read by
+column with Bio.SearchIO.read_table, which gives BlatPslTable objects instead
+of QueryResult objects. The block sizes and starts of all the rows in a table
+are kept in single integer arrays, and the identity, score and coverage of all
+the rows are computed at once. The rows can then be written back to a file
+(with any changes made to the columns) without creating any objects.
+
+    >>> table = SearchIO.read_table(psl, 'blat-psl').next()
+    >>> table
+    BlatPslTable(fields=[...], 19 rows)
+    >>> print table['tname'][3], list(table.blocks('blocksizes', 3))
+    chr2 [6, 38]
+    >>> print "%0.2f %i" % (table.ident_pct()[3], table.score()[3])
+    84.09 41
+
 Note that the number of HSPFragments written may exceed the number of HSP
 objects. This is because in PSL files, it is possible to have single matches
 consisting of noncontiguous sequence fragments. This is where the HSPFragment
@@ -179,15 +194,23 @@ HSP and HSPFragment documentation for more details on these properties.
 """
 
 import re
-from math import log
+from array import array
+from math import floor, log
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio.Alphabet import generic_dna
 from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._table import SearchTable, _TableReader
 
 
-__all__ = ['BlatPslParser', 'BlatPslIndexer', 'BlatPslWriter']
+__all__ = ['BlatPslParser', 'BlatPslIndexer', 'BlatPslWriter',
+        'BlatPslTableReader']
 
 
 # precompile regex patterns
@@ -195,6 +218,23 @@ _PTR_ROW_CHECK = r'^\d+\s+\d+\s+\d+\s+\d+'
 _RE_ROW_CHECK = re.compile(_PTR_ROW_CHECK)
 _RE_ROW_CHECK_IDX = re.compile(_as_bytes(_PTR_ROW_CHECK))
 
+# names of the PSL columns, as used by BlatPslTable (and the parser), in order
+_PSL_FIELDS = ['matches', 'mismatches', 'repmatches', 'ncount',
+        'qnuminsert', 'qbaseinsert', 'tnuminsert', 'tbaseinsert', 'strand',
+        'qname', 'qsize', 'qstart', 'qend', 'tname', 'tsize', 'tstart',
+        'tend', 'blockcount', 'blocksizes', 'qstarts', 'tstarts']
+# and the extra PSLX columns
+_PSLX_FIELDS = _PSL_FIELDS + ['qseqs', 'tseqs']
+# columns with one comma-separated value per block
+_PSL_BLOCK_FIELDS = ('blocksizes', 'qstarts', 'tstarts', 'qseqs', 'tseqs')
+# types of the non-string columns
+_PSL_CASTERS = {}
+for _field in _PSL_FIELDS:
+    if _field not in _PSL_BLOCK_FIELDS and _field not in ('strand', 'qname',
+            'tname'):
+        _PSL_CASTERS[_field] = int
+del _field
+
 
 def _list_from_csv(csv_string, caster=None):
     """Transforms the given comma-separated string into a list.
@@ -507,6 +547,353 @@ class BlatPslParser(object):
             self.line = self.handle.readline()
 
 
+class BlatPslTable(SearchTable):
+
+    """Chunk of rows from a BLAT PSL(X) file, stored by column.
+
+    The columns are named as in the PSL format, in lower case (e.g. 'qname',
+    'matches', 'tstart', 'blocksizes'), and the values are as written in the
+    file. See SearchTable for the common methods.
+
+    The block columns ('blocksizes', 'qstarts' and 'tstarts', and 'qseqs'
+    and 'tseqs' for PSLX) hold the values of all the blocks in the table,
+    one row after the other, as a single integer array (or list of strings).
+    The blocks of the row at index i are those from `block_offsets[i]` up to
+    `block_offsets[i + 1]`, which the `blocks` method returns. As with the
+    other columns, the arrays can be changed in place (e.g. to move the
+    alignments to other coordinates) before writing the table out with the
+    `write` method.
+
+    The identity, score and coverage of every row are computed at once, as
+    arrays (using NumPy, if it is installed).
+    """
+
+    def __init__(self, fields, columns, lines, parser, pslx):
+        SearchTable.__init__(self, fields, columns, lines, parser)
+        self.pslx = pslx
+        # split the comma-separated values of the block columns, counting
+        # the blocks of each row from the first one
+        self.block_offsets = None
+        for name in _PSL_BLOCK_FIELDS:
+            if name not in self._columns:
+                continue
+            values = self._columns[name]
+            if self.block_offsets is None:
+                offsets = array('l', [0])
+                total = 0
+                for value in values:
+                    total += value.rstrip(',').count(',') + 1
+                    offsets.append(total)
+                self.block_offsets = offsets
+            blocks = filter(None, ','.join(values).split(','))
+            if len(blocks) != self.block_offsets[-1]:
+                raise ValueError("Column %r has %i blocks, expected %i"
+                        % (name, len(blocks), self.block_offsets[-1]))
+            if name in ('qseqs', 'tseqs'):
+                self._columns[name] = blocks
+            else:
+                self._columns[name] = array('l', map(int, blocks))
+
+    def rows(self):
+        """Iterates over the rows as tuples of values, in field order.
+
+        The values of the block columns are arrays (or lists, for sequences)
+        of the row's blocks.
+        """
+        columns = []
+        for field in self.fields:
+            if field in _PSL_BLOCK_FIELDS:
+                columns.append([self.blocks(field, i)
+                        for i in range(len(self))])
+            else:
+                columns.append(self._columns[field])
+        return iter(zip(*columns))
+
+    def blocks(self, field, index):
+        """Returns the values of the given block column for one row."""
+        if field not in _PSL_BLOCK_FIELDS:
+            raise ValueError("Field %r is not a block column" % field)
+        offsets = self.block_offsets
+        return self[field][offsets[index]:offsets[index + 1]]
+
+    def take(self, indexes):
+        """Returns a new table with only the rows at the given indexes.
+
+        The rows are in the order of the given indexes.
+        """
+        obj = SearchTable.take(self, indexes)
+        offsets = self.block_offsets
+        if offsets is None:
+            return obj
+        obj.block_offsets = array('l', [0])
+        for i in indexes:
+            obj.block_offsets.append(obj.block_offsets[-1] + offsets[i + 1]
+                    - offsets[i])
+        for field in self.fields:
+            if field in _PSL_BLOCK_FIELDS:
+                column = self._columns[field]
+                values = column[:0]
+                for i in indexes:
+                    values.extend(column[offsets[i]:offsets[i + 1]])
+                obj._columns[field] = values
+        return obj
+
+    def _arrays(self, *fields):
+        """Returns the given integer columns as NumPy arrays (no copying)."""
+        return [numpy.frombuffer(self[field], numpy.int_)
+                if len(self[field]) else numpy.zeros(0, numpy.int_)
+                for field in fields]
+
+    def is_protein(self):
+        """Returns whether the query of each row is a protein, as an array.
+
+        As in the parser, a query is taken to be a protein if the hit strand
+        is given and the last block covers three times its size in the hit.
+        """
+        offsets = self.block_offsets
+        last = [offsets[i + 1] - 1 for i in range(len(self))]
+        sizes = self['blocksizes']
+        tstarts = self['tstarts']
+        flags = array('b')
+        for strand, idx, tsize, tstart, tend in zip(self['strand'], last,
+                self['tsize'], self['tstart'], self['tend']):
+            end = tstarts[idx] + 3 * sizes[idx]
+            if strand[1:] == '+':
+                flags.append(tend == end)
+            elif strand[1:] == '-':
+                flags.append(tstart == tsize - end)
+            else:
+                flags.append(False)
+        return flags
+
+    def score(self):
+        """Returns the BLAT score of each row, as an array.
+
+        This is the same as the `score` attribute of the parsed HSP objects,
+        see http://genome.ucsc.edu/FAQ/FAQblat.html#blat4
+        """
+        if numpy is not None:
+            matches, mismatches, repmatches, qnuminsert, tnuminsert = \
+                    self._arrays('matches', 'mismatches', 'repmatches',
+                        'qnuminsert', 'tnuminsert')
+            size_mul = numpy.where(numpy.array(self.is_protein(), bool), 3,
+                    1)
+            scores = size_mul * (matches + (repmatches >> 1)) - \
+                    size_mul * mismatches - qnuminsert - tnuminsert
+            return array('l', scores.tolist())
+        scores = array('l')
+        for row in zip(self.is_protein(), self['matches'],
+                self['mismatches'], self['repmatches'], self['qnuminsert'],
+                self['tnuminsert']):
+            is_protein, matches, mismatches, repmatches, qnuminsert, \
+                    tnuminsert = row
+            size_mul = 3 if is_protein else 1
+            scores.append(size_mul * (matches + (repmatches >> 1)) -
+                    size_mul * mismatches - qnuminsert - tnuminsert)
+        return scores
+
+    def ident_pct(self):
+        """Returns the percent identity of each row, as an array.
+
+        This is the same as the `ident_pct` attribute of the parsed HSP
+        objects, see http://genome.ucsc.edu/FAQ/FAQblat.html#blat4
+        """
+        if numpy is not None:
+            matches, mismatches, repmatches, qnuminsert, qstart, qend, \
+                    tstart, tend = self._arrays('matches', 'mismatches',
+                        'repmatches', 'qnuminsert', 'qstart', 'qend',
+                        'tstart', 'tend')
+            size_mul = numpy.where(numpy.array(self.is_protein(), bool), 3,
+                    1)
+            qali_size = size_mul * (qend - qstart)
+            tali_size = tend - tstart
+            size_dif = numpy.maximum(qali_size - tali_size, 0)
+            total = size_mul * (matches + repmatches + mismatches)
+            # Python's round, as used by the parser, rounds halves up here
+            millibad = 1000.0 * (mismatches * size_mul + qnuminsert +
+                    numpy.floor(3 * numpy.log(1 + size_dif) + 0.5)) / \
+                    numpy.maximum(total, 1)
+            millibad[(numpy.minimum(qali_size, tali_size) <= 0) |
+                    (total == 0)] = 0
+            return array('d', (100.0 - millibad * 0.1).tolist())
+        pcts = array('d')
+        for row in zip(self.is_protein(), self['matches'],
+                self['mismatches'], self['repmatches'], self['qnuminsert'],
+                self['qstart'], self['qend'], self['tstart'], self['tend']):
+            is_protein, matches, mismatches, repmatches, qnuminsert, \
+                    qstart, qend, tstart, tend = row
+            size_mul = 3 if is_protein else 1
+            qali_size = size_mul * (qend - qstart)
+            tali_size = tend - tstart
+            size_dif = max(qali_size - tali_size, 0)
+            total = size_mul * (matches + repmatches + mismatches)
+            millibad = 0
+            if min(qali_size, tali_size) > 0 and total != 0:
+                millibad = 1000.0 * (mismatches * size_mul + qnuminsert +
+                        floor(3 * log(1 + size_dif) + 0.5)) / total
+            pcts.append(100.0 - millibad * 0.1)
+        return pcts
+
+    def _aligned(self):
+        """Returns the sum of the block sizes of each row."""
+        offsets = self.block_offsets
+        if numpy is not None:
+            sizes, = self._arrays('blocksizes')
+            if not len(sizes):
+                return numpy.zeros(0, numpy.int_)
+            return numpy.add.reduceat(sizes, numpy.array(offsets[:-1],
+                    numpy.int_))
+        sizes = self['blocksizes']
+        return [sum(sizes[offsets[i]:offsets[i + 1]])
+                for i in range(len(self))]
+
+    def query_coverage(self):
+        """Returns the fraction of the query covered by each row's blocks,
+        as an array."""
+        return array('d', [float(size) / length for size, length in
+                zip(self._aligned(), self['qsize'])])
+
+    def hit_coverage(self):
+        """Returns the fraction of the hit covered by each row's blocks, as
+        an array (the blocks of protein queries cover three times their
+        size in the hit)."""
+        return array('d', [(is_protein and 3.0 or 1.0) * size / length
+                for size, length, is_protein in zip(self._aligned(),
+                    self['tsize'], self.is_protein())])
+
+    def block_starts(self, seq_type):
+        """Returns the start of each block on the plus strand, as an array.
+
+        Arguments:
+         - seq_type - 'query' (for the 'qstarts' column) or 'hit' (for the
+                      'tstarts' column).
+
+        The block starts of minus strand alignments are counted from the end
+        of the sequence in PSL files. This gives them from the start, like
+        the `query_start` and `hit_start` attributes of the parsed
+        HSPFragment objects.
+        """
+        if seq_type == 'query':
+            field, size_field = 'qstarts', 'qsize'
+            # as in the parser, protein queries are not reoriented
+            minus = [strand[:1] == '-' and not is_protein for strand,
+                    is_protein in zip(self['strand'], self.is_protein())]
+        elif seq_type == 'hit':
+            field, size_field = 'tstarts', 'tsize'
+            minus = [strand[1:] == '-' for strand in self['strand']]
+        else:
+            raise ValueError("seq_type must be 'query' or 'hit', not %r"
+                    % seq_type)
+        offsets = self.block_offsets
+        if numpy is not None:
+            starts, sizes = self._arrays(field, 'blocksizes')
+            # the row of each block
+            rows = numpy.repeat(numpy.arange(len(self)),
+                    numpy.diff(numpy.array(offsets, numpy.int_)))
+            lengths = numpy.array(self[size_field], numpy.int_)[rows]
+            starts = numpy.where(numpy.array(minus, bool)[rows],
+                    lengths - starts - sizes, starts)
+            return array('l', starts.tolist())
+        starts = array('l', self[field])
+        sizes = self['blocksizes']
+        for i, length in enumerate(self[size_field]):
+            if minus[i]:
+                for j in range(offsets[i], offsets[i + 1]):
+                    starts[j] = length - starts[j] - sizes[j]
+        return starts
+
+    def write(self, handle, header=False):
+        """Writes the rows to the given handle in the PSL(X) format.
+
+        Arguments:
+         - handle - Handle to write to.
+         - header - Whether to write a 'psLayout version 3' header first.
+
+        The rows are written from the columns, so any changes to them are
+        written out too. Returns the number of rows written.
+        """
+        if self.pslx:
+            fields = _PSLX_FIELDS
+        else:
+            fields = _PSL_FIELDS
+        for field in fields:
+            if field not in self._columns:
+                raise ValueError("Writing needs the %r column, which is "
+                        "not in the table" % field)
+        if header:
+            handle.write(BlatPslWriter(handle)._build_header())
+        offsets = self.block_offsets
+        columns = []
+        for field in fields:
+            values = self._columns[field]
+            if field in _PSL_BLOCK_FIELDS:
+                values = map(str, values)
+                values = [','.join(values[offsets[i]:offsets[i + 1]]) + ','
+                        for i in range(len(self))]
+            elif field in _PSL_CASTERS:
+                values = map(str, values)
+            columns.append(values)
+        handle.write(''.join(['\t'.join(row) + '\n' for row in
+                zip(*columns)]))
+        return len(self)
+
+
+class BlatPslTableReader(_TableReader):
+
+    """Columnar reader for the BLAT PSL format.
+
+    This is used by Bio.SearchIO.read_table, and yields BlatPslTable
+    objects, each holding at most `chunk_size` rows. The values of each
+    column are read straight into the table, without creating any
+    QueryResult, Hit, HSP, or HSPFragment objects, which makes it suitable
+    for very large (e.g. whole genome) files. Set `pslx` to True for PSLX
+    files, and use `columns` to only keep some of the columns in the table.
+    Set `top_hits` to only keep the rows of the best `top_hits` hits of each
+    query, by the best BLAT score of their rows (see BlatPslTable.score),
+    without creating the objects of the other hits.
+    """
+
+    _casters = _PSL_CASTERS
+    _query_fields = ('qname',)
+    _hit_fields = ('tname',)
+
+    def __init__(self, handle, pslx=False, columns=None, chunk_size=100000,
+            top_hits=None):
+        _TableReader.__init__(self, handle, columns, chunk_size, top_hits)
+        self.pslx = pslx
+
+    def _score_function(self, fields):
+        def score(values):
+            # only the values _is_protein and _calc_score need
+            psl = {'strand': values[8],
+                    'blocksizes': _list_from_csv(values[18], int),
+                    'tstarts': _list_from_csv(values[20], int)}
+            for idx in (0, 1, 2, 4, 6, 14, 15, 16):
+                psl[fields[idx]] = int(values[idx])
+            return _calc_score(psl, _is_protein(psl))
+        return score
+
+    def _rows(self):
+        if self.pslx:
+            fields = _PSLX_FIELDS
+        else:
+            fields = _PSL_FIELDS
+        # skip the header, as in BlatPslParser
+        for line in self.handle:
+            if re.search(_RE_ROW_CHECK, line.strip()):
+                yield fields, filter(None, line.strip().split('\t')), line
+                break
+        for line in self.handle:
+            values = filter(None, line.strip().split('\t'))
+            if values:
+                yield fields, values, line
+
+    def _make_table(self, fields, names, columns, lines):
+        pslx = self.pslx
+        parser = lambda handle: BlatPslParser(handle, pslx=pslx)
+        return BlatPslTable(list(names), columns, lines, parser, pslx)
+
+
 class BlatPslIndexer(SearchIndexer):
 
     """Indexer class for BLAT PSL output."""
@@ -614,11 +1001,11 @@ class BlatPslWriter(object):
         header = 'psLayout version 3\n'
 
         # adapted from BLAT's source: lib/psl.c#L496
-        header += "\nmatch\tmis- \trep. \tN's\tQ gap\tQ gap\tT gap\tT "
-        "gap\tstrand\tQ        \tQ   \tQ    \tQ  \tT        \tT   \tT    "
+        header += "\nmatch\tmis- \trep. \tN's\tQ gap\tQ gap\tT gap\tT " \
+        "gap\tstrand\tQ        \tQ   \tQ    \tQ  \tT        \tT   \tT    " \
         "\tT  \tblock\tblockSizes \tqStarts\t tStarts\n     " \
-        "\tmatch\tmatch\t   \tcount\tbases\tcount\tbases\t      \tname     "
-        "\tsize\tstart\tend\tname     \tsize\tstart\tend\tcount"
+        "\tmatch\tmatch\t   \tcount\tbases\tcount\tbases\t      \tname     " \
+        "\tsize\tstart\tend\tname     \tsize\tstart\tend\tcount" \
         "\n%s\n" % ('-' * 159)
 
         return header
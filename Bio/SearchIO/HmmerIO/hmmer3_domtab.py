@@ -5,14 +5,38 @@
 
 """Bio.SearchIO parser for HMMER domain table output format."""
 
+from array import array
 from itertools import chain
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from Bio.Alphabet import generic_protein
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._table import SearchTable, _TableReader
 
 from hmmer3_tab import Hmmer3TabParser, Hmmer3TabIndexer
 
 
+# names of the domain table columns, as used by Hmmer3DomtabTable, in order
+_DOMTAB_FIELDS = ['target_name', 'target_accession', 'tlen', 'query_name',
+        'query_accession', 'qlen', 'evalue', 'score', 'bias', 'domain_index',
+        'domain_count', 'c_evalue', 'i_evalue', 'domain_score',
+        'domain_bias', 'hmm_from', 'hmm_to', 'ali_from', 'ali_to',
+        'env_from', 'env_to', 'acc', 'description']
+# types of the non-string columns
+_DOMTAB_CASTERS = {}
+for _field in ('tlen', 'qlen', 'domain_index', 'domain_count', 'hmm_from',
+        'hmm_to', 'ali_from', 'ali_to', 'env_from', 'env_to'):
+    _DOMTAB_CASTERS[_field] = int
+for _field in ('evalue', 'score', 'bias', 'c_evalue', 'i_evalue',
+        'domain_score', 'domain_bias', 'acc'):
+    _DOMTAB_CASTERS[_field] = float
+del _field
+
+
 class Hmmer3DomtabParser(Hmmer3TabParser):
 
     """Base hmmer3-domtab iterator."""
@@ -167,6 +191,198 @@ class Hmmer3DomtabHmmqueryParser(Hmmer3DomtabParser):
     hmm_as_hit = False
 
 
+class Hmmer3DomtabTable(SearchTable):
+
+    """Chunk of rows from a HMMER domain table, stored by column.
+
+    The columns are named as in _DOMTAB_FIELDS (e.g. 'query_name',
+    'domain_score', 'i_evalue', 'ali_from'), and the coordinates are as
+    written in the file (one-based, inclusive). See SearchTable for the
+    common methods.
+
+    In addition, the coverage of each domain can be computed, and a set of
+    non-overlapping domains chosen for each sequence.
+    """
+
+    def __init__(self, fields, columns, lines, parser, hmm_as_hit):
+        SearchTable.__init__(self, fields, columns, lines, parser)
+        self.hmm_as_hit = hmm_as_hit
+        # for hmmscan, the sequence is the query and the HMM the target
+        if hmm_as_hit:
+            self.hmm_len_field, self.seq_field, self.seq_len_field = \
+                    'tlen', 'query_name', 'qlen'
+        else:
+            self.hmm_len_field, self.seq_field, self.seq_len_field = \
+                    'qlen', 'target_name', 'tlen'
+
+    def _coverage(self, start_field, end_field, len_field):
+        """Returns the fraction of the length covered by each row."""
+        return array('d', [(end - start + 1) / float(length)
+                for start, end, length in zip(self[start_field],
+                    self[end_field], self[len_field])])
+
+    def hmm_coverage(self):
+        """Returns the fraction of the HMM covered by each domain, as an array.
+        """
+        return self._coverage('hmm_from', 'hmm_to', self.hmm_len_field)
+
+    def seq_coverage(self):
+        """Returns the fraction of the sequence covered by each domain, as an
+        array (using the alignment coordinates)."""
+        return self._coverage('ali_from', 'ali_to', self.seq_len_field)
+
+    def resolve_overlaps(self, score_field='domain_score', max_overlap=0,
+            env=False):
+        """Returns the indexes of the best non-overlapping domains.
+
+        Arguments:
+         - score_field - Field of the domain scores, higher being better.
+         - max_overlap - Number of residues by which the kept domains of a
+                         sequence may overlap.
+         - env         - Whether to use the envelope coordinates instead of
+                         the alignment coordinates.
+
+        For each sequence, the domains are taken from the best score down,
+        skipping any that overlap a domain already taken (ties are taken in
+        table order). The indexes of the domains taken are returned in table
+        order, so `table.take(table.resolve_overlaps())` gives a table of
+        them.
+
+        With NumPy, this is done for all the sequences at once, taking the
+        best remaining domain of each sequence in turn.
+
+        Note that all the domains of a sequence must be in this table. The
+        rows of hmmsearch and phmmer output are sorted by query (i.e. HMM),
+        so the domains of a sequence may be anywhere in the file, and they
+        should be read as a single table (using a large `chunk_size`).
+        """
+        if env:
+            start_field, end_field = 'env_from', 'env_to'
+        else:
+            start_field, end_field = 'ali_from', 'ali_to'
+        seqs = self[self.seq_field]
+        starts = self[start_field]
+        ends = self[end_field]
+        scores = self[score_field]
+        if numpy is not None:
+            return _resolve_overlaps_array(seqs, starts, ends, scores,
+                    max_overlap)
+        # sort by sequence, then best score first (stable, so ties keep
+        # their table order), then take domains greedily
+        order = sorted(range(len(seqs)), key=lambda i: (seqs[i], -scores[i]))
+        kept = []
+        seq, taken = None, []
+        for i in order:
+            if seqs[i] != seq:
+                seq, taken = seqs[i], []
+            start, end = starts[i] - 1, ends[i]
+            for taken_start, taken_end in taken:
+                if min(end, taken_end) - max(start, taken_start) > max_overlap:
+                    break
+            else:
+                taken.append((start, end))
+                kept.append(i)
+        kept.sort()
+        return kept
+
+
+def _resolve_overlaps_array(seqs, starts, ends, scores, max_overlap):
+    """Implements Hmmer3DomtabTable.resolve_overlaps using NumPy (PRIVATE).
+
+    Each round takes the best remaining domain of every sequence at once,
+    and drops the remaining domains which overlap it, so the number of
+    rounds is the largest number of domains kept for a sequence.
+    """
+    seq_codes = numpy.unique(seqs, return_inverse=True)[1]
+    starts = numpy.asarray(starts) - 1
+    ends = numpy.asarray(ends)
+    scores = numpy.asarray(scores)
+    alive = numpy.arange(len(seq_codes))
+    kept = []
+    while len(alive):
+        # sort by sequence, then best score first (lexsort is stable)
+        alive = alive[numpy.lexsort((-scores[alive], seq_codes[alive]))]
+        first = numpy.ones(len(alive), bool)
+        first[1:] = seq_codes[alive[1:]] != seq_codes[alive[:-1]]
+        best = alive[first]
+        kept.append(best)
+        # the best domain of each row's sequence
+        best = best[numpy.cumsum(first) - 1]
+        overlap = numpy.minimum(ends[alive], ends[best]) - \
+                numpy.maximum(starts[alive], starts[best])
+        alive = alive[(overlap <= max_overlap) & ~first]
+    if not kept:
+        return []
+    return sorted(numpy.concatenate(kept).tolist())
+
+
+class Hmmer3DomtabTableReader(_TableReader):
+
+    """Base columnar reader for the HMMER domain table format.
+
+    This is used by Bio.SearchIO.read_table, and yields Hmmer3DomtabTable
+    objects, each holding at most `chunk_size` rows (domains). The values
+    of each column are read straight into the table, without creating any
+    QueryResult, Hit, HSP, or HSPFragment objects.
+
+    Rows can be filtered while the file is read, using `max_evalue` (rows
+    with a higher independent E-value, 'i_evalue', are skipped) and
+    `min_bitscore` (rows with a lower domain score, 'domain_score', are
+    skipped). Use `columns` to only keep some of the columns in the table.
+    Set `top_hits` to only keep the domains of the best `top_hits` targets
+    of each query, by their best domain score, as with Bio.SearchIO.top_hits
+    but without creating the objects of the other targets.
+    """
+
+    _casters = _DOMTAB_CASTERS
+    _query_fields = ('query_name',)
+    _hit_fields = ('target_name',)
+    _score_field = 'domain_score'
+
+    def __init__(self, handle, columns=None, chunk_size=100000,
+            max_evalue=None, min_bitscore=None, top_hits=None):
+        _TableReader.__init__(self, handle, columns, chunk_size, top_hits)
+        self._add_filter('max_evalue', 'i_evalue', maximum=max_evalue)
+        self._add_filter('min_bitscore', 'domain_score',
+                minimum=min_bitscore)
+
+    def _rows(self):
+        fields = _DOMTAB_FIELDS
+        for line in self.handle:
+            if line.startswith('#'):
+                continue
+            cols = line.split()
+            if not cols:
+                continue
+            # as in Hmmer3DomtabParser, join the description columns
+            if len(cols) > 23:
+                cols[22] = ' '.join(cols[22:])
+                del cols[23:]
+            elif len(cols) == 22:
+                cols.append('')
+            yield fields, cols, line
+
+    def _make_table(self, fields, names, columns, lines):
+        return Hmmer3DomtabTable(list(names), columns, lines, self._parser,
+                self._parser.hmm_as_hit)
+
+
+class Hmmer3DomtabHmmhitTableReader(Hmmer3DomtabTableReader):
+
+    """Columnar reader for the HMMER domain table format that assumes HMM
+    profile coordinates are hit coordinates."""
+
+    _parser = Hmmer3DomtabHmmhitParser
+
+
+class Hmmer3DomtabHmmqueryTableReader(Hmmer3DomtabTableReader):
+
+    """Columnar reader for the HMMER domain table format that assumes HMM
+    profile coordinates are query coordinates."""
+
+    _parser = Hmmer3DomtabHmmqueryParser
+
+
 class Hmmer3DomtabHmmhitIndexer(Hmmer3TabIndexer):
 
     """Indexer class for HMMER domain table output that assumes HMM profile
@@ -7,8 +7,9 @@
 
 The SearchIO submodule provides parsers, indexers, and writers for outputs from
 various sequence search programs. It provides an API similar to SeqIO and
-AlignIO, with the following main functions: `parse`, `read`, `to_dict`, `index`,
-`index_db`, `write`, and `convert`.
+AlignIO, with the following main functions: `parse`, `read`,
+`parse_parallel`, `read_table`, `to_dict`, `top_hits`, `reciprocal_best_hits`,
+`index`, `index_db`, `write`, and `convert`.
 
 SearchIO parses a search output file's contents into a hierarchy of four nested
 objects: QueryResult, Hit, HSP, and HSPFragment. Each of them models a part of
@@ -66,6 +67,26 @@ functions Bio.SearchIO.index(...) or Bio.SearchIO.index_db(...). They have a
 similar interface to their counterparts in SeqIO and AlignIO, with the addition
 of optional, format-specific keyword arguments.
 
+Very large tabular output files ('blast-tab', 'blat-psl' and the HMMER3 domain
+tables) can also be read with
+Bio.SearchIO.read_table(...), which stores the values of each row by column in
+SearchTable objects instead of creating QueryResult objects. Rows may be
+filtered on e-value or identity while reading, and the full objects are only
+created for the rows you ask for.
+
+Bio.SearchIO.parse_parallel(...) parses a file using several processes. Like
+`index`, it finds the start of each query in the file first. Each query is
+then parsed by a pool of worker processes, which can also run a summary
+function on it, so only the summaries are sent back.
+
+To keep only the best hits of each query, use Bio.SearchIO.top_hits(...) on
+the output of `parse`. This works with any format, but all the hits of a query
+are parsed before the others are dropped. For the tabular formats, the
+`top_hits` argument of `read_table` drops the rows of the other hits while
+reading, before any objects are made for them. The reciprocal best hits
+of two searches (e.g. proteome A against B, and B against A) can be found with
+Bio.SearchIO.reciprocal_best_hits(...), which works with indexed files.
+
 
 Output
 ======
@@ -199,6 +220,7 @@ from __future__ import with_statement
 
 __docformat__ = 'epytext en'
 
+import heapq
 import sys
 import warnings
 
@@ -213,7 +235,9 @@ warnings.warn('Bio.SearchIO is an experimental submodule which may undergo '
         BiopythonExperimentalWarning)
 
 
-__all__ = ['read', 'parse', 'to_dict', 'index', 'index_db', 'write', 'convert']
+__all__ = ['read', 'parse', 'parse_parallel', 'read_table', 'to_dict',
+        'top_hits', 'reciprocal_best_hits', 'index', 'index_db', 'write',
+        'convert']
 
 
 # dictionary of supported formats for parse() and read()
@@ -253,6 +277,15 @@ _INDEXER_MAP = {
         'phmmer3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmqueryIndexer'),
 }
 
+# dictionary of supported formats for read_table()
+_TABLE_MAP = {
+        'blast-tab': ('BlastIO', 'BlastTabTableReader'),
+        'blat-psl': ('BlatIO', 'BlatPslTableReader'),
+        'hmmscan3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmhitTableReader'),
+        'hmmsearch3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmqueryTableReader'),
+        'phmmer3-domtab': ('HmmerIO', 'Hmmer3DomtabHmmqueryTableReader'),
+}
+
 # dictionary of supported formats for write()
 _WRITER_MAP = {
         'blast-tab': ('BlastIO', 'BlastTabWriter'),
@@ -371,6 +404,78 @@ def read(handle, format=None, **kwargs):
     return first
 
 
+def read_table(handle, format=None, **kwargs):
+    """Turns a tabular search output file into a generator of column tables.
+
+     - handle - Handle to the file, or the filename as a string.
+     - format - Lower case string denoting one of the supported formats.
+     - kwargs - Format-specific keyword arguments.
+
+    `read_table` is meant for large tabular files, where creating QueryResult
+    objects for every row would take too long. Each row is only split into its
+    values, which are stored by field in a SearchTable object:
+
+    >>> from Bio import SearchIO
+    >>> for table in SearchIO.read_table('Blast/mirna.tab', 'blast-tab',
+    ...         comments=True):
+    ...     print "%i rows, best bitscore %.1f" % (len(table),
+    ...             max(table['bitscore']))
+    ...
+    277 rows, best bitscore 120.0
+
+    Rows can be filtered while reading, and the fields to keep chosen:
+
+    >>> tables = SearchIO.read_table('Blast/mirna.tab', 'blast-tab',
+    ...         comments=True, max_evalue=1e-22,
+    ...         columns=['qseqid', 'sseqid', 'evalue'])
+    >>> table = tables.next()
+    >>> table
+    SearchTable(fields=['qseqid', 'sseqid', 'evalue'], 3 rows)
+    >>> for row in table.rows():
+    ...     print row
+    ...
+    ('33211', 'gi|262205317|ref|NR_030195.1|', 5e-23)
+    ('33213', 'gi|262206031|ref|NR_029826.1|', 9e-26)
+    ('33213', 'gi|269847012|ref|NR_031083.1|', 1e-24)
+
+    The full SearchIO objects are only created for the rows kept, when asked
+    for:
+
+    >>> hsp = table.hsp(2)
+    >>> print hsp.query_id, hsp.hit_id, hsp.bitscore
+    33213 gi|269847012|ref|NR_031083.1| 116.0
+
+    To keep only the rows of the best hits of each query, as with `top_hits`
+    but without making any objects for the other hits, use `top_hits`. The
+    hits are scored by the best score of their rows (e.g. the bitscore for
+    BLAST tabular output):
+
+    >>> for table in SearchIO.read_table('Blast/mirna.tab', 'blast-tab',
+    ...         comments=True, top_hits=1,
+    ...         columns=['qseqid', 'sseqid', 'bitscore']):
+    ...     for row in table.rows():
+    ...         print row
+    ...
+    ('33211', 'gi|262205317|ref|NR_030195.1|', 111.0)
+    ('33212', 'gi|296923684|ref|NR_031821.1|', 102.0)
+    ('33213', 'gi|262206031|ref|NR_029826.1|', 120.0)
+
+    The rows of one query are held until its best hits are known, so the
+    rows of each query must be together in the file, as written by the
+    search programs.
+
+    The tables hold at most `chunk_size` rows each (100000 by default), so
+    the whole file is never held in memory. The format-specific keyword
+    arguments are described in each format's table reader.
+
+    """
+    reader = get_processor(format, _TABLE_MAP)
+
+    with as_handle(handle, 'rU') as source_file:
+        for table in reader(source_file, **kwargs):
+            yield table
+
+
 def to_dict(qresults, key_function=lambda rec: rec.id):
     """Turns a QueryResult iterator or list into a dictionary.
 
@@ -421,6 +526,123 @@ def to_dict(qresults, key_function=lambda rec: rec.id):
     return qdict
 
 
+def _hit_score(hit):
+    """Returns the best HSP score of the given Hit (PRIVATE).
+
+    This is the best HSP bitscore, or for formats without bitscores (e.g.
+    BLAT and Exonerate) the best raw score, or failing that the best HSP
+    e-value, negated so that higher is better.
+    """
+    for attr, sign in (('bitscore', 1), ('score', 1), ('evalue', -1)):
+        try:
+            return max(sign * getattr(hsp, attr) for hsp in hit.hsps)
+        except AttributeError:
+            pass
+    raise ValueError("Hit %r has no bitscore, score or evalue to rank it by, "
+                     "please give a key function" % hit.id)
+
+
+def top_hits(qresults, n=1, key=None):
+    """Turns a QueryResult iterator into one with only the best hits of each.
+
+     - qresults - Iterable returning QueryResult objects.
+     - n        - Number of hits to keep for each query (default 1).
+     - key      - Optional callback function which when given a Hit object
+                  should return its score, higher scores being better.
+                  Defaults to the bitscore of the Hit's best HSP (see
+                  below).
+
+    This filters the QueryResult objects after they have been parsed, so all
+    the Hit and HSP objects of a query are still created. Each QueryResult
+    is reduced as soon as it is returned, keeping the `n` best hits instead
+    of sorting all of them, so only one full query is held in memory at any
+    time:
+
+    >>> from Bio import SearchIO
+    >>> qresults = SearchIO.parse('Blast/mirna.xml', 'blast-xml')
+    >>> for qresult in SearchIO.top_hits(qresults, 2):
+    ...     print qresult.id, [hit.id for hit in qresult]
+    ...
+    33211 ['gi|262205317|ref|NR_030195.1|', 'gi|301171311|ref|NR_035856.1|']
+    33212 ['gi|296923684|ref|NR_031821.1|', 'gi|270133209|ref|NR_033077.1|']
+    33213 ['gi|262206031|ref|NR_029826.1|', 'gi|269847012|ref|NR_031083.1|']
+
+    The hits are returned best first. Hits with equal scores keep their order
+    in the original QueryResult, and queries without hits are kept as they are.
+
+    For formats without bitscores the default key uses the best HSP score
+    (e.g. BLAT and Exonerate), or else the best (lowest) HSP e-value. A
+    ValueError is raised if the HSPs have none of these, in which case you
+    must give a key function.
+
+    For the tabular formats, the `top_hits` argument of `read_table` selects
+    the hits while the file is read instead, see `read_table`.
+
+    """
+    if n < 1:
+        raise ValueError("n must be a positive integer")
+    if key is None:
+        key = _hit_score
+    for qresult in qresults:
+        hits = heapq.nlargest(n, qresult.hits, key=key)
+        obj = qresult.__class__(hits, qresult.id, qresult._hit_key_function)
+        qresult._transfer_attrs(obj)
+        yield obj
+
+
+def reciprocal_best_hits(qresults, other, key=None):
+    """Returns an iterator of the reciprocal best hits of two searches.
+
+     - qresults - Iterable returning QueryResult objects from the first
+                  search, e.g. from `parse`.
+     - other    - Results of the reverse search, either a dictionary-like
+                  object of QueryResult objects keyed by query ID (e.g. from
+                  `index` or `index_db`), or an iterable of QueryResult
+                  objects.
+     - key      - Optional callback function which when given a Hit object
+                  should return its score, higher scores being better.
+                  Defaults to the bitscore of the Hit's best HSP, falling
+                  back on the score or e-value as for `top_hits`.
+
+    Yields a (query ID, hit ID) tuple for each query of the first search whose
+    best hit has the query as its own best hit in the reverse search. This
+    needs the hit IDs of each search to match the query IDs of the other.
+
+    Only the best hit ID of each query is kept from either search. When
+    `other` is an index, only the queries it needs are parsed from its file
+    (once each), so two large result files can be joined without loading
+    either of them.
+
+    """
+    if key is None:
+        key = _hit_score
+
+    def best_hit_id(qresult):
+        if not qresult:
+            return None
+        return max(qresult.hits, key=key).id
+
+    if hasattr(other, 'keys'):
+        other_best = {}
+    else:
+        other_best = dict((qresult.id, best_hit_id(qresult))
+                for qresult in other)
+        other = None
+
+    for qresult in qresults:
+        hit_id = best_hit_id(qresult)
+        if hit_id is None:
+            continue
+        try:
+            back_id = other_best[hit_id]
+        except KeyError:
+            if other is None or hit_id not in other:
+                continue
+            back_id = other_best[hit_id] = best_hit_id(other[hit_id])
+        if back_id == qresult.id:
+            yield qresult.id, hit_id
+
+
 def index(filename, format=None, key_function=None, **kwargs):
     """Indexes a search output file and returns a dictionary-like object.
 
@@ -566,6 +788,114 @@ def index_db(index_filename, filenames=None, format=None,
                                    key_function, repr)
 
 
+def _parse_offsets(filename, format, kwargs, function, offsets):
+    """Parses the queries at the given offsets of a file (PRIVATE).
+
+    Returns a list of the function's results (or of the QueryResult objects
+    if there is no function).
+    """
+    proxy = get_processor(format, _INDEXER_MAP)(filename, **kwargs)
+    try:
+        results = []
+        for offset in offsets:
+            qresult = proxy.get(offset)
+            if function is not None:
+                qresult = function(qresult)
+            results.append(qresult)
+        return results
+    finally:
+        proxy._handle.close()
+
+
+# arguments of _parse_offsets shared by all batches, set in each worker
+# process of parse_parallel by _init_worker
+_worker_args = None
+
+
+def _init_worker(*args):
+    """Stores the shared arguments in a parse_parallel worker (PRIVATE)."""
+    global _worker_args
+    _worker_args = args
+
+
+def _parse_batch(offsets):
+    """Parses a batch of queries in a parse_parallel worker (PRIVATE)."""
+    return _parse_offsets(*(_worker_args + (offsets,)))
+
+
+def parse_parallel(filename, format=None, function=None, processes=None,
+        batch_size=100, **kwargs):
+    """Parses the queries of a search output file using several processes.
+
+     - filename   - Filename of the file to parse (it must be a file on disk).
+     - format     - Lower case string denoting one of the supported formats.
+     - function   - Optional callback function which when given a QueryResult
+                    object returns the value wanted from it, e.g. a summary.
+     - processes  - Number of worker processes, defaults to the number of CPUs.
+     - batch_size - Number of queries given to a worker at a time.
+     - kwargs     - Format-specific keyword arguments.
+
+    The file is first scanned for the start of each query, as done by `index`,
+    so this supports the same formats. The queries are then split into
+    batches which are parsed by a pool of worker processes (using the
+    multiprocessing module). This returns a generator of the function's
+    results (or of the QueryResult objects if no function is given), in the
+    same order as the queries in the file:
+
+    >>> from Bio import SearchIO
+    >>> def hit_count(qresult):
+    ...     return qresult.id, len(qresult)
+    ...
+    >>> for qresult_id, hits in SearchIO.parse_parallel('Blast/mirna.xml',
+    ...         'blast-xml', hit_count, processes=2):
+    ...     print "Search %s has %i hits" % (qresult_id, hits)
+    ...
+    Search 33211 has 100 hits
+    Search 33212 has 44 hits
+    Search 33213 has 95 hits
+
+    The function is run in the worker processes, and only its results are
+    sent back to the parent process. To make good use of this, have the
+    function reduce each QueryResult to the (small) values you need, instead
+    of returning the objects themselves. The results are pickled, and so is
+    the function on platforms which do not fork new processes (e.g. Windows),
+    where it must be defined at the top level of a module.
+
+    With `processes=1` everything is done in this process, without any pool.
+
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+
+    # find the offsets of all queries, closing the file afterwards
+    proxy = get_processor(format, _INDEXER_MAP)(filename, **kwargs)
+    try:
+        offsets = [offset for key, offset, length in proxy]
+    finally:
+        proxy._handle.close()
+
+    batches = [offsets[start:start + batch_size]
+            for start in range(0, len(offsets), batch_size)]
+    args = (filename, format, kwargs, function)
+
+    if processes == 1:
+        results_iter = (_parse_offsets(*(args + (batch,)))
+                for batch in batches)
+        pool = None
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes, _init_worker, args)
+        results_iter = pool.imap(_parse_batch, batches)
+    try:
+        for results in results_iter:
+            for result in results:
+                yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
 def write(qresults, handle, format=None, **kwargs):
     """Writes QueryResult objects to a file in the given format.
 
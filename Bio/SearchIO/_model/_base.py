@@ -13,6 +13,9 @@ class _BaseSearchObject(object):
 
     """Abstract class for SearchIO objects."""
 
+    # no instance attributes here, so subclasses can use __slots__
+    __slots__ = ()
+
     _NON_STICKY_ATTRS = ()
 
     def _transfer_attrs(self, obj):
@@ -30,15 +33,41 @@ class _BaseSearchObject(object):
 
         """
         # list of attribute names we don't want to transfer
-        for attr in self.__dict__.keys():
+        for attr, value in self._attrs():
             if attr not in self._NON_STICKY_ATTRS:
-                setattr(obj, attr, self.__dict__[attr])
+                setattr(obj, attr, value)
+
+    def _attrs(self):
+        """Returns a list of (name, value) of the instance attributes (PRIVATE).
+
+        This includes the attributes kept in slots (see `__slots__` in the
+        subclasses), which are not in the instance dictionary.
+
+        """
+        attrs = []
+        for cls in self.__class__.__mro__:
+            for attr in cls.__dict__.get('__slots__', ()):
+                if attr not in ('__dict__', '__weakref__') and \
+                        hasattr(self, attr):
+                    attrs.append((attr, getattr(self, attr)))
+        attrs.extend(self.__dict__.items())
+        return attrs
+
+    def __getstate__(self):
+        # needed to pickle objects with slots using protocols 0 and 1
+        return dict(self._attrs())
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            object.__setattr__(self, attr, value)
 
 
 class _BaseHSP(_BaseSearchObject):
 
     """Abstract base class for HSP objects."""
 
+    __slots__ = ()
+
     def _str_hsp_header(self):
         """Prints the alignment header info."""
         lines = []
@@ -100,6 +100,11 @@ class Hit(_BaseSearchObject):
     # from this one
     _NON_STICKY_ATTRS = ('_items', )
 
+    # attributes every Hit has (and the sequence length most parsers set)
+    # are kept in slots, see HSPFragment
+    __slots__ = ('_items', '_id', '_description', '_query_id',
+            '_query_description', 'seq_len', '__dict__')
+
     def __init__(self, hsps=[], id=None, query_id=None):
         """Initializes a Hit object.
 
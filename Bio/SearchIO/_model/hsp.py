@@ -245,6 +245,14 @@ class HSP(_BaseHSP):
     # from this one
     _NON_STICKY_ATTRS = ('_items', )
 
+    # the fragments and the statistics set by most parsers are kept in
+    # slots, see HSPFragment; format specific ones go into __dict__
+    __slots__ = ('_items', 'evalue', 'bitscore', 'bitscore_raw', 'score',
+            'ident_num', 'ident_pct', 'pos_num', 'pos_pct', 'mismatch_num',
+            'gap_num', 'gapopen_num', 'match_num', 'match_rep_num', 'n_num',
+            'query_gap_num', 'query_gapopen_num', 'hit_gap_num',
+            'hit_gapopen_num', '__dict__')
+
     def __init__(self, fragments=[]):
         """Initializes an HSP object.
 
@@ -670,25 +678,38 @@ class HSPFragment(_BaseHSP):
 
     """
 
+    # searches may give many thousands of fragments (e.g. BLAT hits on
+    # repeats), so the attributes every fragment has are kept in slots
+    # rather than in an instance dictionary; any other attributes still go
+    # into __dict__, which is only created when first needed
+    __slots__ = ('_alphabet', '_aln_annotation', '_aln_span',
+            '_hit', '_hit_id', '_hit_description', '_hit_features',
+            '_hit_strand', '_hit_frame', '_hit_start', '_hit_end',
+            '_query', '_query_id', '_query_description', '_query_features',
+            '_query_strand', '_query_frame', '_query_start', '_query_end',
+            '__dict__')
+
     def __init__(self, hit_id='<unknown id>', query_id='<unknown id>',
             hit=None, query=None, alphabet=single_letter_alphabet):
 
         self._alphabet = alphabet
-        self.aln_annotation = {}
+        # the annotation dictionary and feature lists are only created when
+        # first used
+        self._aln_annotation = None
 
         self._hit_id = hit_id
         self._query_id = query_id
 
-        for seq_type in ('query', 'hit'):
+        for seq_type, seq in (('query', query), ('hit', hit)):
             # query or hit attributes default attributes
             setattr(self, '_%s_description' % seq_type, '<unknown description>')
-            setattr(self, '_%s_features' % seq_type, [])
+            setattr(self, '_%s_features' % seq_type, None)
             # query or hit attributes whose default attribute is None
             for attr in ('strand', 'frame', 'start', 'end'):
                 setattr(self, '%s_%s' % (seq_type, attr), None)
             # self.query or self.hit
-            if eval(seq_type):
-                setattr(self, seq_type, eval(seq_type))
+            if seq:
+                setattr(self, seq_type, seq)
             else:
                 setattr(self, seq_type, None)
 
@@ -707,19 +728,26 @@ class HSPFragment(_BaseHSP):
         return self._str_hsp_header() + '\n' + self._str_aln()
 
     def __getitem__(self, idx):
-        if self.aln is not None:
+        if self._query is not None or self._hit is not None:
             obj = self.__class__(
                     hit_id=self.hit_id, query_id=self.query_id,
                     alphabet=self.alphabet)
             # transfer query and hit attributes
-            # let SeqRecord handle feature slicing, then retrieve the sliced
-            # features into the sliced HSPFragment
-            if self.query is not None:
-                obj.query = self.query[idx]
-                obj.query_features = obj.query.features
-            if self.hit is not None:
-                obj.hit = self.hit[idx]
-                obj.hit_features = obj.hit.features
+            for seq_type in ('query', 'hit'):
+                seq = getattr(self, '_%s' % seq_type)
+                if seq is None:
+                    continue
+                if isinstance(seq, basestring) and \
+                        not getattr(self, '_%s_features' % seq_type):
+                    # sequences not yet turned into SeqRecord objects (and
+                    # without features) are sliced as they are
+                    setattr(obj, seq_type, seq[idx])
+                else:
+                    # let SeqRecord handle feature slicing, then retrieve
+                    # the sliced features into the sliced HSPFragment
+                    sliced = getattr(self, seq_type)[idx]
+                    setattr(obj, seq_type, sliced)
+                    setattr(obj, '%s_features' % seq_type, sliced.features)
             # description, strand, frame
             for attr in ('description', 'strand', 'frame'):
                 for seq_type in ('hit', 'query'):
@@ -788,6 +816,9 @@ class HSPFragment(_BaseHSP):
         seq -- String or SeqRecord to check
         seq_type -- String of sequence type, must be 'hit' or 'query'
 
+        Strings are returned as they are, and only turned into SeqRecord
+        objects by _get_seq when the sequence is first accessed.
+
         """
         assert seq_type in ('hit', 'query')
         if seq is None:
@@ -805,25 +836,34 @@ class HSPFragment(_BaseHSP):
                         "%r (%s); found: %r (%s)." % (len(opp_seq), opp_type,
                         len(seq), seq_type))
 
-        seq_id = getattr(self, '%s_id' % seq_type)
-        seq_desc = getattr(self, '%s_description' % seq_type)
-        seq_feats = getattr(self, '%s_features' % seq_type)
-        seq_name = 'aligned %s sequence' % seq_type
-
         if isinstance(seq, SeqRecord):
-            seq.id = seq_id
-            seq.description = seq_desc
-            seq.name = seq_name
-            seq.features = seq_feats
+            seq.id = getattr(self, '%s_id' % seq_type)
+            seq.description = getattr(self, '%s_description' % seq_type)
+            seq.name = 'aligned %s sequence' % seq_type
+            seq.features = getattr(self, '%s_features' % seq_type)
             seq.seq.alphabet = self.alphabet
-        elif isinstance(seq, basestring):
-            seq = SeqRecord(Seq(seq, self.alphabet), id=seq_id, name=seq_name,
-                    description=seq_desc, features=seq_feats)
 
         return seq
 
+    def _get_seq(self, seq_type):
+        """Returns the query or hit sequence as a SeqRecord, or None (PRIVATE).
+
+        Sequences set as strings (e.g. by the parsers) are only turned into
+        SeqRecord objects here, so fragments whose sequences are never used
+        do not pay for them.
+        """
+        seq = getattr(self, '_%s' % seq_type)
+        if isinstance(seq, basestring):
+            seq = SeqRecord(Seq(seq, self.alphabet),
+                    id=getattr(self, '%s_id' % seq_type),
+                    name='aligned %s sequence' % seq_type,
+                    description=getattr(self, '%s_description' % seq_type),
+                    features=getattr(self, '%s_features' % seq_type))
+            setattr(self, '_%s' % seq_type, seq)
+        return seq
+
     def _hit_get(self):
-        return self._hit
+        return self._get_seq('hit')
 
     def _hit_set(self, value):
         self._hit = self._set_seq(value, 'hit')
@@ -832,7 +872,7 @@ class HSPFragment(_BaseHSP):
             doc="""Hit sequence as a SeqRecord object, defaults to None""")
 
     def _query_get(self):
-        return self._query
+        return self._get_seq('query')
 
     def _query_set(self, value):
         self._query = self._set_seq(value, 'query')
@@ -841,7 +881,7 @@ class HSPFragment(_BaseHSP):
             doc="""Query sequence as a SeqRecord object, defaults to None""")
 
     def _aln_get(self):
-        if self.query is None and self.hit is None:
+        if self._query is None and self._hit is None:
             return None
         elif self.hit is None:
             return MultipleSeqAlignment([self.query], self.alphabet)
@@ -854,19 +894,28 @@ class HSPFragment(_BaseHSP):
             doc="""Query-hit alignment as a MultipleSeqAlignment object,
             defaults to None""")
 
+    def _aln_annotation_get(self):
+        if self._aln_annotation is None:
+            self._aln_annotation = {}
+        return self._aln_annotation
+
+    def _aln_annotation_set(self, value):
+        self._aln_annotation = value
+
+    aln_annotation = property(fget=_aln_annotation_get,
+            fset=_aln_annotation_set,
+            doc="""Dictionary of the alignment annotation(s), e.g. the
+            homology string, defaults to an empty dictionary""")
+
     def _alphabet_get(self):
         return self._alphabet
 
     def _alphabet_set(self, value):
         self._alphabet = value
-        try:
-            self.query.seq.alphabet = value
-        except AttributeError:
-            pass
-        try:
-            self.hit.seq.alphabet = value
-        except AttributeError:
-            pass
+        # sequences not yet turned into SeqRecord objects get it later
+        for seq in (self._query, self._hit):
+            if isinstance(seq, SeqRecord):
+                seq.seq.alphabet = value
 
     alphabet = property(fget=_alphabet_get, fset=_alphabet_set,
             doc="""Alphabet object used in the fragment's sequences and alignment,
@@ -877,10 +926,10 @@ class HSPFragment(_BaseHSP):
         # alignment span can be its own attribute, or computed from
         # query / hit length
         if not hasattr(self, '_aln_span'):
-            if self.query is not None:
-                self._aln_span = len(self.query)
-            elif self.hit is not None:
-                self._aln_span = len(self.hit)
+            if self._query is not None:
+                self._aln_span = len(self._query)
+            elif self._hit is not None:
+                self._aln_span = len(self._hit)
 
         return self._aln_span
 
@@ -904,10 +953,10 @@ class HSPFragment(_BaseHSP):
             doc="""Query sequence ID""")
 
     hit_features = fragcascade('features', 'hit',
-            doc="""Hit sequence features""")
+            doc="""Hit sequence features""", default=list)
 
     query_features = fragcascade('features', 'query',
-            doc="""Query sequence features""")
+            doc="""Query sequence features""", default=list)
 
     ## strand properties ##
     def _prep_strand(self, strand):
@@ -6,7 +6,7 @@
 """Bio.SearchIO object to model search results from a single query."""
 
 from copy import deepcopy
-from itertools import chain
+from itertools import chain, islice
 
 from Bio._py3k import OrderedDict
 from Bio._utils import trim_str
@@ -16,6 +16,15 @@ from _base import _BaseSearchObject
 from hit import Hit
 
 
+def _hit_id(hit):
+    """Returns the ID of the given Hit, the default Hit key (PRIVATE).
+
+    This is a module level function rather than a lambda so QueryResult
+    objects can be pickled (e.g. to pass them between processes).
+    """
+    return hit.id
+
+
 class QueryResult(_BaseSearchObject):
 
     """Class representing search results from a single query.
@@ -180,8 +189,7 @@ class QueryResult(_BaseSearchObject):
     # from this one
     _NON_STICKY_ATTRS = ('_items',)
 
-    def __init__(self, hits=[], id=None,
-            hit_key_function=lambda hit: hit.id):
+    def __init__(self, hits=[], id=None, hit_key_function=_hit_id):
         """Initializes a QueryResult object.
 
         Arguments:
@@ -345,8 +353,15 @@ class QueryResult(_BaseSearchObject):
             return obj
 
         # if key is an int, then retrieve the Hit at the int index
+        # (walking to it, since copying all Hits into a list makes building
+        # a QueryResult quadratic, as the id property uses the first Hit)
         elif isinstance(hit_key, int):
-            return list(self._items.values())[hit_key]
+            length = len(self._items)
+            if hit_key < 0:
+                hit_key += length
+            if not 0 <= hit_key < length:
+                raise IndexError("list index out of range")
+            return islice(self._items.itervalues(), hit_key, None).next()
 
         # if key is a string, then do a regular dictionary retrieval
         return self._items[hit_key]
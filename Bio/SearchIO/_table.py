@@ -0,0 +1,285 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Columnar tables of search output rows, for Bio.SearchIO.read_table."""
+
+import heapq
+from array import array
+from copy import copy
+from StringIO import StringIO
+
+
+def _new_column(caster):
+    """Returns an empty column for values made by the given caster (PRIVATE).
+
+    Integer and float values go into compact typed arrays, anything else
+    (e.g. identifiers) into a list.
+    """
+    if caster is int:
+        return array('l')
+    elif caster is float:
+        return array('d')
+    return []
+
+
+class SearchTable(object):
+
+    """Chunk of rows from a tabular search output file, stored by column.
+
+    Each column is named after the field it holds (e.g. 'qseqid', 'evalue',
+    'bitscore' for BLAST tabular output) and can be accessed like a
+    dictionary value. Integer and float columns are `array.array` objects,
+    other columns are lists of strings. The values are as written in the
+    file, so coordinates are not changed to Python-style ones.
+
+    The full SearchIO objects for the rows in the table are only created
+    when asked for, using the `qresults` or `hsp` methods. Note that the
+    rows of a query may be split over two consecutive tables.
+    """
+
+    def __init__(self, fields, columns, lines, parser):
+        """Initializes the table.
+
+        Arguments:
+         - fields  - List of the column names, in order.
+         - columns - List of the columns, in the same order.
+         - lines   - List of the file lines the rows were read from.
+         - parser  - Function which, given a handle to some of these lines,
+                     returns an iterator of QueryResult objects.
+        """
+        self.fields = fields
+        self._columns = dict(zip(fields, columns))
+        self._lines = lines
+        self._parser = parser
+
+    def __repr__(self):
+        return "%s(fields=%r, %i rows)" % (self.__class__.__name__,
+                self.fields, len(self))
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __contains__(self, field):
+        return field in self._columns
+
+    def __getitem__(self, field):
+        """Returns the column of the given field name."""
+        try:
+            return self._columns[field]
+        except KeyError:
+            raise KeyError("Field %r not in table, which has %r"
+                    % (field, self.fields))
+
+    def rows(self):
+        """Iterates over the rows as tuples of values, in field order."""
+        return iter(zip(*[self._columns[field] for field in self.fields]))
+
+    def qresults(self):
+        """Iterates over the rows as QueryResult objects.
+
+        The rows are parsed by the format's usual parser, so the objects are
+        the same as those from Bio.SearchIO.parse, except that they only
+        contain the hits and HSPs of the rows in this table.
+        """
+        if not self._lines:
+            return iter([])
+        return iter(self._parser(StringIO("".join(self._lines))))
+
+    def hsp(self, index):
+        """Returns the HSP object of the row at the given index."""
+        qresult = iter(self._parser(StringIO(self._lines[index]))).next()
+        return qresult[0][0]
+
+    def take(self, indexes):
+        """Returns a new table with only the rows at the given indexes.
+
+        The rows are in the order of the given indexes, e.g. from the
+        resolve_overlaps method of HMMER domain tables.
+        """
+        columns = []
+        for field in self.fields:
+            column = self._columns[field]
+            if isinstance(column, array):
+                columns.append(array(column.typecode,
+                        [column[i] for i in indexes]))
+            else:
+                columns.append([column[i] for i in indexes])
+        obj = copy(self)
+        obj._columns = dict(zip(self.fields, columns))
+        obj._lines = [self._lines[i] for i in indexes]
+        return obj
+
+
+class _TableReader(object):
+
+    """Base class for the readers used by Bio.SearchIO.read_table (PRIVATE).
+
+    Subclasses must define the `_rows` method, which iterates over the rows
+    of the file as (fields, values, line) tuples (using the same list of
+    fields for rows of the same layout), and the `_make_table` method. The
+    `_casters` dictionary gives the type of the non-string fields.
+
+    For the `top_hits` argument, `_query_fields` and `_hit_fields` give the
+    fields which may hold the query and hit IDs (the first one in the layout
+    is used), and `_score_field` the field holding the score of each row.
+    Subclasses without a score field must override `_score_function`.
+    """
+
+    _casters = {}
+    _query_fields = ()
+    _hit_fields = ()
+    _score_field = None
+
+    def __init__(self, handle, columns=None, chunk_size=100000,
+            top_hits=None):
+        self.handle = handle
+        self.columns = columns
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        self.chunk_size = chunk_size
+        if top_hits is not None and top_hits < 1:
+            raise ValueError("top_hits must be a positive integer")
+        self.top_hits = top_hits
+        # list of (argument name, field, minimum, maximum) row filters
+        self._filters = []
+
+    def _add_filter(self, arg_name, field, minimum=None, maximum=None):
+        """Skips rows whose field value is outside the given limits."""
+        if minimum is not None or maximum is not None:
+            self._filters.append((arg_name, field, minimum, maximum))
+
+    def _rows(self):
+        """Iterates over the (fields, values, line) tuples of each row."""
+        raise NotImplementedError("Subclass should implement this")
+
+    def _make_table(self, fields, names, columns, lines):
+        """Returns a SearchTable of the given rows."""
+        raise NotImplementedError("Subclass should implement this")
+
+    def _field_index(self, arg_name, names, fields):
+        """Returns the index of the first of the names in the fields."""
+        for name in names:
+            if name in fields:
+                return fields.index(name)
+        raise ValueError("%s needs one of the %r fields, which are not in %r"
+                % (arg_name, list(names), fields))
+
+    def _score_function(self, fields):
+        """Returns a function giving the score of a row from its values."""
+        idx = self._field_index('top_hits', [self._score_field], fields)
+        return lambda values: float(values[idx])
+
+    def _layout(self, fields):
+        """Returns the columns and column indexes for the fields."""
+        names = self.columns or fields
+        casters = []
+        for name in names:
+            if name not in fields:
+                raise ValueError("Column %r not in fields %r"
+                        % (name, fields))
+            casters.append(self._casters.get(name, str))
+        columns = [_new_column(caster) for caster in casters]
+        cast_columns = [(fields.index(name), caster, column) for name, caster,
+                column in zip(names, casters, columns) if caster is not str]
+        str_columns = [(fields.index(name), column) for name, caster,
+                column in zip(names, casters, columns) if caster is str]
+        return names, columns, cast_columns, str_columns
+
+    def _filtered_rows(self):
+        """Iterates over the rows passing the filters, checking their size."""
+        fields = None
+        for row_fields, values, line in self._rows():
+            if row_fields is not fields:
+                fields = row_fields
+                filters = []
+                for arg_name, field, minimum, maximum in self._filters:
+                    idx = self._field_index(arg_name, [field], fields)
+                    filters.append((idx, minimum, maximum))
+            if len(values) != len(fields):
+                raise ValueError("Expected %i columns, found: %i"
+                        % (len(fields), len(values)))
+            # filter the rows before parsing anything else
+            for idx, minimum, maximum in filters:
+                value = float(values[idx])
+                if (minimum is not None and value < minimum) or \
+                        (maximum is not None and value > maximum):
+                    break
+            else:
+                yield row_fields, values, line
+
+    def _top_hit_rows(self, rows):
+        """Iterates over the rows of the `top_hits` best hits of each query.
+
+        As in Bio.SearchIO.top_hits, the score of a hit is the best score of
+        its rows, the hits are returned best first, and hits with equal scores
+        keep their order in the file. The rows of the current query are held
+        as split strings until the query ends, and only those of the hits
+        kept are returned, so no columns or objects are made for the others.
+        """
+        n = self.top_hits
+        fields = query_id = None
+        # hit ID -> [best score, minus the hit's position, rows]
+        hits = {}
+        for row_fields, values, line in rows:
+            if row_fields is not fields:
+                # a new layout also starts a new query
+                for hit in heapq.nlargest(n, hits.itervalues()):
+                    for row in hit[2]:
+                        yield row
+                hits = {}
+                fields = row_fields
+                query_idx = self._field_index('top_hits',
+                        self._query_fields, fields)
+                hit_idx = self._field_index('top_hits', self._hit_fields,
+                        fields)
+                score = self._score_function(fields)
+            if values[query_idx] != query_id:
+                for hit in heapq.nlargest(n, hits.itervalues()):
+                    for row in hit[2]:
+                        yield row
+                hits = {}
+                query_id = values[query_idx]
+            row_score = score(values)
+            try:
+                hit = hits[values[hit_idx]]
+            except KeyError:
+                hits[values[hit_idx]] = [row_score, -len(hits),
+                        [(row_fields, values, line)]]
+            else:
+                if row_score > hit[0]:
+                    hit[0] = row_score
+                hit[2].append((row_fields, values, line))
+        for hit in heapq.nlargest(n, hits.itervalues()):
+            for row in hit[2]:
+                yield row
+
+    def __iter__(self):
+        rows = self._filtered_rows()
+        if self.top_hits is not None:
+            rows = self._top_hit_rows(rows)
+        fields = None
+        lines = []
+        for row_fields, values, line in rows:
+            if row_fields is not fields:
+                # a different column layout needs a new table
+                if lines:
+                    yield self._make_table(fields, names, columns, lines)
+                    lines = []
+                fields = row_fields
+                names, columns, cast_columns, str_columns = \
+                        self._layout(fields)
+            for idx, caster, column in cast_columns:
+                column.append(caster(values[idx]))
+            for idx, column in str_columns:
+                column.append(values[idx])
+            lines.append(line)
+            if len(lines) >= self.chunk_size:
+                yield self._make_table(fields, names, columns, lines)
+                # start again with empty columns
+                lines = []
+                names, columns, cast_columns, str_columns = \
+                        self._layout(fields)
+        if lines:
+            yield self._make_table(fields, names, columns, lines)
@@ -108,23 +108,34 @@ def optionalcascade(cont_attr, item_attr, doc=''):
     return property(fget=getter, fset=setter, doc=doc)
 
 
-def fragcascade(attr, seq_type, doc=''):
+def fragcascade(attr, seq_type, doc='', default=None):
     """Returns a getter property with cascading setter, for HSPFragment objects.
 
     Similar to `partialcascade`, but for HSPFragment objects and acts on `query`
-    or `hit` properties of the object if they are not None.
+    or `hit` properties of the object if they are not None. Sequences still
+    stored as strings are left alone, as they pick up the value once they are
+    turned into SeqRecord objects.
+
+    If given, default is called to create the value the first time it is
+    needed, if it has not been set (e.g. an empty list of features, which most
+    fragments never use).
 
     """
     assert seq_type in ('hit', 'query')
     attr_name = '_%s_%s' % (seq_type, attr)
+    seq_name = '_%s' % seq_type
 
     def getter(self):
-        return getattr(self, attr_name)
+        value = getattr(self, attr_name)
+        if value is None and default is not None:
+            value = default()
+            setattr(self, attr_name, value)
+        return value
 
     def setter(self, value):
         setattr(self, attr_name, value)
-        seq = getattr(self, seq_type)
-        if seq is not None:
+        seq = getattr(self, seq_name)
+        if seq is not None and not isinstance(seq, basestring):
             setattr(seq, attr, value)
 
     return property(fget=getter, fset=setter, doc=doc)
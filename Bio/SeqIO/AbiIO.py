@@ -12,6 +12,12 @@ sequencing results.
 For more details on the format specification, visit:
 http://www.appliedbiosystem.com/support/software_community/ABIF_File_Format.pdf
 
+Each SeqRecord keeps the whole file contents in memory (through the
+"abif_raw" annotation), so that any tag can be decoded later on, even once
+the file has been closed. For a trace file this is typically a few hundred
+kilobytes per record, which adds up if you keep thousands of records. When
+only the base calls and qualities are needed, converting to FASTQ, FASTA
+or QUAL with Bio.SeqIO.convert only reads those tags from the file.
 """
 
 __docformat__ = "epytext en"
@@ -37,17 +43,6 @@ _EXTRACT = {
     'GTyp1': 'polymer',
     'MODL1': 'machine_model',
 }
-# dictionary for tags that require preprocessing before use in creating
-# seqrecords
-_SPCTAGS = [
-    'PBAS2',    # base-called sequence
-    'PCON2',    # quality values of base-called sequence
-    'SMPL1',    # sample id inputted before sequencing run
-    'RUND1',    # run start date
-    'RUND2',    # run finish date
-    'RUNT1',    # run start time
-    'RUNT2',    # run finish time
-]
 # dictionary for data unpacking format
 _BYTEFMT = {
     1: 'b',     # byte
@@ -78,6 +73,20 @@ _DIRFMT = '>4sI2H4I'
 
 def AbiIterator(handle, alphabet=None, trim=False):
     """Iterator for the Abi file format.
+
+    The whole file is read in one go (see the module docstring), but only
+    the directory and the tags needed for the SeqRecord (base calls,
+    qualities, sample name etc) are decoded. Every other tag, including
+    the large raw trace channels such as DATA9 to DATA12, is available on
+    demand through the lazy mapping in the "abif_raw" annotation, keyed by
+    tag name plus tag number:
+
+    >>> from Bio import SeqIO
+    >>> record = SeqIO.read("Abi/310.ab1", "abi")
+    >>> print record.id
+    D11F
+    >>> print len(record.annotations["abif_raw"]["DATA9"])
+    9826
     """
     # raise exception is alphabet is not dna
     if alphabet is not None:
@@ -89,63 +98,33 @@ def AbiIterator(handle, alphabet=None, trim=False):
                       Alphabet.RNAAlphabet):
             raise ValueError("Invalid alphabet, ABI files do not hold RNA.")
 
-    # raise exception if handle mode is not 'rb'
-    if hasattr(handle, 'mode'):
-        if set('rb') != set(handle.mode.lower()):
-            raise ValueError("ABI files has to be opened in 'rb' mode.")
-
-    # check if input file is a valid Abi file
-    handle.seek(0)
-    marker = handle.read(4)
-    if not marker:
+    tags = _abi_read(handle)
+    if tags is None:
         # handle empty file gracefully
         raise StopIteration
-    if marker != _as_bytes('ABIF'):
-        raise IOError('File should start ABIF, not %r' % marker)
-
-    # dirty hack for handling time information
-    times = {'RUND1': '', 'RUND2': '', 'RUNT1': '', 'RUNT2': '', }
-
-    # initialize annotations
-    annot = dict(zip(_EXTRACT.values(), [None] * len(_EXTRACT)))
 
-    # parse header and extract data from directories
-    header = struct.unpack(_HEADFMT,
-                           handle.read(struct.calcsize(_HEADFMT)))
-
-    for tag_name, tag_number, tag_data in _abi_parse_header(header, handle):
-        # stop iteration if all desired tags have been extracted
-        # 4 tags from _EXTRACT + 2 time tags from _SPCTAGS - 3,
-        # and seq, qual, id
-        # todo
-
-        key = tag_name + str(tag_number)
-
-        # PBAS2 is base-called sequence
-        if key == 'PBAS2':
-            seq = tag_data
-            ambigs = 'KYWMRS'
-            if alphabet is None:
-                if set(seq).intersection(ambigs):
-                    alphabet = ambiguous_dna
-                else:
-                    alphabet = unambiguous_dna
-        # PCON2 is quality values of base-called sequence
-        elif key == 'PCON2':
-            qual = [ord(val) for val in tag_data]
-        # SMPL1 is sample id entered before sequencing run
-        elif key == 'SMPL1':
-            sample_id = tag_data
-        elif key in times:
-            times[key] = tag_data
+    # PBAS2 is base-called sequence
+    seq = tags['PBAS2']
+    if alphabet is None:
+        if set(seq).intersection('KYWMRS'):
+            alphabet = ambiguous_dna
         else:
-            # extract sequence annotation as defined in _EXTRACT
-            if key in _EXTRACT:
-                annot[_EXTRACT[key]] = tag_data
-
+            alphabet = unambiguous_dna
+    # PCON2 is quality values of base-called sequence
+    qual = [ord(val) for val in tags.raw('PCON2')]
+    # SMPL1 is sample id entered before sequencing run
+    sample_id = tags['SMPL1']
+
+    # extract sequence annotation as defined in _EXTRACT
+    annot = {}
+    for key, name in _EXTRACT.items():
+        annot[name] = tags.get(key)
     # set time annotations
-    annot['run_start'] = '%s %s' % (times['RUND1'], times['RUNT1'])
-    annot['run_finish'] = '%s %s' % (times['RUND2'], times['RUNT2'])
+    annot['run_start'] = '%s %s' % (tags.get('RUND1', ''),
+                                    tags.get('RUNT1', ''))
+    annot['run_finish'] = '%s %s' % (tags.get('RUND2', ''),
+                                     tags.get('RUNT2', ''))
+    annot['abif_raw'] = tags
 
     # use the file name as SeqRecord.name if available
     try:
@@ -171,8 +150,49 @@ def _AbiTrimIterator(handle):
     return AbiIterator(handle, trim=True)
 
 
-def _abi_parse_header(header, handle):
-    """Generator that returns directory contents.
+def _abi_read(handle):
+    """Reads an ABIF file and its directory, returns an _AbiTags object (PRIVATE).
+
+    Returns None for an empty file. No tag data is decoded at this point.
+    """
+    directory = _abi_read_directory(handle)
+    if directory is None:
+        return None
+    handle.seek(0)
+    return _AbiTags(handle.read(), directory)
+
+
+def _abi_read_directory(handle):
+    """Reads just the directory of an ABIF file (PRIVATE).
+
+    Returns a dictionary as from _abi_parse_header, or None for an empty
+    file.
+    """
+    # raise exception if handle mode is not 'rb'
+    if hasattr(handle, 'mode'):
+        if set('rb') != set(handle.mode.lower()):
+            raise ValueError("ABI files has to be opened in 'rb' mode.")
+
+    # check if input file is a valid Abi file
+    handle.seek(0)
+    marker = handle.read(4)
+    if not marker:
+        return None
+    if marker != _as_bytes('ABIF'):
+        raise IOError('File should start ABIF, not %r' % marker)
+    header = struct.unpack(_HEADFMT,
+                           handle.read(struct.calcsize(_HEADFMT)))
+    handle.seek(header[7])
+    return _abi_parse_header(header, handle.read(header[4] * header[5]))
+
+
+def _abi_parse_header(header, data):
+    """Returns a dictionary of the directory contents (PRIVATE).
+
+    The data holds the directory entries, as read from the directory offset
+    given in the header. Each key is the tag name plus tag number (e.g.
+    'PBAS2'), each value a tuple of element type code, number of elements,
+    data size and data offset into the file.
     """
     # header structure (after ABIF marker):
     # file version, tag name, tag number,
@@ -181,35 +201,92 @@ def _abi_parse_header(header, handle):
     head_elem_size = header[4]
     head_elem_num = header[5]
     head_offset = header[7]
-    index = 0
-
-    while index < head_elem_num:
-        start = head_offset + index * head_elem_size
-        # add directory offset to tuple
-        # to handle directories with data size <= 4 bytes
-        handle.seek(start)
-        dir_entry = struct.unpack(_DIRFMT,
-                                  handle.read(struct.calcsize(_DIRFMT))) + (start,)
-        index += 1
-        # only parse desired dirs
-        key = _bytes_to_string(dir_entry[0])
-        key += str(dir_entry[1])
-        if key in (list(_EXTRACT.keys()) + _SPCTAGS):
-            tag_name = _bytes_to_string(dir_entry[0])
-            tag_number = dir_entry[1]
-            elem_code = dir_entry[2]
-            elem_num = dir_entry[4]
-            data_size = dir_entry[5]
-            data_offset = dir_entry[6]
-            tag_offset = dir_entry[8]
-            # if data size <= 4 bytes, data is stored inside tag
-            # so offset needs to be changed
-            if data_size <= 4:
-                data_offset = tag_offset + 20
-            handle.seek(data_offset)
-            data = handle.read(data_size)
-            yield tag_name, tag_number, \
-                _parse_tag_data(elem_code, elem_num, data)
+    directory = {}
+    for index in range(head_elem_num):
+        start = index * head_elem_size
+        tag_name, tag_number, elem_code, elem_size, elem_num, data_size, \
+            data_offset, tag_handle = struct.unpack_from(_DIRFMT, data, start)
+        # if data size <= 4 bytes, data is stored inside tag
+        # so offset needs to be changed
+        if data_size <= 4:
+            data_offset = head_offset + start + 20
+        key = _bytes_to_string(tag_name) + str(tag_number)
+        directory[key] = (elem_code, elem_num, data_size, data_offset)
+    return directory
+
+
+class _AbiTags(object):
+    """Read only dictionary of the tags in an ABIF file, decoded on demand (PRIVATE).
+
+    Keys are the tag name plus tag number (e.g. 'DATA9'), values are
+    decoded from the in memory file contents on first access and cached.
+    """
+    def __init__(self, data, directory):
+        self._data = data
+        self._directory = directory
+        self._cache = {}
+
+    def raw(self, key):
+        """Returns the undecoded bytes of the given tag."""
+        elem_code, elem_num, data_size, data_offset = self._directory[key]
+        return self._data[data_offset:data_offset + data_size]
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        elem_code, elem_num, data_size, data_offset = self._directory[key]
+        value = _parse_tag_data(elem_code, elem_num, self.raw(key))
+        self._cache[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key in self._directory:
+            return self[key]
+        return default
+
+    def keys(self):
+        return list(self._directory.keys())
+
+    def __iter__(self):
+        return iter(self._directory)
+
+    def __len__(self):
+        return len(self._directory)
+
+    def __contains__(self, key):
+        return key in self._directory
+
+    def __repr__(self):
+        return "<ABIF tags %s>" % ", ".join(sorted(self._directory))
+
+
+def _abi_base_calls(handle, trim=False):
+    """Returns the sample id, base calls and qualities of an ABIF file (PRIVATE).
+
+    This is a fast path for batch work which reads and decodes nothing else
+    (only the directory and these three tags are read from the file), and
+    does not build a SeqRecord. The qualities are returned as a bytes string
+    with one byte per base. Returns None for an empty file.
+    """
+    directory = _abi_read_directory(handle)
+    if directory is None:
+        return None
+
+    def read_tag(key):
+        elem_code, elem_num, data_size, data_offset = directory[key]
+        handle.seek(data_offset)
+        return handle.read(data_size)
+
+    seq = _bytes_to_string(read_tag('PBAS2'))
+    qual = read_tag('PCON2')
+    if trim:
+        start, end = _abi_trim_region([ord(val) for val in qual])
+        seq = seq[start:end]
+        qual = qual[start:end]
+    elem_code, elem_num, data_size, data_offset = directory['SMPL1']
+    return _parse_tag_data(elem_code, elem_num, read_tag('SMPL1')), seq, qual
 
 
 def _abi_trim(seq_record):
@@ -225,18 +302,28 @@ def _abi_trim(seq_record):
     http://www.phrap.org/phredphrap/phred.html
     http://www.clcbio.com/manual/genomics/Quality_abif_trimming.html
     """
+    start, end = _abi_trim_region(
+        seq_record.letter_annotations['phred_quality'])
+    if start == 0 and end == len(seq_record):
+        return seq_record
+    return seq_record[start:end]
+
 
+def _abi_trim_region(quals):
+    """Returns the start and end of the trimmed region given the qualities (PRIVATE).
+
+    See _abi_trim for details of the trimming algorithm.
+    """
     start = False   # flag for starting position of trimmed sequence
     segment = 20    # minimum sequence length
     trim_start = 0  # init start index
     cutoff = 0.05   # default cutoff value for calculating base score
 
-    if len(seq_record) <= segment:
-        return seq_record
+    if len(quals) <= segment:
+        return 0, len(quals)
     else:
         # calculate base score
-        score_list = [cutoff - (10 ** (qual / -10.0)) for qual in
-                      seq_record.letter_annotations['phred_quality']]
+        score_list = [cutoff - (10 ** (qual / -10.0)) for qual in quals]
 
         # calculate cummulative score
         # if cummulative value < 0, set it to 0
@@ -258,7 +345,7 @@ def _abi_trim(seq_record):
         # marking the end of sequence segment with highest cummulative score
         trim_finish = cummul_score.index(max(cummul_score))
 
-        return seq_record[trim_start:trim_finish]
+        return trim_start, trim_finish
 
 
 def _parse_tag_data(elem_code, elem_num, raw_data):
@@ -295,7 +382,7 @@ def _parse_tag_data(elem_code, elem_num, raw_data):
             return bool(data)
         elif elem_code == 18:
             return _bytes_to_string(data[1:])
-        elif self.elem_code == 19:
+        elif elem_code == 19:
             return _bytes_to_string(data[:-1])
         else:
             return data
@@ -362,13 +362,13 @@ def _sff_do_slow_index(handle):
         if read_header_length < 10 or read_header_length % 8 != 0:
             raise ValueError("Malformed read header, says length is %i:\n%s"
                              % (read_header_length, repr(data)))
-        #now the name and any padding (remainder of header)
-        name = _bytes_to_string(handle.read(name_length))
+        #now the name and any padding (remainder of header), in one read
+        data = handle.read(read_header_length - read_header_size)
+        name = _bytes_to_string(data[:name_length])
         padding = read_header_length - read_header_size - name_length
-        if handle.read(padding).count(_null) != padding:
+        if data[name_length:].count(_null) != padding:
             raise ValueError("Post name %i byte padding region contained data"
                              % padding)
-        assert record_offset + read_header_length == handle.tell()
         #now the flowgram values, flowgram index, bases and qualities
         size = read_flow_size + 3 * seq_len
         handle.seek(size, 1)
@@ -534,13 +534,149 @@ def _sff_read_roche_index(handle):
         raise ValueError("Problem with index length? %i vs %i"
                          % (handle.tell(), read_index_offset + read_index_size))
 
+def _sff_roche_index_block(index, xml=None):
+    """Build a Roche style ".mft1.00" index block (PRIVATE).
+
+    index - list of (name, offset) tuples, with the names as bytes
+    xml - Optional XML manifest string (a Biopython comment is used if None)
+
+    Returns the block as bytes, including any trailing padding to an 8 byte
+    boundary, and the index length to record in the SFF file header (which
+    excludes the padding).
+    """
+    if xml is not None:
+        xml = _as_bytes(xml)
+    else:
+        from Bio import __version__
+        xml = "<!-- This file was output with Biopython %s -->\n" % __version__
+        xml += "<!-- This XML and index block attempts to mimic Roche SFF files -->\n"
+        xml += "<!-- This file may be a combination of multiple SFF files etc -->\n"
+        xml = _as_bytes(xml)
+    xml_len = len(xml)
+    fmt = ">I4BLL"
+    fmt_size = struct.calcsize(fmt)
+    fmt2 = ">6B"
+    assert 6 == struct.calcsize(fmt2)
+    entries = []
+    for name, offset in sorted(index):
+        #Roche files record the offsets using base 255 not 256.
+        #See comments for parsing the index block. There may be a faster
+        #way to code this, but we can't easily use shifts due to odd base
+        off3 = offset
+        off0 = off3 % 255
+        off3 -= off0
+        off1 = off3 % 65025
+        off3 -= off1
+        off2 = off3 % 16581375
+        off3 -= off2
+        assert offset == off0 + off1 + off2 + off3, \
+            "%i -> %i %i %i %i" % (offset, off0, off1, off2, off3)
+        off3, off2, off1, off0 = off3 // 16581375, off2 // 65025, \
+            off1 // 255, off0
+        assert off0 < 255 and off1 < 255 and off2 < 255 and off3 < 255, \
+            "%i -> %i %i %i %i" % (offset, off0, off1, off2, off3)
+        entries.append(name + struct.pack(fmt2, 0,
+                                          off3, off2, off1, off0, 255))
+    entries = _as_bytes("").join(entries)
+    index_len = len(entries)
+    block = struct.pack(fmt, 778921588,  # magic number
+                        49, 46, 48, 48,  # Roche index version, "1.00"
+                        xml_len, index_len) + xml + entries
+    #Note any padding in not included in the length in the header.
+    #Pad out to an 8 byte boundary (although I have noticed some
+    #real Roche SFF files neglect to do this depsite their manual
+    #suggesting this padding should be there):
+    length = len(block)
+    if length % 8:
+        block += _null * (8 - (length % 8))
+    return block, length
+
+
+def AddRocheIndex(handle, xml=None):
+    """Appends a Roche style read index to an SFF file which lacks one.
+
+    handle - SFF file opened for both reading and writing in binary mode
+             (e.g. mode "r+b"), it must support seek and tell.
+    xml - Optional string argument, xml manifest to be recorded in the index
+          block (see function ReadRocheXmlManifest).
+
+    SFF files without an index (such as those from Ion Torrent) have to be
+    scanned in full each time they are indexed with Bio.SeqIO.index(). This
+    function does that scan once, writes the read index at the end of the
+    file and updates the file header, so future indexing is fast. The reads
+    themselves are not changed.
+
+    Returns the number of reads indexed. Raises a ValueError if the file
+    already has an index block, or is too large for the Roche index.
+
+    For example, first we'll make an SFF file without an index:
+
+    >>> import os
+    >>> from Bio import SeqIO
+    >>> records = SeqIO.parse("Roche/E3MFGYR02_random_10_reads.sff", "sff")
+    >>> handle = open("temp_indexed.sff", "wb")
+    >>> count = SffWriter(handle, index=False).write_file(records)
+    >>> handle.close()
+
+    Now add the index, and use it via Bio.SeqIO.index():
+
+    >>> handle = open("temp_indexed.sff", "r+b")
+    >>> AddRocheIndex(handle)
+    10
+    >>> handle.close()
+    >>> reads = SeqIO.index("temp_indexed.sff", "sff")
+    >>> print reads["E3MFGYR02JHD4H"].id
+    E3MFGYR02JHD4H
+    >>> reads.close()
+    >>> os.remove("temp_indexed.sff")
+
+    """
+    handle.seek(0)
+    header_length, index_offset, index_length, number_of_reads, \
+        number_of_flows_per_read, flow_chars, key_sequence \
+        = _sff_file_header(handle)
+    if index_offset or index_length:
+        raise ValueError("This SFF file already has an index block")
+    index = []
+    for name, offset in _sff_do_slow_index(handle):
+        #Using a four-digit base 255 number, see SffWriter.write_record
+        if offset > 4228250624:
+            raise ValueError("Read %s has file offset %i, which is too large "
+                             "to store in the Roche SFF index structure."
+                             % (name, offset))
+        index.append((_as_bytes(name), offset))
+    #Should now be at the end of the reads, which is a multiple of 8
+    index_offset = handle.tell()
+    if handle.read(1):
+        raise ValueError("Additional data at end of SFF file")
+    handle.seek(index_offset)
+    block, index_length = _sff_roche_index_block(index, xml)
+    handle.write(block)
+    #Update the index offset and length in the header (after the magic
+    #number and version, see _sff_file_header)
+    handle.seek(8)
+    handle.write(struct.pack(">QI", index_offset, index_length))
+    handle.flush()
+    return len(index)
+
+
 _valid_UAN_read_name = re.compile(r'^[a-zA-Z0-9]{14}$')
+_read_header_fmt = '>2HI4H'
+_read_header_size = struct.calcsize(_read_header_fmt)
+assert _read_header_size % 8 == 0  # Important for padding calc later!
 
 
-def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
-                         key_sequence, alphabet, trim=False):
-    """Parse the next read in the file, return data as a SeqRecord (PRIVATE)."""
-    #Now on to the reads...
+def _sff_read_fields(handle, read_flow_size):
+    """Read the next read in the file as a tuple of values (PRIVATE).
+
+    Returns the read name, the sequence length, the four clipping values
+    (in python counting) and a single bytes buffer holding the flowgram
+    values, flowgram index, bases and qualities (without the padding).
+
+    The variable length part of the read is fetched with a single read
+    call, and nothing in it is decoded, so callers only pay for the fields
+    they actually use (e.g. struct.unpack_from with offsets).
+    """
     #the read header format (fixed part):
     #read_header_length     H
     #name_length            H
@@ -550,14 +686,9 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
     #clip_adapter_left      H
     #clip_adapter_right     H
     #[rest of read header depends on the name length etc]
-    read_header_fmt = '>2HI4H'
-    read_header_size = struct.calcsize(read_header_fmt)
-    read_flow_fmt = ">%iH" % number_of_flows_per_read
-    read_flow_size = struct.calcsize(read_flow_fmt)
-
     read_header_length, name_length, seq_len, clip_qual_left, \
         clip_qual_right, clip_adapter_left, clip_adapter_right \
-        = struct.unpack(read_header_fmt, handle.read(read_header_size))
+        = struct.unpack(_read_header_fmt, handle.read(_read_header_size))
     if clip_qual_left:
         clip_qual_left -= 1  # python counting
     if clip_adapter_left:
@@ -566,25 +697,31 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
         raise ValueError("Malformed read header, says length is %i"
                          % read_header_length)
     #now the name and any padding (remainder of header)
-    name = _bytes_to_string(handle.read(name_length))
-    padding = read_header_length - read_header_size - name_length
-    if handle.read(padding).count(_null) != padding:
+    data = handle.read(read_header_length - _read_header_size)
+    name = _bytes_to_string(data[:name_length])
+    padding = read_header_length - _read_header_size - name_length
+    if data[name_length:].count(_null) != padding:
         raise ValueError("Post name %i byte padding region contained data"
                          % padding)
     #now the flowgram values, flowgram index, bases and qualities
     #NOTE - assuming flowgram_format==1, which means struct type H
-    flow_values = handle.read(read_flow_size)  # unpack later if needed
-    temp_fmt = ">%iB" % seq_len  # used for flow index and quals
-    flow_index = handle.read(seq_len)  # unpack later if needed
-    seq = _bytes_to_string(handle.read(seq_len))  # TODO - Use bytes in Seq?
-    quals = list(struct.unpack(temp_fmt, handle.read(seq_len)))
-    #now any padding...
-    padding = (read_flow_size + seq_len * 3) % 8
+    size = read_flow_size + seq_len * 3
+    padding = size % 8
     if padding:
         padding = 8 - padding
-        if handle.read(padding).count(_null) != padding:
-            raise ValueError("Post quality %i byte padding region contained data"
-                             % padding)
+    data = handle.read(size + padding)
+    if len(data) != size + padding:
+        raise ValueError("Premature end of file in read %s" % name)
+    if padding and data[size:].count(_null) != padding:
+        raise ValueError("Post quality %i byte padding region contained data"
+                         % padding)
+    return name, seq_len, clip_qual_left, clip_qual_right, \
+        clip_adapter_left, clip_adapter_right, data[:size]
+
+
+def _sff_clip_region(seq_len, clip_qual_left, clip_qual_right,
+                     clip_adapter_left, clip_adapter_right):
+    """Combine the SFF clipping values into a single left/right pair (PRIVATE)."""
     #Follow Roche and apply most aggressive of qual and adapter clipping.
     #Note Roche seems to ignore adapter clip fields when writing SFF,
     #and uses just the quality clipping values for any clipping.
@@ -600,10 +737,28 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
         clip_right = clip_adapter_right
     else:
         clip_right = seq_len
+    return clip_left, clip_right
+
+
+def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
+                         key_sequence, alphabet, trim=False):
+    """Parse the next read in the file, return data as a SeqRecord (PRIVATE)."""
+    read_flow_size = 2 * number_of_flows_per_read
+    name, seq_len, clip_qual_left, clip_qual_right, clip_adapter_left, \
+        clip_adapter_right, data = _sff_read_fields(handle, read_flow_size)
+    clip_left, clip_right = _sff_clip_region(seq_len,
+                                             clip_qual_left, clip_qual_right,
+                                             clip_adapter_left,
+                                             clip_adapter_right)
+    #The buffer holds flow values, flow index, bases then qualities
+    start = read_flow_size + seq_len
+    seq = _bytes_to_string(data[start:start + seq_len])
     #Now build a SeqRecord
     if trim:
+        #No need to decode the flowgram at all in this case
         seq = seq[clip_left:clip_right].upper()
-        quals = quals[clip_left:clip_right]
+        quals = data[start + seq_len:][clip_left:clip_right]
+        quals = list(struct.unpack(">%iB" % len(quals), quals))
         #Don't record the clipping values, flow etc, they make no sense now:
         annotations = {}
     else:
@@ -611,8 +766,12 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
         seq = seq[:clip_left].lower() + \
             seq[clip_left:clip_right].upper() + \
             seq[clip_right:].lower()
-        annotations = {"flow_values": struct.unpack(read_flow_fmt, flow_values),
-                       "flow_index": struct.unpack(temp_fmt, flow_index),
+        temp_fmt = ">%iB" % seq_len  # used for flow index and quals
+        quals = list(struct.unpack_from(temp_fmt, data, start + seq_len))
+        annotations = {"flow_values": struct.unpack_from(
+                           ">%iH" % number_of_flows_per_read, data),
+                       "flow_index": struct.unpack_from(temp_fmt, data,
+                                                        read_flow_size),
                        "flow_chars": flow_chars,
                        "flow_key": key_sequence,
                        "clip_qual_left": clip_qual_left,
@@ -635,6 +794,35 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
     #Return the record and then continue...
     return record
 
+
+def _sff_read_seq_qual(handle, number_of_flows_per_read, flow_chars,
+                       key_sequence, trim=False):
+    """Parse the next read in the file, return name, sequence and qualities (PRIVATE).
+
+    This is a fast alternative to _sff_read_seq_record which skips over the
+    flowgram without decoding it, and does not build any SeqRecord or Seq
+    object. The sequence is returned as a string (mixed case as in the
+    SeqRecord from the "sff" format, or upper case and trimmed if trim=True),
+    and the PHRED qualities as a bytes string with one byte per base.
+    """
+    read_flow_size = 2 * number_of_flows_per_read
+    name, seq_len, clip_qual_left, clip_qual_right, clip_adapter_left, \
+        clip_adapter_right, data = _sff_read_fields(handle, read_flow_size)
+    clip_left, clip_right = _sff_clip_region(seq_len,
+                                             clip_qual_left, clip_qual_right,
+                                             clip_adapter_left,
+                                             clip_adapter_right)
+    start = read_flow_size + seq_len
+    seq = _bytes_to_string(data[start:start + seq_len])
+    quals = data[start + seq_len:]
+    if trim:
+        return name, seq[clip_left:clip_right].upper(), \
+            quals[clip_left:clip_right]
+    else:
+        return name, seq[:clip_left].lower() + \
+            seq[clip_left:clip_right].upper() + \
+            seq[clip_right:].lower(), quals
+
 _powers_of_36 = [36 ** i for i in range(6)]
 
 
@@ -745,8 +933,8 @@ class _AddTellHandle(object):
 
     def seek(self, offset):
         if offset < self._offset:
-            raise RunTimeError("Can't seek backwards")
-        self._handle.read(offset - self._offset)
+            raise RuntimeError("Can't seek backwards")
+        self.read(offset - self._offset)
 
     def close(self):
         return self._handle.close()
@@ -824,6 +1012,21 @@ def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
     if isinstance(Alphabet._get_base_alphabet(alphabet),
                   Alphabet.RNAAlphabet):
         raise ValueError("Invalid alphabet, SFF files do not hold RNA.")
+    for record in _sff_iterate(handle, _sff_read_seq_record, alphabet, trim):
+        yield record
+
+
+#This is a generator function!
+def _sff_iterate(handle, read_function, *args):
+    """Apply a read parsing function to each read in an SFF file (PRIVATE).
+
+    The read_function is called with the handle (positioned at the start of
+    a read), the number of flows per read, the flow characters, the key
+    sequence and any additional arguments given, and should consume exactly
+    one read from the handle. Its return values are yielded in turn.
+
+    This takes care of any index block before or among the reads.
+    """
     try:
         assert 0 == handle.tell()
     except AttributeError:
@@ -832,24 +1035,6 @@ def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
     header_length, index_offset, index_length, number_of_reads, \
         number_of_flows_per_read, flow_chars, key_sequence \
         = _sff_file_header(handle)
-    #Now on to the reads...
-    #the read header format (fixed part):
-    #read_header_length     H
-    #name_length            H
-    #seq_len                I
-    #clip_qual_left         H
-    #clip_qual_right        H
-    #clip_adapter_left      H
-    #clip_adapter_right     H
-    #[rest of read header depends on the name length etc]
-    read_header_fmt = '>2HI4H'
-    read_header_size = struct.calcsize(read_header_fmt)
-    read_flow_fmt = ">%iH" % number_of_flows_per_read
-    read_flow_size = struct.calcsize(read_flow_fmt)
-    assert 1 == struct.calcsize(">B")
-    assert 1 == struct.calcsize(">s")
-    assert 1 == struct.calcsize(">c")
-    assert read_header_size % 8 == 0  # Important for padding calc later!
     #The spec allows for the index block to be before or even in the middle
     #of the reads. We can check that if we keep track of our position
     #in the file...
@@ -863,12 +1048,8 @@ def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
             #Now that we've done this, we don't need to do it again. Clear
             #the index_offset so we can skip extra handle.tell() calls:
             index_offset = 0
-        yield _sff_read_seq_record(handle,
-                                   number_of_flows_per_read,
-                                   flow_chars,
-                                   key_sequence,
-                                   alphabet,
-                                   trim)
+        yield read_function(handle, number_of_flows_per_read,
+                            flow_chars, key_sequence, *args)
     #The following is not essential, but avoids confusing error messages
     #for the user if they try and re-parse the same handle.
     if index_offset and handle.tell() == index_offset:
@@ -972,65 +1153,11 @@ class SffWriter(SequenceWriter):
     def _write_index(self):
         assert len(self._index) == self._number_of_reads
         handle = self.handle
-        self._index.sort()
         self._index_start = handle.tell()  # need for header
-        #XML...
-        if self._xml is not None:
-            xml = _as_bytes(self._xml)
-        else:
-            from Bio import __version__
-            xml = "<!-- This file was output with Biopython %s -->\n" % __version__
-            xml += "<!-- This XML and index block attempts to mimic Roche SFF files -->\n"
-            xml += "<!-- This file may be a combination of multiple SFF files etc -->\n"
-            xml = _as_bytes(xml)
-        xml_len = len(xml)
-        #Write to the file...
-        fmt = ">I4BLL"
-        fmt_size = struct.calcsize(fmt)
-        handle.write(_null * fmt_size + xml)  # fill this later
-        fmt2 = ">6B"
-        assert 6 == struct.calcsize(fmt2)
-        self._index.sort()
-        index_len = 0  # don't know yet!
-        for name, offset in self._index:
-            #Roche files record the offsets using base 255 not 256.
-            #See comments for parsing the index block. There may be a faster
-            #way to code this, but we can't easily use shifts due to odd base
-            off3 = offset
-            off0 = off3 % 255
-            off3 -= off0
-            off1 = off3 % 65025
-            off3 -= off1
-            off2 = off3 % 16581375
-            off3 -= off2
-            assert offset == off0 + off1 + off2 + off3, \
-                "%i -> %i %i %i %i" % (offset, off0, off1, off2, off3)
-            off3, off2, off1, off0 = off3 // 16581375, off2 // 65025, \
-                off1 // 255, off0
-            assert off0 < 255 and off1 < 255 and off2 < 255 and off3 < 255, \
-                "%i -> %i %i %i %i" % (offset, off0, off1, off2, off3)
-            handle.write(name + struct.pack(fmt2, 0,
-                                            off3, off2, off1, off0, 255))
-            index_len += len(name) + 6
-        #Note any padding in not included:
-        self._index_length = fmt_size + xml_len + index_len  # need for header
-        #Pad out to an 8 byte boundary (although I have noticed some
-        #real Roche SFF files neglect to do this depsite their manual
-        #suggesting this padding should be there):
-        if self._index_length % 8:
-            padding = 8 - (self._index_length % 8)
-            handle.write(_null * padding)
-        else:
-            padding = 0
+        block, self._index_length = _sff_roche_index_block(self._index,
+                                                           self._xml)
+        handle.write(block)
         offset = handle.tell()
-        assert offset == self._index_start + self._index_length + padding, \
-            "%i vs %i + %i + %i" % (offset, self._index_start,
-                                    self._index_length, padding)
-        #Must now go back and update the index header with index size...
-        handle.seek(self._index_start)
-        handle.write(struct.pack(fmt, 778921588,  # magic number
-                                 49, 46, 48, 48,  # Roche index version, "1.00"
-                                 xml_len, index_len) + xml)
         #Must now go back and update the header...
         handle.seek(0)
         self.write_header()
@@ -41,7 +41,7 @@ NS = "{http://uniprot.org/uniprot}"
 REFERENCE_JOURNAL = "%(name)s %(volume)s:%(first)s-%(last)s(%(pub_date)s)"
 
 
-def UniprotIterator(handle, alphabet=Alphabet.ProteinAlphabet(), return_raw_comments=False):
+def UniprotIterator(handle, alphabet=Alphabet.ProteinAlphabet(), return_raw_comments=False, skip_tags=None):
     """Generator function to parse UniProt XML as SeqRecord objects.
 
     parses an XML entry at a time from any UniProt XML file
@@ -50,7 +50,17 @@ def UniprotIterator(handle, alphabet=Alphabet.ProteinAlphabet(), return_raw_comm
     This generator can be used in Bio.SeqIO
 
     return_raw_comments = True --> comment fields are returned as complete XML to allow further processing
-    skip_parsing_errors = True --> if parsing errors are found, skip to next entry
+    skip_tags = list of entry sub-elements not to parse, e.g. ["comment", "reference", "feature"]
+
+    Each entry's XML elements are discarded as soon as the SeqRecord has
+    been built (and any skipped sub-elements as soon as they have been read),
+    so memory use does not grow with the size of the file.
+
+    >>> handle = open("SwissProt/uni003")
+    >>> for record in UniprotIterator(handle, skip_tags=["comment", "feature"]):
+    ...     print record.id, len(record), len(record.features)
+    O44185 160 0
+    >>> handle.close()
     """
     if isinstance(alphabet, Alphabet.NucleotideAlphabet):
         raise ValueError("Wrong alphabet %r" % alphabet)
@@ -71,22 +81,49 @@ def UniprotIterator(handle, alphabet=Alphabet.ProteinAlphabet(), return_raw_comm
                 "Use Python 2.5+, lxml or elementtree if you "
                 "want to use Bio.SeqIO.UniprotIO.")
 
+    if skip_tags:
+        skip_tags = set(NS + tag for tag in skip_tags)
+    else:
+        skip_tags = set()
+    #The root <uniprot> element would otherwise keep a reference to every
+    #(cleared) entry, so we track it and clear it too. The depth of the
+    #current <entry> element lets us spot its direct children.
+    root = None
+    depth = 0
+    entry_depth = None
     for event, elem in ElementTree.iterparse(handle, events=("start", "end")):
-        if event == "end" and elem.tag == NS + "entry":
-            yield Parser(elem, alphabet=alphabet, return_raw_comments=return_raw_comments).parse()
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = elem
+            if elem.tag == NS + "entry":
+                entry_depth = depth
+            continue
+        depth -= 1
+        if depth == entry_depth and elem.tag in skip_tags:
+            #Sub-element of an entry which we won't need
             elem.clear()
-
+        elif elem.tag == NS + "entry":
+            yield Parser(elem, alphabet=alphabet, return_raw_comments=return_raw_comments,
+                         skip_tags=skip_tags).parse()
+            elem.clear()
+            entry_depth = None
+            if root is not elem:
+                root.clear()
 
 class Parser(object):
     """Parse a UniProt XML entry to a SeqRecord.
 
     return_raw_comments=True to get back the complete comment field in XML format
     alphabet=Alphabet.ProteinAlphabet()    can be modified if needed, default is protein alphabet.
+    skip_tags=set of fully qualified sub-element tags not to be parsed.
     """
-    def __init__(self, elem, alphabet=Alphabet.ProteinAlphabet(), return_raw_comments=False):
+    def __init__(self, elem, alphabet=Alphabet.ProteinAlphabet(), return_raw_comments=False,
+                 skip_tags=()):
         self.entry = elem
         self.alphabet = alphabet
         self.return_raw_comments = return_raw_comments
+        self.skip_tags = skip_tags
 
     def parse(self):
         """Parse the input."""
@@ -480,8 +517,11 @@ class Parser(object):
                 self.ParsedSeqRecord.annotations[k] = v  # to cope with swissProt plain text parser
 
         #Top-to-bottom entry children parsing
+        skip_tags = self.skip_tags
         for element in self.entry:
-            if element.tag == NS + 'name':
+            if element.tag in skip_tags:
+                pass
+            elif element.tag == NS + 'name':
                 _parse_name(element)
             elif element.tag == NS + 'accession':
                 _parse_accession(element)
@@ -522,3 +562,8 @@ class Parser(object):
             self.ParsedSeqRecord.id = self.ParsedSeqRecord.annotations['accessions'][0]
 
         return self.ParsedSeqRecord
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -326,8 +326,120 @@ def _fastq_illumina_convert_qual(in_handle, out_handle, alphabet=None):
     return _fastq_convert_qual(in_handle, out_handle, mapping)
 
 
+def _raw_qual_convert_fastq(entries, out_handle):
+    """Sanger FASTQ writer for (title, seq, PHRED quality bytes) tuples (PRIVATE).
+
+    Used for binary formats like SFF and ABI which store one PHRED quality
+    byte per base, mapping the raw bytes straight into the FASTQ quality
+    string without building SeqRecord objects or lists of integers.
+    """
+    from Bio._py3k import _bytes_to_string, _as_bytes
+    #Map PHRED 0 to 93 onto ASCII 33 to 126, truncating anything higher
+    mapping = _as_bytes("".join(chr(min(126, q + 33)) for q in range(256)))
+    valid = _as_bytes("".join(chr(q) for q in range(0, 93 + 1)))
+    count = 0
+    warned = False
+    for title, seq, qual in entries:
+        count += 1
+        if not warned and qual.translate(None, valid):
+            import warnings
+            from Bio import BiopythonWarning
+            warnings.warn("Data loss - max PHRED quality 93 in Sanger FASTQ",
+                          BiopythonWarning)
+            warned = True
+        out_handle.write("@%s\n%s\n+\n%s\n"
+                         % (title, seq, _bytes_to_string(qual.translate(mapping))))
+    return count
+
+
+def _raw_qual_convert_fasta(entries, out_handle):
+    """FASTA writer for (title, seq, PHRED quality bytes) tuples (PRIVATE)."""
+    count = 0
+    for title, seq, qual in entries:
+        count += 1
+        out_handle.write(">%s\n" % title)
+        #Do line wrapping
+        for i in range(0, len(seq), 60):
+            out_handle.write(seq[i:i + 60] + "\n")
+    return count
+
+
+def _sff_convert_fastq(in_handle, out_handle, trim=False):
+    """SFF to Sanger FASTQ helper function (PRIVATE).
+
+    Skips the flowgram values and indexes entirely.
+    """
+    from Bio.SeqIO.SffIO import _sff_iterate, _sff_read_seq_qual
+    return _raw_qual_convert_fastq(_sff_iterate(in_handle, _sff_read_seq_qual,
+                                                trim), out_handle)
+
+
+def _sff_convert_fasta(in_handle, out_handle, trim=False):
+    """SFF to FASTA helper function (PRIVATE)."""
+    from Bio.SeqIO.SffIO import _sff_iterate, _sff_read_seq_qual
+    return _raw_qual_convert_fasta(_sff_iterate(in_handle, _sff_read_seq_qual,
+                                                trim), out_handle)
+
+
+def _abi_base_calls(in_handle, trim=False):
+    """Returns a list holding the base calls of an ABI file (PRIVATE)."""
+    from Bio.SeqIO.AbiIO import _abi_base_calls
+    entry = _abi_base_calls(in_handle, trim)
+    if entry is None:
+        return []
+    return [entry]
+
+
+def _sff_untrimmed_convert_fastq(in_handle, out_handle, alphabet=None):
+    """Fast SFF to Sanger FASTQ conversion (PRIVATE)."""
+    return _sff_convert_fastq(in_handle, out_handle, trim=False)
+
+
+def _sff_trimmed_convert_fastq(in_handle, out_handle, alphabet=None):
+    """Fast trimmed SFF to Sanger FASTQ conversion (PRIVATE)."""
+    return _sff_convert_fastq(in_handle, out_handle, trim=True)
+
+
+def _sff_untrimmed_convert_fasta(in_handle, out_handle, alphabet=None):
+    """Fast SFF to FASTA conversion (PRIVATE)."""
+    return _sff_convert_fasta(in_handle, out_handle, trim=False)
+
+
+def _sff_trimmed_convert_fasta(in_handle, out_handle, alphabet=None):
+    """Fast trimmed SFF to FASTA conversion (PRIVATE)."""
+    return _sff_convert_fasta(in_handle, out_handle, trim=True)
+
+
+def _abi_untrimmed_convert_fastq(in_handle, out_handle, alphabet=None):
+    """Fast ABI to Sanger FASTQ conversion (PRIVATE)."""
+    return _raw_qual_convert_fastq(_abi_base_calls(in_handle), out_handle)
+
+
+def _abi_trimmed_convert_fastq(in_handle, out_handle, alphabet=None):
+    """Fast trimmed ABI to Sanger FASTQ conversion (PRIVATE)."""
+    return _raw_qual_convert_fastq(_abi_base_calls(in_handle, True),
+                                   out_handle)
+
+
+def _abi_untrimmed_convert_fasta(in_handle, out_handle, alphabet=None):
+    """Fast ABI to FASTA conversion (PRIVATE)."""
+    return _raw_qual_convert_fasta(_abi_base_calls(in_handle), out_handle)
+
+
+def _abi_trimmed_convert_fasta(in_handle, out_handle, alphabet=None):
+    """Fast trimmed ABI to FASTA conversion (PRIVATE)."""
+    return _raw_qual_convert_fasta(_abi_base_calls(in_handle, True),
+                                   out_handle)
+
+
 #TODO? - Handling aliases explicitly would let us shorten this list:
 _converter = {
+    ("abi", "fasta"): _abi_untrimmed_convert_fasta,
+    ("abi", "fastq"): _abi_untrimmed_convert_fastq,
+    ("abi", "fastq-sanger"): _abi_untrimmed_convert_fastq,
+    ("abi-trim", "fasta"): _abi_trimmed_convert_fasta,
+    ("abi-trim", "fastq"): _abi_trimmed_convert_fastq,
+    ("abi-trim", "fastq-sanger"): _abi_trimmed_convert_fastq,
     ("genbank", "fasta"): _genbank_convert_fasta,
     ("gb", "fasta"): _genbank_convert_fasta,
     ("embl", "fasta"): _embl_convert_fasta,
@@ -359,6 +471,12 @@ _converter = {
     ("fastq-sanger", "qual"): _fastq_sanger_convert_qual,
     ("fastq-solexa", "qual"): _fastq_solexa_convert_qual,
     ("fastq-illumina", "qual"): _fastq_illumina_convert_qual,
+    ("sff", "fasta"): _sff_untrimmed_convert_fasta,
+    ("sff", "fastq"): _sff_untrimmed_convert_fastq,
+    ("sff", "fastq-sanger"): _sff_untrimmed_convert_fastq,
+    ("sff-trim", "fasta"): _sff_trimmed_convert_fasta,
+    ("sff-trim", "fastq"): _sff_trimmed_convert_fastq,
+    ("sff-trim", "fastq-sanger"): _sff_trimmed_convert_fastq,
 }
 
 
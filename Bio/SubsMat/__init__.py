@@ -106,6 +106,34 @@ Methods for subtraction, addition and multiplication of matrices:
 * Jensen-Shannon distance between the distributions from which the
   matrices are derived. This is a distance function based on the
   distribution's entropies.
+
+Using NumPy arrays:
+------------------
+If NumPy is installed, a matrix can be turned into a square array with
+the to_array method, and a SeqMat (or any of its subclasses) can be made
+from such an array together with an alphabet. The rows and columns of
+the array follow the letters of the alphabet in sorted order (as in the
+ab_list attribute), and the array is symmetric: both [i, j] and [j, i]
+hold the half-matrix value for the pair of letters. For example,
+
+>>> from Bio import Alphabet
+>>> from Bio.SubsMat import SeqMat
+>>> alphabet = Alphabet.Alphabet()
+>>> alphabet.letters = "CA"
+>>> mat = SeqMat({('A', 'A'): 5, ('A', 'C'): 3, ('C', 'C'): 2}, alphabet)
+>>> mat.ab_list
+['A', 'C']
+>>> mat.to_array().tolist()
+[[5.0, 3.0], [3.0, 2.0]]
+>>> SeqMat(mat.to_array(), alphabet) == mat
+True
+
+With NumPy, the construction of the observed frequency, expected frequency,
+substitution and log-odds matrices, and the comparisons of matrices, are
+done using array operations. The function make_log_odds_arrays works
+directly on arrays, including on a stack of several count matrices at once,
+which is useful to make many matrices (e.g. from alignments clustered at
+different thresholds) in one go.
 """
 
 
@@ -120,6 +148,11 @@ import Bio
 from Bio import Alphabet
 from Bio.SubsMat import FreqTable
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 log = math.log
 # Matrix types
 NOTYPE = 0
@@ -131,6 +164,90 @@ LO = 5
 EPSILON = 0.00000000000001
 
 
+def _array_to_dict(array, letters):
+    """Turn a square array into a half-matrix dictionary (PRIVATE).
+
+    The rows and columns of the array are in the order of letters, which
+    should be sorted.  Only the upper triangle (including the diagonal)
+    of the array is used.
+    """
+    n = len(letters)
+    if array.shape != (n, n):
+        raise ValueError("Expected a %i by %i array for alphabet %s, got shape %s"
+                         % (n, n, "".join(letters), repr(array.shape)))
+    values = array.tolist()
+    data = {}
+    for i, letter in enumerate(letters):
+        row = values[i]
+        for j in range(i, n):
+            data[letter, letters[j]] = row[j]
+    return data
+
+
+def _half_mask(n, diagonal=True, off_diagonal=True):
+    """Boolean mask selecting the half-matrix entries of an n by n array (PRIVATE)."""
+    mask = numpy.zeros((n, n), bool)
+    if off_diagonal:
+        mask[numpy.triu_indices(n, 1)] = True
+    if diagonal:
+        mask[numpy.diag_indices(n)] = True
+    return mask
+
+
+def _obs_freq_array(acc_rep):
+    """Observed frequencies from (a stack of) count arrays (PRIVATE)."""
+    mask = _half_mask(acc_rep.shape[-1])
+    total = acc_rep[..., mask].sum(axis=-1)
+    return acc_rep / numpy.asarray(total, float)[..., numpy.newaxis, numpy.newaxis]
+
+
+def _exp_freqs_from_obs_array(obs_freq):
+    """Expected letter frequencies from (a stack of) observed frequency arrays (PRIVATE).
+
+    Each letter gets all of its diagonal entry, and half of each of its
+    off-diagonal entries.
+    """
+    diagonal = numpy.diagonal(obs_freq, axis1=-2, axis2=-1)
+    return (obs_freq.sum(axis=-1) + diagonal) / 2.
+
+
+def _exp_freq_array(exp_freqs):
+    """Expected frequency array(s) from (a stack of) letter frequencies (PRIVATE)."""
+    exp_freqs = numpy.asarray(exp_freqs, float)
+    exp_freq = 2.0 * exp_freqs[..., :, numpy.newaxis] \
+               * exp_freqs[..., numpy.newaxis, :]
+    index = numpy.arange(exp_freqs.shape[-1])
+    exp_freq[..., index, index] = exp_freqs ** 2
+    return exp_freq
+
+
+def _subs_array(obs_freq, exp_freq):
+    """Substitution array(s) from observed and expected frequencies (PRIVATE)."""
+    if not exp_freq.all():
+        raise ZeroDivisionError("Expected frequency of zero")
+    return obs_freq / exp_freq
+
+
+def _log_odds_array(subs, logbase=2, factor=10.0, round_digit=0, keep_nd=0):
+    """Log-odds array(s) from (a stack of) substitution arrays (PRIVATE).
+
+    See _build_log_odds_mat for the arguments.
+    """
+    not_determined = subs < EPSILON
+    olderr = numpy.seterr(divide="ignore", invalid="ignore")
+    try:
+        lo = numpy.round(factor * numpy.log(subs) / log(logbase), round_digit)
+    finally:
+        numpy.seterr(**olderr)
+    lo[not_determined] = -999
+    if not keep_nd:
+        mat_min = lo.min(axis=-1).min(axis=-1)
+        lo = numpy.where(lo <= -999,
+                         numpy.asarray(mat_min)[..., numpy.newaxis, numpy.newaxis],
+                         lo)
+    return lo
+
+
 class SeqMat(dict):
     """A Generic sequence matrix class
     The key is a 2-tuple containing the letter indices of the matrix. Those
@@ -163,9 +280,15 @@ class SeqMat(dict):
         # 1) None --> then self.data is an empty dictionary
         # 2) type({}) --> then self takes the items in data
         # 3) An instance of SeqMat
+        # 4) A square NumPy array, with rows and columns in the sorted order
+        #    of the alphabet letters (which must then be given)
         # This whole creation-during-execution is done to avoid changing
         # default values, the way Python does because default values are
         # created when the function is defined, not when it is created.
+        if hasattr(data, "shape"):
+            if alphabet is None or not alphabet.letters:
+                raise ValueError("An alphabet with letters is needed with an array")
+            data = _array_to_dict(data, sorted(alphabet.letters))
         if data:
             try:
                 self.update(data)
@@ -226,7 +349,30 @@ class SeqMat(dict):
             for j in self.ab_list[:self.ab_list.index(i)+1]:
                 self[j, i] = 0.
 
+    def to_array(self):
+        """Return the matrix as a square NumPy array.
+
+        The rows and columns are in the order of the ab_list attribute (the
+        sorted letters of the alphabet). The array is symmetric, with both
+        [i, j] and [j, i] holding the value for the pair of letters.
+        """
+        if numpy is None:
+            raise ImportError("Please install Numerical Python (numpy) if you want to use this function")
+        index = dict((letter, i) for i, letter in enumerate(self.ab_list))
+        array = numpy.zeros((len(index), len(index)))
+        for (letter1, letter2), value in self.iteritems():
+            i = index[letter1]
+            j = index[letter2]
+            array[i, j] = value
+            array[j, i] = value
+        return array
+
     def make_entropy(self):
+        if numpy is not None:
+            values = numpy.array(self.values(), float)
+            values = values[values > EPSILON]
+            self.entropy = -float((values * numpy.log(values)).sum()) / log(2)
+            return
         self.entropy = 0
         for i in self:
             if self[i] > EPSILON:
@@ -375,6 +521,13 @@ class SubstitutionMatrix(SeqMat):
     def calculate_relative_entropy(self, obs_freq_mat):
         """Calculate and return the relative entropy with respect to an
         observed frequency matrix"""
+        if numpy is not None and self.ab_list == obs_freq_mat.ab_list:
+            mask = _half_mask(len(self.ab_list))
+            values = self.to_array()[mask]
+            obs_freqs = obs_freq_mat.to_array()[mask]
+            used = values > EPSILON
+            return float((obs_freqs[used] * numpy.log(values[used])).sum()) \
+                   / log(2)
         relative_entropy = 0.
         for key, value in self.iteritems():
             if value > EPSILON:
@@ -389,6 +542,11 @@ class LogOddsMatrix(SeqMat):
     def calculate_relative_entropy(self, obs_freq_mat):
         """Calculate and return the relative entropy with respect to an
         observed frequency matrix"""
+        if numpy is not None and self.ab_list == obs_freq_mat.ab_list:
+            mask = _half_mask(len(self.ab_list))
+            values = self.to_array()[mask]
+            obs_freqs = obs_freq_mat.to_array()[mask]
+            return float((obs_freqs * values).sum()) / log(2)
         relative_entropy = 0.
         for key, value in self.iteritems():
             relative_entropy += obs_freq_mat[key] * value / log(2)
@@ -402,6 +560,9 @@ def _build_obs_freq_mat(acc_rep_mat):
     The acc_rep_mat matrix should be generated by the user.
     """
     # Note: acc_rep_mat should already be a half_matrix!!
+    if numpy is not None:
+        return ObservedFrequencyMatrix(_obs_freq_array(acc_rep_mat.to_array()),
+                                       alphabet=acc_rep_mat.alphabet)
     total = float(sum(acc_rep_mat.values()))
     obs_freq_mat = ObservedFrequencyMatrix(alphabet=acc_rep_mat.alphabet,
                                            build_later=1)
@@ -411,6 +572,10 @@ def _build_obs_freq_mat(acc_rep_mat):
 
 
 def _exp_freq_table_from_obs_freq(obs_freq_mat):
+    if numpy is not None:
+        exp_freqs = _exp_freqs_from_obs_array(obs_freq_mat.to_array())
+        exp_freq_table = dict(zip(obs_freq_mat.ab_list, exp_freqs.tolist()))
+        return FreqTable.FreqTable(exp_freq_table, FreqTable.FREQ)
     exp_freq_table = {}
     for i in obs_freq_mat.alphabet.letters:
         exp_freq_table[i] = 0.
@@ -427,6 +592,11 @@ def _build_exp_freq_mat(exp_freq_table):
     """Build an expected frequency matrix
     exp_freq_table: should be a FreqTable instance
     """
+    if numpy is not None:
+        letters = sorted(exp_freq_table.alphabet.letters)
+        exp_freqs = [exp_freq_table[letter] for letter in letters]
+        return ExpectedFrequencyMatrix(_exp_freq_array(exp_freqs),
+                                       alphabet=exp_freq_table.alphabet)
     exp_freq_mat = ExpectedFrequencyMatrix(alphabet=exp_freq_table.alphabet,
                                           build_later=1)
     for i in exp_freq_mat:
@@ -444,6 +614,9 @@ def _build_subs_mat(obs_freq_mat, exp_freq_mat):
     """ Build the substitution matrix """
     if obs_freq_mat.ab_list != exp_freq_mat.ab_list:
         raise ValueError("Alphabet mismatch in passed matrices")
+    if numpy is not None:
+        subs = _subs_array(obs_freq_mat.to_array(), exp_freq_mat.to_array())
+        return SubstitutionMatrix(_array_to_dict(subs, obs_freq_mat.ab_list))
     subs_mat = SubstitutionMatrix(obs_freq_mat)
     for i in obs_freq_mat:
         subs_mat[i] = obs_freq_mat[i]/exp_freq_mat[i]
@@ -463,6 +636,10 @@ def _build_log_odds_mat(subs_mat, logbase=2, factor=10.0, round_digit=0, keep_nd
     are no substitutions in the frequency substitutions matrix). If false, plants the
     minimum log-odds value of the matrix in entries containing -999
     """
+    if numpy is not None:
+        lo = _log_odds_array(subs_mat.to_array(), logbase, factor,
+                             round_digit, keep_nd)
+        return LogOddsMatrix(_array_to_dict(lo, subs_mat.ab_list))
     lo_mat = LogOddsMatrix(subs_mat)
     for key, value in subs_mat.iteritems():
         if value < EPSILON:
@@ -485,6 +662,16 @@ def _build_log_odds_mat(subs_mat, logbase=2, factor=10.0, round_digit=0, keep_nd
 #
 def make_log_odds_matrix(acc_rep_mat, exp_freq_table=None, logbase=2,
                          factor=1., round_digit=9, keep_nd=0):
+    if numpy is not None:
+        exp_freqs = None
+        if exp_freq_table:
+            if sorted(exp_freq_table.alphabet.letters) != acc_rep_mat.ab_list:
+                raise ValueError("Alphabet mismatch in passed matrices")
+            exp_freqs = [exp_freq_table[letter]
+                         for letter in acc_rep_mat.ab_list]
+        lo = make_log_odds_arrays(acc_rep_mat.to_array(), exp_freqs, logbase,
+                                  factor, round_digit, keep_nd)
+        return LogOddsMatrix(_array_to_dict(lo, acc_rep_mat.ab_list))
     obs_freq_mat = _build_obs_freq_mat(acc_rep_mat)
     if not exp_freq_table:
         exp_freq_table = _exp_freq_table_from_obs_freq(obs_freq_mat)
@@ -494,6 +681,29 @@ def make_log_odds_matrix(acc_rep_mat, exp_freq_table=None, logbase=2,
     return lo_mat
 
 
+def make_log_odds_arrays(acc_rep, exp_freqs=None, logbase=2, factor=1.,
+                         round_digit=9, keep_nd=0):
+    """Make log-odds matrices as NumPy arrays from accepted replacement counts.
+
+    acc_rep: a square array of accepted replacement counts, laid out as
+    returned by the to_array method of an AcceptedReplacementsMatrix (i.e.
+    symmetric). This may also be a stack of such arrays, with shape
+    (number of matrices, N, N), to make many log-odds matrices at once.
+    exp_freqs: optional expected letter frequencies, an array of length N
+    (or one row for each matrix in the stack). By default these are
+    calculated from the observed frequencies.
+
+    The other arguments are as for make_log_odds_matrix. Returns an array
+    of the same shape as acc_rep.
+    """
+    acc_rep = numpy.asarray(acc_rep, float)
+    obs_freq = _obs_freq_array(acc_rep)
+    if exp_freqs is None:
+        exp_freqs = _exp_freqs_from_obs_array(obs_freq)
+    subs = _subs_array(obs_freq, _exp_freq_array(exp_freqs))
+    return _log_odds_array(subs, logbase, factor, round_digit, keep_nd)
+
+
 def observed_frequency_to_substitution_matrix(obs_freq_mat):
     exp_freq_table = _exp_freq_table_from_obs_freq(obs_freq_mat)
     exp_freq_mat = _build_exp_freq_mat(exp_freq_table)
@@ -548,6 +758,20 @@ def two_mat_relative_entropy(mat_1, mat_2, logbase=2, diag=diagALL):
     rel_ent = 0.
     key_list_1 = sorted(mat_1)
     key_list_2 = sorted(mat_2)
+    if numpy is not None and key_list_1 == key_list_2 \
+    and mat_1.ab_list == mat_2.ab_list:
+        mask = _half_mask(len(mat_1.ab_list), diag != diagNO, diag != diagONLY)
+        values_1 = mat_1.to_array()[mask]
+        values_2 = mat_2.to_array()[mask]
+        used = (values_1 > EPSILON) & (values_2 > EPSILON)
+        values_1 = values_1[used]
+        values_2 = values_2[used]
+        if not len(values_1):
+            return rel_ent
+        values_1 = values_1 / values_1.sum()
+        values_2 = values_2 / values_2.sum()
+        return float((values_1 * numpy.log(values_1 / values_2)).sum()) \
+               / log(logbase)
     key_list = []
     sum_ent_1 = 0.
     sum_ent_2 = 0.
@@ -18,6 +18,7 @@ Reference          Holds reference data from a SwissProt record.
 Functions:
 read               Read one SwissProt record
 parse              Read multiple SwissProt records
+parse_raw          Iterate over the raw text of SwissProt records
 
 """
 
@@ -111,16 +112,47 @@ class Reference(object):
         self.location = []
 
 
-def parse(handle):
+def parse(handle, line_types=None):
+    """Read multiple SwissProt records from a handle.
+
+    If line_types is given, it should be a list (or set) of the two letter
+    line codes to decode, e.g. ["AC", "OX", "SQ"].  All other lines are
+    skipped without being looked at, leaving the matching Record members
+    at their empty defaults.  The ID line is always decoded.  Asking for
+    any reference line (RN, RP, RC, RX, RL, RA, RG or RT) decodes all the
+    reference lines, and asking for SQ includes the sequence itself:
+
+    >>> from Bio import SwissProt
+    >>> handle = open("SwissProt/multi_ex.txt")
+    >>> for record in SwissProt.parse(handle, ["AC", "SQ"]):
+    ...     print record.entry_name, len(record.sequence), len(record.features)
+    TPA_HUMAN 562 0
+    CBBQ_CHRVI 74 0
+    CBBQ_PSEHY 267 0
+    NIRQ_PSEAE 260 0
+    CHDH_HUMAN 594 0
+    IVBKI_DENPO 79 0
+    GRN_HUMAN 593 0
+    CEF_BPT4 71 0
+    >>> handle.close()
+
+    Skipping the comment, cross reference and feature tables this way
+    makes parsing large files considerably faster.
+    """
+    line_types = _line_types(line_types)
     while True:
-        record = _read(handle)
+        record = _read(handle, line_types)
         if not record:
             return
         yield record
 
 
-def read(handle):
-    record = _read(handle)
+def read(handle, line_types=None):
+    """Read one SwissProt record from a handle.
+
+    The optional line_types argument is as for the parse function.
+    """
+    record = _read(handle, _line_types(line_types))
     if not record:
         raise ValueError("No SwissProt record found")
     # We should have reached the end of the record by now
@@ -130,17 +162,84 @@ def read(handle):
     return record
 
 
+def parse_raw(handle):
+    """Iterate over the raw text of SwissProt records, without parsing them.
+
+    Each record is returned as a single string running from its ID line
+    up to and including the terminating // line, matching the get_raw
+    method of a Bio.SeqIO.index(..., "swiss") dictionary.  Any record can
+    later be decoded using the read function:
+
+    >>> from Bio import SwissProt
+    >>> from StringIO import StringIO
+    >>> handle = open("SwissProt/multi_ex.txt")
+    >>> raw_records = list(SwissProt.parse_raw(handle))
+    >>> handle.close()
+    >>> len(raw_records)
+    8
+    >>> print raw_records[0].splitlines()[0]
+    ID   TPA_HUMAN               Reviewed;         562 AA.
+    >>> record = SwissProt.read(StringIO(raw_records[1]))
+    >>> print record.entry_name
+    CBBQ_CHRVI
+
+    This is useful for splitting a large file into chunks to be parsed
+    elsewhere, e.g. by other processes, or for filtering records on a
+    simple text test before paying for a full parse.
+    """
+    lines = []
+    for line in handle:
+        #As in _read, cope with binary or text handles on Python 3:
+        line = _as_string(line)
+        if lines:
+            lines.append(line)
+            if line[:2] == "//":
+                yield "".join(lines)
+                lines = []
+        elif line[:2] == "ID":
+            lines = [line]
+        elif line.strip() and line[:2] != "**":
+            raise ValueError("Expected an ID line, got %r" % line)
+    if lines:
+        raise ValueError("Unexpected end of stream.")
+
+
 # Everything below is considered private
 
+_reference_line_types = frozenset(["RN", "RP", "RC", "RX", "RL",
+                                   "RA", "RG", "RT"])
 
-def _read(handle):
+
+def _line_types(line_types):
+    """Expand the requested line codes to the set to decode (PRIVATE).
+
+    Returns None (meaning decode everything) if line_types is None.
+    """
+    if line_types is None:
+        return None
+    wanted = set(line_types)
+    #These are needed to start and finish each record:
+    wanted.update(["ID", "//"])
+    if wanted.intersection(_reference_line_types):
+        #The other reference lines all hang off the RN line
+        wanted.update(_reference_line_types)
+    if "SQ" in wanted:
+        wanted.add("  ")
+    return wanted
+
+
+def _read(handle, line_types=None):
     record = None
     unread = ""
     for line in handle:
         #This is for Python 3 to cope with a binary handle (byte strings),
         #or a text handle (unicode strings):
         line = _as_string(line)
-        key, value = line[:2], line[5:].rstrip()
+        key = line[:2]
+        if line_types is not None and key not in line_types:
+            #Not wanted, don't even strip the line
+            continue
+        value = line[5:].rstrip()
         if unread:
             value = unread + " " + value
             unread = ""
@@ -15,6 +15,13 @@
 #define _PRECISION 1000
 #define rint(x) (int)((x)*_PRECISION+0.5)
 
+/* Score for impossible cells, and the kinds of alignment columns,
+ * as in pairwise2. */
+#define MIN_SCORE -1e300
+#define MATCH 0
+#define GAP_A 1
+#define GAP_B 2
+
 /* Return a PyNumber as a double.
  * Raises a TypeError if I can't do it.
  */
@@ -159,7 +166,8 @@ double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
 			char *sequenceA, char *sequenceB,
 			int use_sequence_cstring,
 			double match, double mismatch,
-			int use_match_mismatch_scores)
+			int use_match_mismatch_scores,
+			double *match_table)
 {
     PyObject *py_A=NULL,
 	*py_B=NULL;
@@ -170,6 +178,14 @@ double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
 	score = (sequenceA[i] == sequenceB[j]) ? match : mismatch;
 	return score;
     }
+    if(use_sequence_cstring && match_table) {
+	score = match_table[((unsigned char)sequenceA[i] << 8) |
+			    (unsigned char)sequenceB[j]];
+	/* Missing pairs are NaN, and the match function will raise
+	   the KeyError for them. */
+	if(score == score)
+	    return score;
+    }
     /* Calculate the match score. */
     if(!(py_A = PySequence_GetItem(py_sequenceA, i)))
 	goto _get_match_score_cleanup;
@@ -197,6 +213,52 @@ double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
     return score;
 }
 
+/* If py_match_fn is a matrix_match, copy its table of scores into a
+ * newly allocated 256 x 256 array, with NaN for missing pairs.
+ * Returns NULL otherwise.
+ */
+static double *_get_match_table(PyObject *py_match_fn)
+{
+    PyObject *py_table=NULL, *py_row, *py_score;
+    double *match_table=NULL;
+    int i, j;
+
+    if(!(py_table = PyObject_GetAttrString(py_match_fn, "table"))) {
+	PyErr_Clear();
+	return NULL;
+    }
+    if(!PyList_Check(py_table) || PyList_GET_SIZE(py_table) != 256)
+	goto _get_match_table_cleanup;
+    if(!(match_table = malloc(256*256*sizeof(*match_table)))) {
+	PyErr_SetString(PyExc_MemoryError, "Out of memory");
+	goto _get_match_table_cleanup;
+    }
+    for(i=0; i<256; i++) {
+	py_row = PyList_GET_ITEM(py_table, i);
+	if(!PyList_Check(py_row) || PyList_GET_SIZE(py_row) != 256) {
+	    free(match_table);
+	    match_table = NULL;
+	    goto _get_match_table_cleanup;
+	}
+	for(j=0; j<256; j++) {
+	    py_score = PyList_GET_ITEM(py_row, j);
+	    if(py_score == Py_None) {
+		match_table[(i << 8) | j] = Py_NAN;
+		continue;
+	    }
+	    match_table[(i << 8) | j] = PyNumber_AsDouble(py_score);
+	    if(PyErr_Occurred()) {
+		free(match_table);
+		match_table = NULL;
+		goto _get_match_table_cleanup;
+	    }
+	}
+    }
+ _get_match_table_cleanup:
+    Py_DECREF(py_table);
+    return match_table;
+}
+
 #if PY_MAJOR_VERSION >= 3
 static PyObject* _create_bytes_object(PyObject* o) {
     PyObject* b;
@@ -240,6 +302,7 @@ static PyObject *cpairwise2__make_score_matrix_fast(
     double match, mismatch;
     int use_match_mismatch_scores;
     int lenA, lenB;
+    double *match_table = (double *)NULL;
     double *score_matrix = (double *)NULL;
     struct IndexList *trace_matrix = (struct IndexList *)NULL;
     PyObject *py_score_matrix=NULL, *py_trace_matrix=NULL;
@@ -316,6 +379,12 @@ cleanup_after_py_match_fn:
     if(py_mismatch) {
         Py_DECREF(py_mismatch);
     }
+    /* Otherwise, check for a matrix_match with a table of scores. */
+    if(use_sequence_cstring && !use_match_mismatch_scores) {
+	match_table = _get_match_table(py_match_fn);
+	if(PyErr_Occurred())
+	    goto _cleanup_make_score_matrix_fast;
+    }
 
     /* Cache some commonly used gap penalties */
     first_A_gap = calc_affine_penalty(1, open_A, extend_A,
@@ -344,7 +413,8 @@ cleanup_after_py_match_fn:
 					sequenceA, sequenceB,
 					use_sequence_cstring,
 					match, mismatch,
-					use_match_mismatch_scores);
+					use_match_mismatch_scores,
+					match_table);
 	if(PyErr_Occurred())
 	    goto _cleanup_make_score_matrix_fast;
 	if(penalize_end_gaps)
@@ -358,7 +428,8 @@ cleanup_after_py_match_fn:
 					sequenceA, sequenceB,
 					use_sequence_cstring,
 					match, mismatch,
-					use_match_mismatch_scores);
+					use_match_mismatch_scores,
+					match_table);
 	if(PyErr_Occurred())
 	    goto _cleanup_make_score_matrix_fast;
 	if(penalize_end_gaps)
@@ -424,7 +495,8 @@ cleanup_after_py_match_fn:
 						  sequenceA, sequenceB,
 						  use_sequence_cstring,
 						  match, mismatch,
-						  use_match_mismatch_scores);
+						  use_match_mismatch_scores,
+						  match_table);
 	    if(PyErr_Occurred())
 		goto _cleanup_make_score_matrix_fast;
 	    if(!align_globally && score < 0)
@@ -535,6 +607,8 @@ cleanup_after_py_match_fn:
 
 
  _cleanup_make_score_matrix_fast:
+    if(match_table)
+	free(match_table);
     if(score_matrix)
 	free(score_matrix);
     if(trace_matrix) {
@@ -571,6 +645,496 @@ cleanup_after_py_match_fn:
     return py_retval;
 }
 
+/* Compare two scores after rounding them as rint does, without
+ * overflowing an int for the very small scores used to mark
+ * impossible cells.
+ */
+static double _rounded_score(double x)
+{
+    double y = x*_PRECISION + 0.5;
+    return (y >= 0) ? floor(y) : ceil(y);
+}
+
+/* Check whether py_match_fn is an identity_match, and if so get its
+ * match and mismatch scores.  Returns 1 if it is, 0 otherwise.
+ */
+static int _get_identity_match_scores(PyObject *py_match_fn,
+				      double *match, double *mismatch)
+{
+    PyObject *py_match=NULL, *py_mismatch=NULL;
+    int use_match_mismatch_scores = 0;
+
+    *match = *mismatch = 0;
+    if(!(py_match = PyObject_GetAttrString(py_match_fn, "match")))
+	goto _get_identity_match_scores_cleanup;
+    *match = PyNumber_AsDouble(py_match);
+    if(PyErr_Occurred())
+	goto _get_identity_match_scores_cleanup;
+    if(!(py_mismatch = PyObject_GetAttrString(py_match_fn, "mismatch")))
+	goto _get_identity_match_scores_cleanup;
+    *mismatch = PyNumber_AsDouble(py_mismatch);
+    if(PyErr_Occurred())
+	goto _get_identity_match_scores_cleanup;
+    use_match_mismatch_scores = 1;
+ _get_identity_match_scores_cleanup:
+    if(PyErr_Occurred())
+	PyErr_Clear();
+    Py_XDECREF(py_match);
+    Py_XDECREF(py_mismatch);
+    return use_match_mismatch_scores;
+}
+
+/* Get C strings for the sequences if they are (byte) strings.  On
+ * Python 3 this may create new bytes objects, which should be freed
+ * with _release_cstrings afterwards.  Returns 1 if the C strings can
+ * be used, 0 otherwise.
+ */
+static int _get_cstrings(PyObject *py_sequenceA, PyObject *py_sequenceB,
+			 PyObject **py_bytesA, PyObject **py_bytesB,
+			 char **sequenceA, char **sequenceB)
+{
+    *py_bytesA = *py_bytesB = NULL;
+    *sequenceA = *sequenceB = NULL;
+#if PY_MAJOR_VERSION < 3
+    if(PyString_Check(py_sequenceA) && PyString_Check(py_sequenceB)) {
+	*sequenceA = PyString_AS_STRING(py_sequenceA);
+	*sequenceB = PyString_AS_STRING(py_sequenceB);
+	return 1;
+    }
+    return 0;
+#else
+    *py_bytesA = _create_bytes_object(py_sequenceA);
+    *py_bytesB = _create_bytes_object(py_sequenceB);
+    if (*py_bytesA && *py_bytesB) {
+	*sequenceA = PyBytes_AS_STRING(*py_bytesA);
+	*sequenceB = PyBytes_AS_STRING(*py_bytesB);
+	return 1;
+    }
+    if (*py_bytesA && *py_bytesA != py_sequenceA) Py_DECREF(*py_bytesA);
+    if (*py_bytesB && *py_bytesB != py_sequenceB) Py_DECREF(*py_bytesB);
+    *py_bytesA = *py_bytesB = NULL;
+    return 0;
+#endif
+}
+
+static void _release_cstrings(PyObject *py_sequenceA, PyObject *py_sequenceB,
+			      PyObject *py_bytesA, PyObject *py_bytesB)
+{
+    if (py_bytesA != NULL && py_bytesA != py_sequenceA) {
+	Py_DECREF(py_bytesA);
+    }
+    if (py_bytesB != NULL && py_bytesB != py_sequenceB) {
+	Py_DECREF(py_bytesB);
+    }
+}
+
+/* Score-only version of _make_score_matrix_fast, keeping just two
+ * rows of the score matrix.  Please see _score_only_fast in
+ * pairwise2 for the algorithm documentation.
+ */
+static PyObject *cpairwise2__score_only_fast(
+    PyObject *self, PyObject *args)
+{
+    int row, col;
+
+    PyObject *py_sequenceA, *py_sequenceB, *py_match_fn;
+    PyObject *py_bytesA=NULL, *py_bytesB=NULL;
+    char *sequenceA=NULL, *sequenceB=NULL;
+    int use_sequence_cstring;
+    double open_A, extend_A, open_B, extend_B;
+    int penalize_extend_when_opening, penalize_end_gaps;
+    int align_globally, anchored;
+
+    double first_A_gap, first_B_gap;
+    double match, mismatch;
+    int use_match_mismatch_scores;
+    double *match_table=NULL;
+    int lenA, lenB;
+    double *prev_row=NULL, *current_row=NULL, *col_cache_score=NULL;
+    double row_cache_score, score, best_score;
+    int best_row, best_col;
+
+    PyObject *py_retval = NULL;
+
+    if(!PyArg_ParseTuple(args, "OOOddddiiii", &py_sequenceA, &py_sequenceB,
+			 &py_match_fn, &open_A, &extend_A, &open_B, &extend_B,
+			 &penalize_extend_when_opening, &penalize_end_gaps,
+			 &align_globally, &anchored))
+	return NULL;
+    if(!PySequence_Check(py_sequenceA) || !PySequence_Check(py_sequenceB)) {
+	PyErr_SetString(PyExc_TypeError,
+			"py_sequenceA and py_sequenceB should be sequences.");
+	return NULL;
+    }
+    if(!PyCallable_Check(py_match_fn)) {
+	PyErr_SetString(PyExc_TypeError, "py_match_fn must be callable.");
+	return NULL;
+    }
+    lenA = PySequence_Length(py_sequenceA);
+    lenB = PySequence_Length(py_sequenceB);
+    if(lenA < 1 || lenB < 1) {
+	PyErr_SetString(PyExc_ValueError, "sequences should not be empty.");
+	return NULL;
+    }
+    use_sequence_cstring = _get_cstrings(py_sequenceA, py_sequenceB,
+					 &py_bytesA, &py_bytesB,
+					 &sequenceA, &sequenceB);
+    use_match_mismatch_scores = _get_identity_match_scores(
+	py_match_fn, &match, &mismatch);
+    if(use_sequence_cstring && !use_match_mismatch_scores) {
+	match_table = _get_match_table(py_match_fn);
+	if(PyErr_Occurred())
+	    goto _cleanup_score_only_fast;
+    }
+
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+				      penalize_extend_when_opening);
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+				      penalize_extend_when_opening);
+
+    prev_row = malloc(lenB*sizeof(*prev_row));
+    current_row = malloc(lenB*sizeof(*current_row));
+    col_cache_score = malloc(lenB*sizeof(*col_cache_score));
+    if(!prev_row || !current_row || !col_cache_score) {
+	PyErr_SetString(PyExc_MemoryError, "Out of memory");
+	goto _cleanup_score_only_fast;
+    }
+
+    /* The first row of the score matrix. */
+    for(col=0; col<lenB; col++) {
+	if(anchored && col) {
+	    score = MIN_SCORE;
+	} else {
+	    score = _get_match_score(py_sequenceA, py_sequenceB,
+				     py_match_fn, 0, col,
+				     sequenceA, sequenceB,
+				     use_sequence_cstring,
+				     match, mismatch,
+				     use_match_mismatch_scores,
+				     match_table);
+	    if(PyErr_Occurred())
+		goto _cleanup_score_only_fast;
+	    if(penalize_end_gaps)
+		score += calc_affine_penalty(col, open_A, extend_A,
+					     penalize_extend_when_opening);
+	}
+	prev_row[col] = score;
+	col_cache_score[col] = score + first_B_gap;
+    }
+
+    if(align_globally) {
+	best_score = prev_row[lenB-1];
+	if(penalize_end_gaps)
+	    best_score += calc_affine_penalty(lenA-1, open_B, extend_B,
+					      penalize_extend_when_opening);
+	best_row = 0;
+	best_col = lenB-1;
+    } else {
+	best_score = prev_row[0];
+	best_row = best_col = 0;
+	for(col=1; col<lenB; col++) {
+	    if(prev_row[col] > best_score) {
+		best_score = prev_row[col];
+		best_col = col;
+	    }
+	}
+    }
+
+    for(row=1; row<lenA; row++) {
+	double *swap;
+
+	if(anchored) {
+	    score = MIN_SCORE;
+	} else {
+	    score = _get_match_score(py_sequenceA, py_sequenceB,
+				     py_match_fn, row, 0,
+				     sequenceA, sequenceB,
+				     use_sequence_cstring,
+				     match, mismatch,
+				     use_match_mismatch_scores,
+				     match_table);
+	    if(PyErr_Occurred())
+		goto _cleanup_score_only_fast;
+	    if(penalize_end_gaps)
+		score += calc_affine_penalty(row, open_B, extend_B,
+					     penalize_extend_when_opening);
+	}
+	current_row[0] = score;
+	row_cache_score = prev_row[0] + first_A_gap;
+	for(col=1; col<lenB; col++) {
+	    double nogap_score, row_score, col_score, best;
+	    double open_score, extend_score;
+
+	    nogap_score = prev_row[col-1];
+	    row_score = (col > 1) ? row_cache_score : nogap_score-1;
+	    col_score = (row > 1) ? col_cache_score[col-1] : nogap_score-1;
+	    best = (row_score > col_score) ? row_score : col_score;
+	    if(nogap_score > best)
+		best = nogap_score;
+	    score = best + _get_match_score(py_sequenceA, py_sequenceB,
+					    py_match_fn, row, col,
+					    sequenceA, sequenceB,
+					    use_sequence_cstring,
+					    match, mismatch,
+					    use_match_mismatch_scores,
+					    match_table);
+	    if(PyErr_Occurred())
+		goto _cleanup_score_only_fast;
+	    if(!align_globally && score < 0)
+		score = 0;
+	    current_row[col] = score;
+
+	    /* Update the cached scores. */
+	    open_score = nogap_score + first_B_gap;
+	    extend_score = col_cache_score[col-1] + extend_B;
+	    if(_rounded_score(extend_score) > _rounded_score(open_score))
+		col_cache_score[col-1] = extend_score;
+	    else
+		col_cache_score[col-1] = open_score;
+	    open_score = nogap_score + first_A_gap;
+	    extend_score = row_cache_score + extend_A;
+	    if(_rounded_score(extend_score) > _rounded_score(open_score))
+		row_cache_score = extend_score;
+	    else
+		row_cache_score = open_score;
+	}
+
+	if(align_globally) {
+	    score = current_row[lenB-1];
+	    if(penalize_end_gaps)
+		score += calc_affine_penalty(lenA-row-1, open_B, extend_B,
+					     penalize_extend_when_opening);
+	    if(score > best_score) {
+		best_score = score;
+		best_row = row;
+		best_col = lenB-1;
+	    }
+	} else {
+	    for(col=0; col<lenB; col++) {
+		if(current_row[col] > best_score) {
+		    best_score = current_row[col];
+		    best_row = row;
+		    best_col = col;
+		}
+	    }
+	}
+	swap = prev_row;
+	prev_row = current_row;
+	current_row = swap;
+    }
+
+    if(align_globally) {
+	for(col=0; col<lenB-1; col++) {
+	    score = prev_row[col];
+	    if(penalize_end_gaps)
+		score += calc_affine_penalty(lenB-col-1, open_A, extend_A,
+					     penalize_extend_when_opening);
+	    if(score > best_score) {
+		best_score = score;
+		best_row = lenA-1;
+		best_col = col;
+	    }
+	}
+    }
+
+    py_retval = Py_BuildValue("(d(ii))", best_score, best_row, best_col);
+
+ _cleanup_score_only_fast:
+    if(match_table)
+	free(match_table);
+    if(prev_row)
+	free(prev_row);
+    if(current_row)
+	free(current_row);
+    if(col_cache_score)
+	free(col_cache_score);
+    _release_cstrings(py_sequenceA, py_sequenceB, py_bytesA, py_bytesB);
+    return py_retval;
+}
+
+/* Return a list of the first n doubles in an array. */
+static PyObject *_double_array_as_list(double *values, int n)
+{
+    int i;
+    PyObject *py_list, *py_value;
+
+    if(!(py_list = PyList_New(n)))
+	return NULL;
+    for(i=0; i<n; i++) {
+	if(!(py_value = PyFloat_FromDouble(values[i]))) {
+	    Py_DECREF(py_list);
+	    return NULL;
+	}
+	PyList_SET_ITEM(py_list, i, py_value);
+    }
+    return py_list;
+}
+
+/* The three state, two row scoring used by the linear space
+ * traceback.  Please see _last_row_fast in pairwise2 for the
+ * algorithm documentation.
+ */
+static PyObject *cpairwise2__last_row_fast(
+    PyObject *self, PyObject *args)
+{
+    int i, row, col;
+
+    PyObject *py_sequenceA, *py_sequenceB, *py_match_fn, *py_first;
+    PyObject *py_bytesA=NULL, *py_bytesB=NULL;
+    char *sequenceA=NULL, *sequenceB=NULL;
+    int use_sequence_cstring;
+    double first_A_gap, extend_A, first_B_gap, extend_B;
+    int before, first;
+
+    double match, mismatch;
+    int use_match_mismatch_scores;
+    double *match_table=NULL;
+    int lenA, lenB;
+    double *match_row=NULL, *gap_A_row=NULL, *gap_B_row=NULL;
+    double *new_match_row=NULL, *new_gap_A_row=NULL, *new_gap_B_row=NULL;
+    double score, first_gap_B_score;
+    PyObject *py_match_row=NULL, *py_gap_A_row=NULL, *py_gap_B_row=NULL;
+
+    PyObject *py_retval = NULL;
+
+    if(!PyArg_ParseTuple(args, "OOOddddiO", &py_sequenceA, &py_sequenceB,
+			 &py_match_fn, &first_A_gap, &extend_A,
+			 &first_B_gap, &extend_B, &before, &py_first))
+	return NULL;
+    if(!PySequence_Check(py_sequenceA) || !PySequence_Check(py_sequenceB)) {
+	PyErr_SetString(PyExc_TypeError,
+			"py_sequenceA and py_sequenceB should be sequences.");
+	return NULL;
+    }
+    if(!PyCallable_Check(py_match_fn)) {
+	PyErr_SetString(PyExc_TypeError, "py_match_fn must be callable.");
+	return NULL;
+    }
+    if(py_first == Py_None) {
+	first = -1;
+    } else {
+#if PY_MAJOR_VERSION >= 3
+	first = (int)PyLong_AsLong(py_first);
+#else
+	first = (int)PyInt_AsLong(py_first);
+#endif
+	if(PyErr_Occurred())
+	    return NULL;
+    }
+    lenA = PySequence_Length(py_sequenceA);
+    lenB = PySequence_Length(py_sequenceB);
+    use_sequence_cstring = _get_cstrings(py_sequenceA, py_sequenceB,
+					 &py_bytesA, &py_bytesB,
+					 &sequenceA, &sequenceB);
+    use_match_mismatch_scores = _get_identity_match_scores(
+	py_match_fn, &match, &mismatch);
+    if(use_sequence_cstring && !use_match_mismatch_scores) {
+	match_table = _get_match_table(py_match_fn);
+	if(PyErr_Occurred())
+	    goto _cleanup_last_row_fast;
+    }
+
+    match_row = malloc((lenB+1)*sizeof(double));
+    gap_A_row = malloc((lenB+1)*sizeof(double));
+    gap_B_row = malloc((lenB+1)*sizeof(double));
+    new_match_row = malloc((lenB+1)*sizeof(double));
+    new_gap_A_row = malloc((lenB+1)*sizeof(double));
+    new_gap_B_row = malloc((lenB+1)*sizeof(double));
+    if(!match_row || !gap_A_row || !gap_B_row ||
+       !new_match_row || !new_gap_A_row || !new_gap_B_row) {
+	PyErr_SetString(PyExc_MemoryError, "Out of memory");
+	goto _cleanup_last_row_fast;
+    }
+    for(i=0; i<=lenB; i++)
+	match_row[i] = gap_A_row[i] = gap_B_row[i] = MIN_SCORE;
+
+    /* The first row holds the empty alignment. */
+    if(first < 0 || first == MATCH)
+	match_row[0] = 0;
+    if((first < 0 || first == GAP_A) && before != GAP_B) {
+	score = (before == GAP_A) ? extend_A : first_A_gap;
+	for(col=1; col<=lenB; col++) {
+	    gap_A_row[col] = score;
+	    score += extend_A;
+	}
+    }
+    if((first < 0 || first == GAP_B) && before != GAP_A)
+	first_gap_B_score = (before == GAP_B) ? extend_B : first_B_gap;
+    else
+	first_gap_B_score = MIN_SCORE;
+
+    for(row=0; row<lenA; row++) {
+	double *swap;
+
+	new_match_row[0] = new_gap_A_row[0] = MIN_SCORE;
+	if(row)
+	    new_gap_B_row[0] = gap_B_row[0] + extend_B;
+	else
+	    new_gap_B_row[0] = first_gap_B_score;
+	for(col=1; col<=lenB; col++) {
+	    double open_score, extend_score;
+
+	    score = match_row[col-1];
+	    if(gap_A_row[col-1] > score)
+		score = gap_A_row[col-1];
+	    if(gap_B_row[col-1] > score)
+		score = gap_B_row[col-1];
+	    score += _get_match_score(py_sequenceA, py_sequenceB,
+				      py_match_fn, row, col-1,
+				      sequenceA, sequenceB,
+				      use_sequence_cstring,
+				      match, mismatch,
+				      use_match_mismatch_scores,
+				      match_table);
+	    if(PyErr_Occurred())
+		goto _cleanup_last_row_fast;
+	    new_match_row[col] = score;
+
+	    open_score = new_match_row[col-1] + first_A_gap;
+	    extend_score = new_gap_A_row[col-1] + extend_A;
+	    new_gap_A_row[col] = (open_score > extend_score) ?
+		open_score : extend_score;
+	    open_score = match_row[col] + first_B_gap;
+	    extend_score = gap_B_row[col] + extend_B;
+	    new_gap_B_row[col] = (open_score > extend_score) ?
+		open_score : extend_score;
+	}
+	swap = match_row; match_row = new_match_row; new_match_row = swap;
+	swap = gap_A_row; gap_A_row = new_gap_A_row; new_gap_A_row = swap;
+	swap = gap_B_row; gap_B_row = new_gap_B_row; new_gap_B_row = swap;
+    }
+
+    if(!(py_match_row = _double_array_as_list(match_row, lenB+1)))
+	goto _cleanup_last_row_fast;
+    if(!(py_gap_A_row = _double_array_as_list(gap_A_row, lenB+1)))
+	goto _cleanup_last_row_fast;
+    if(!(py_gap_B_row = _double_array_as_list(gap_B_row, lenB+1)))
+	goto _cleanup_last_row_fast;
+    py_retval = Py_BuildValue("(OOO)", py_match_row, py_gap_A_row,
+			      py_gap_B_row);
+
+ _cleanup_last_row_fast:
+    if(match_table)
+	free(match_table);
+    if(match_row)
+	free(match_row);
+    if(gap_A_row)
+	free(gap_A_row);
+    if(gap_B_row)
+	free(gap_B_row);
+    if(new_match_row)
+	free(new_match_row);
+    if(new_gap_A_row)
+	free(new_gap_A_row);
+    if(new_gap_B_row)
+	free(new_gap_B_row);
+    Py_XDECREF(py_match_row);
+    Py_XDECREF(py_gap_A_row);
+    Py_XDECREF(py_gap_B_row);
+    _release_cstrings(py_sequenceA, py_sequenceB, py_bytesA, py_bytesB);
+    return py_retval;
+}
+
 static PyObject *cpairwise2_rint(
     PyObject *self, PyObject *args, PyObject *keywds)
 {
@@ -596,6 +1160,10 @@ static PyObject *cpairwise2_rint(
 static PyMethodDef cpairwise2Methods[] = {
     {"_make_score_matrix_fast",
      (PyCFunction)cpairwise2__make_score_matrix_fast, METH_VARARGS, ""},
+    {"_score_only_fast",
+     (PyCFunction)cpairwise2__score_only_fast, METH_VARARGS, ""},
+    {"_last_row_fast",
+     (PyCFunction)cpairwise2__last_row_fast, METH_VARARGS, ""},
     {"rint", (PyCFunction)cpairwise2_rint, METH_VARARGS|METH_KEYWORDS, ""},
     {NULL, NULL, 0, NULL}
 };
@@ -127,6 +127,26 @@ Biopython ( Bio.SubsMat -> MatrixInfo ).
 To see a description of the parameters for a function, please look at
 the docstring for the function via the help function, e.g.
 type help(pairwise2.align.localds) at the Python prompt.
+
+To align one sequence against many others, or many sequences against
+each other, use the align_many and align_all functions.  These take the
+name of an alignment function and its parameters (after the sequences),
+and return an iterator over the results.  Add processes=N to spread the
+work over a pool of N processes:
+
+    >>> for score in pairwise2.align_many("ACCGT", ["ACG", "CCG", "T"],
+    ...                                   "globalxx", score_only=True):
+    ...     print score
+    3.0
+    3.0
+    1.0
+    >>> for i, j, score in pairwise2.align_all(["ACCGT", "ACG", "CCG"],
+    ...                                        "localms", 2, -1, -1, -1,
+    ...                                        score_only=True):
+    ...     print i, j, score
+    0 1 5.0
+    0 2 6.0
+    1 2 3.0
 """
 # The alignment functions take some undocumented keyword parameters:
 # - penalize_extend_when_opening: boolean
@@ -148,6 +168,26 @@ type help(pairwise2.align.localds) at the Python prompt.
 #   value of the function is the score.
 # - one_alignment_only: boolean
 #   Only recover one alignment.
+# - linear_space: boolean
+#   Recover one best alignment using a divide and conquer (Hirschberg)
+#   traceback, which only needs memory linear in the sequence lengths
+#   rather than the full score and traceback matrices.  Only for
+#   global alignments with affine gap penalties.  With score_only,
+#   memory use is always linear when the gap penalties are affine.
+# - band: integer
+#   Only fill in the cells of the score matrix within this many
+#   diagonals of the main diagonal (widened by the difference in the
+#   sequence lengths, so a global alignment is always possible).
+#   Time and memory are then proportional to the sequence length times
+#   the band width.  Good for long, highly similar sequences; the
+#   alignment is only optimal if it lies within the band.
+# - xdrop: number
+#   Stop extending the alignment through cells that score more than
+#   xdrop below the best score seen so far (as in BLAST).  A heuristic:
+#   a global alignment which needs to pass through such a poor region
+#   will not be found, and then no alignments are returned.
+#   band and xdrop need affine gap penalties, and may be combined with
+#   each other but not with linear_space.
 
 MAX_ALIGNMENTS = 1000   # maximum alignments recovered in traceback
 
@@ -258,7 +298,7 @@ alignment occurs.
                     keywds['match_fn'] = identity_match(match, mismatch)
                     i += 2
                 elif self.param_names[i] == 'match_dict':
-                    keywds['match_fn'] = dictionary_match(args[i])
+                    keywds['match_fn'] = matrix_match(args[i])
                     i += 1
                 elif self.param_names[i] == 'open':
                     assert self.param_names[i+1] == 'extend'
@@ -291,7 +331,10 @@ alignment occurs.
                 ('gap_char', '-'),
                 ('force_generic', 0),
                 ('score_only', 0),
-                ('one_alignment_only', 0)
+                ('one_alignment_only', 0),
+                ('linear_space', 0),
+                ('band', None),
+                ('xdrop', None)
                 ]
             for name, default in default_params:
                 keywds[name] = keywds.get(name, default)
@@ -306,17 +349,160 @@ alignment occurs.
 align = align()
 
 
+def align_many(sequenceA, sequences, function, *args, **keywds):
+    """align_many(sequenceA, sequences, function, ...) -> iterator
+
+    Align sequenceA against each of the sequences in turn, returning
+    an iterator over the results in the same order.  function is the
+    name of one of the alignment functions (e.g. "globalms") or the
+    function itself (e.g. pairwise2.align.globalms), and any further
+    arguments are its parameters after the two sequences, plus any
+    keyword arguments such as score_only.  Each result is what that
+    function would return, i.e. a list of alignments or a score.
+
+    The parameters are decoded only once for the whole batch.  The
+    optional keyword argument processes gives the number of processes
+    to use (default 1, no pool); chunksize sets how many sequences are
+    sent to a process at a time.  With more than one process, the
+    sequences, match and gap functions must be picklable (so no lambda
+    callbacks).  The sequences are read lazily, so this works with
+    large files of targets.
+    """
+    processes = keywds.pop("processes", 1)
+    chunksize = keywds.pop("chunksize", 20)
+    keywds = _decode_batch(function, args, keywds)
+    keywds["sequenceA"] = sequenceA
+    if processes <= 1:
+        for sequenceB in sequences:
+            yield _align_pair(keywds, sequenceA, sequenceB)
+        return
+    pool = _make_pool(processes, keywds, None)
+    try:
+        for result in pool.imap(_pool_align_many, sequences, chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def align_all(sequences, function, *args, **keywds):
+    """align_all(sequences, function, ...) -> iterator
+
+    Align all pairs of the sequences against each other, returning an
+    iterator of tuples (i, j, result) for every i < j, where result is
+    what the alignment function returns for sequences[i] against
+    sequences[j].  The other arguments are as for align_many.
+
+    For clustering large numbers of sequences you will probably want
+    to use score_only=True, so that no alignments are recovered.
+    """
+    processes = keywds.pop("processes", 1)
+    chunksize = keywds.pop("chunksize", 20)
+    keywds = _decode_batch(function, args, keywds)
+    sequences = list(sequences)
+    pairs = ((i, j) for i in range(len(sequences))
+             for j in range(i+1, len(sequences)))
+    if processes <= 1:
+        for i, j in pairs:
+            yield i, j, _align_pair(keywds, sequences[i], sequences[j])
+        return
+    pool = _make_pool(processes, keywds, sequences)
+    try:
+        for result in pool.imap(_pool_align_all, pairs, chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _decode_batch(function, args, keywds):
+    # Turn the parameters for an alignment function into the keyword
+    # arguments for _align, leaving the sequences to be filled in.
+    if not isinstance(function, align.alignment_function):
+        function = getattr(align, function)
+    return function.decode(None, None, *args, **keywds)
+
+
+def _align_pair(keywds, sequenceA, sequenceB):
+    keywds = keywds.copy()
+    keywds["sequenceA"] = sequenceA
+    keywds["sequenceB"] = sequenceB
+    return _align(**keywds)
+
+
+# The decoded parameters and sequences in each process of a pool,
+# set up once by _init_pool rather than sent with every task.
+_pool_state = {}
+
+
+def _make_pool(processes, keywds, sequences):
+    try:
+        import multiprocessing
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Using more than one process needs the multiprocessing module")
+    return multiprocessing.Pool(processes, _init_pool, (keywds, sequences))
+
+
+def _init_pool(keywds, sequences):
+    _pool_state["keywds"] = keywds
+    _pool_state["sequences"] = sequences
+
+
+def _pool_align_many(sequenceB):
+    keywds = _pool_state["keywds"]
+    return _align_pair(keywds, keywds["sequenceA"], sequenceB)
+
+
+def _pool_align_all(pair):
+    i, j = pair
+    sequences = _pool_state["sequences"]
+    return i, j, _align_pair(_pool_state["keywds"],
+                             sequences[i], sequences[j])
+
+
 def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
            penalize_extend_when_opening, penalize_end_gaps,
            align_globally, gap_char, force_generic, score_only,
-           one_alignment_only):
+           one_alignment_only, linear_space, band, xdrop):
     if not sequenceA or not sequenceB:
         return []
 
-    if (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
-    and isinstance(gap_B_fn, affine_penalty):
+    use_fast = (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
+               and isinstance(gap_B_fn, affine_penalty)
+    if linear_space and not (use_fast and align_globally):
+        raise ValueError("linear_space needs a global alignment with "
+                         "affine gap penalties")
+    banded = band is not None or xdrop is not None
+    if banded and (linear_space or not use_fast):
+        raise ValueError("band and xdrop need affine gap penalties, "
+                         "and can't be used with linear_space")
+    if banded:
+        if band is not None:
+            # The diagonals (col-row) to fill in.
+            diff = len(sequenceB) - len(sequenceA)
+            band = min(0, diff) - band, max(0, diff) + band
+        x = _make_score_matrix_banded(
+            sequenceA, sequenceB, match_fn, gap_A_fn.open, gap_A_fn.extend,
+            gap_B_fn.open, gap_B_fn.extend, penalize_extend_when_opening,
+            penalize_end_gaps, align_globally, score_only, band, xdrop)
+    elif use_fast:
         open_A, extend_A = gap_A_fn.open, gap_A_fn.extend
         open_B, extend_B = gap_B_fn.open, gap_B_fn.extend
+        if score_only:
+            # No need for the full matrices, just keep two rows.
+            return _score_only_fast(
+                sequenceA, sequenceB, match_fn, open_A, extend_A,
+                open_B, extend_B, penalize_extend_when_opening,
+                penalize_end_gaps, align_globally, 0)[0]
+        if linear_space:
+            return _align_linear_space(
+                sequenceA, sequenceB, match_fn, open_A, extend_A,
+                open_B, extend_B, penalize_extend_when_opening,
+                penalize_end_gaps, gap_char)
         x = _make_score_matrix_fast(
             sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
             penalize_extend_when_opening, penalize_end_gaps, align_globally,
@@ -333,9 +519,17 @@ def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
 
     # Look for the proper starting point.  Get a list of all possible
     # starting points.
-    starts = _find_start(
-        score_matrix, sequenceA, sequenceB,
-        gap_A_fn, gap_B_fn, penalize_end_gaps, align_globally)
+    if banded:
+        starts = _find_banded_start(
+            score_matrix, sequenceA, sequenceB,
+            gap_A_fn, gap_B_fn, penalize_end_gaps, align_globally)
+        if not starts:
+            # The x-drop search never reached the end of the sequences.
+            return []
+    else:
+        starts = _find_start(
+            score_matrix, sequenceA, sequenceB,
+            gap_A_fn, gap_B_fn, penalize_end_gaps, align_globally)
     # Find the highest score.
     best_score = max([x[0] for x in starts])
 
@@ -506,7 +700,10 @@ def _make_score_matrix_fast(
         col_cache_index[i] = [(0, i)]
 
     # Fill in the score_matrix.
+    codesB = _match_codes(match_fn, sequenceB)
     for row in range(1, lenA):
+        match_scores = _match_score_row(match_fn, sequenceA[row],
+                                        sequenceB, codesB)
         for col in range(1, lenB):
             # Calculate the score that would occur by extending the
             # alignment without gaps.
@@ -536,7 +733,7 @@ def _make_score_matrix_fast(
                 best_index.extend(col_cache_index[col-1])
 
             # Set the score and traceback matrices.
-            score = best_score + match_fn(sequenceA[row], sequenceB[col])
+            score = best_score + match_scores[col]
             if not align_globally and score < 0:
                 score_matrix[row][col] = 0
             else:
@@ -582,6 +779,505 @@ def _make_score_matrix_fast(
     return score_matrix, trace_matrix
 
 
+def _make_score_matrix_banded(
+        sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
+        penalize_extend_when_opening, penalize_end_gaps,
+        align_globally, score_only, band, xdrop):
+    # This is _make_score_matrix_fast, except that only some of the
+    # cells are filled in: those within band, a tuple of the lowest
+    # and highest diagonal (col-row) to use, and if xdrop is not None,
+    # those that score no more than xdrop below the best score so far.
+    # Each row of the score and traceback matrices is a dictionary of
+    # the cells in it, keyed by column, so the memory needed is only
+    # proportional to the number of cells filled in.
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+                                      penalize_extend_when_opening)
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+                                      penalize_extend_when_opening)
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    score_matrix, trace_matrix = [], []
+
+    # The cached best score for a gap in sequenceB, for each column.
+    # This is a list of the score, the indexes it comes from, and the
+    # row it was last updated in.  A column need not have a cell in
+    # every row, so the score is extended to the current row when used.
+    col_cache = {}
+
+    codesB = _match_codes(match_fn, sequenceB)
+    best_so_far = threshold = _MIN_SCORE
+    first, last = 0, lenB - 1   # The columns left in the previous row.
+    for row in range(lenA):
+        start, stop = 0, lenB
+        if xdrop is not None:
+            start = first
+        if band is not None:
+            start = max(start, row + band[0])
+            stop = min(stop, row + band[1] + 1)
+        # With an x-drop, the cells past the end of the previous row
+        # can only be reached by a gap, so they are scored one by one
+        # until they fall below the threshold.
+        match_stop = stop
+        if xdrop is not None:
+            match_stop = max(start, min(stop, last + 2))
+        match_scores = _match_score_row(match_fn, sequenceA[row], sequenceB,
+                                        codesB, start, match_stop)
+
+        if row > 1:
+            # Update the cached column scores with the cells two rows
+            # up, which can now be the start of a gap in sequenceB.
+            for col, score in score_matrix[row-2].items():
+                open_score = score + first_B_gap
+                entry = col_cache.get(col)
+                if entry is None:
+                    col_cache[col] = [open_score, [(row-2, col)], row-2]
+                    continue
+                extend_score = entry[0] + extend_B * (row-2-entry[2])
+                open_score_rint, extend_score_rint = \
+                                 rint(open_score), rint(extend_score)
+                if open_score_rint > extend_score_rint:
+                    col_cache[col] = [open_score, [(row-2, col)], row-2]
+                elif extend_score_rint > open_score_rint:
+                    col_cache[col] = [extend_score, entry[1], row-2]
+                else:
+                    index = entry[1]
+                    if (row-2, col) not in index:
+                        index = index + [(row-2, col)]
+                    col_cache[col] = [open_score, index, row-2]
+
+        scores, traces = {}, {}
+        if row:
+            prev_scores = score_matrix[row-1]
+        # The cached best score for a gap in sequenceA along this row.
+        row_cache_score, row_cache_index = _MIN_SCORE, []
+        for col in range(start, stop):
+            if col < match_stop:
+                match_score = match_scores[col-start]
+            else:
+                match_score = match_fn(sequenceA[row], sequenceB[col])
+            if not row or not col:
+                # The top and left borders, as in _make_score_matrix_fast.
+                score = match_score
+                if penalize_end_gaps:
+                    if row:
+                        score += calc_affine_penalty(
+                            row, open_B, extend_B, penalize_extend_when_opening)
+                    else:
+                        score += calc_affine_penalty(
+                            col, open_A, extend_A, penalize_extend_when_opening)
+                best_index = [None]
+            else:
+                # Add the cell two columns back in the previous row to
+                # the cached score for a gap in sequenceA.
+                if col > 1:
+                    prev_score = prev_scores.get(col-2)
+                    if prev_score is None:
+                        row_cache_score += extend_A
+                    else:
+                        open_score = prev_score + first_A_gap
+                        extend_score = row_cache_score + extend_A
+                        open_score_rint, extend_score_rint = \
+                                         rint(open_score), rint(extend_score)
+                        if open_score_rint > extend_score_rint:
+                            row_cache_score = open_score
+                            row_cache_index = [(row-1, col-2)]
+                        elif extend_score_rint > open_score_rint:
+                            row_cache_score = extend_score
+                        else:
+                            row_cache_score = open_score
+                            if (row-1, col-2) not in row_cache_index:
+                                row_cache_index = row_cache_index + \
+                                                  [(row-1, col-2)]
+
+                nogap_score = prev_scores.get(col-1, _MIN_SCORE)
+                row_score = row_cache_score
+                col_score = _MIN_SCORE
+                entry = col_cache.get(col-1)
+                if entry is not None:
+                    col_score = entry[0] + extend_B * (row-2-entry[2])
+
+                best_score = max(nogap_score, row_score, col_score)
+                if best_score < _MIN_SCORE / 2:
+                    # No way to get to this cell.
+                    if xdrop is not None and col > last + 1:
+                        break
+                    continue
+                best_score_rint = rint(best_score)
+                best_index = []
+                if best_score_rint == rint(nogap_score):
+                    best_index.append((row-1, col-1))
+                if best_score_rint == rint(row_score):
+                    best_index.extend(row_cache_index)
+                if best_score_rint == rint(col_score):
+                    best_index.extend(entry[1])
+
+                score = best_score + match_score
+                if not align_globally and score < 0:
+                    score = 0
+            if xdrop is not None and col > last + 1 and score < threshold:
+                break
+            scores[col] = score
+            if not score_only:
+                traces[col] = best_index
+
+        if xdrop is not None and scores:
+            # Drop the cells that are too far below the best score.
+            best_so_far = max(best_so_far, max(scores.values()))
+            threshold = best_so_far - xdrop
+            for col, score in list(scores.items()):
+                if score < threshold:
+                    del scores[col]
+                    traces.pop(col, None)
+        score_matrix.append(scores)
+        trace_matrix.append(traces)
+        if not scores:
+            # Nothing left to extend.
+            break
+        first, last = min(scores), max(scores)
+    while len(score_matrix) < lenA:
+        score_matrix.append({})
+        trace_matrix.append({})
+    return score_matrix, trace_matrix
+
+
+# The score given to impossible cells in the linear space and banded
+# algorithms.
+_MIN_SCORE = -1e300
+
+# The kinds of alignment columns used in the linear space traceback.
+_MATCH, _GAP_A, _GAP_B = 0, 1, 2
+
+
+def _score_only_fast(
+        sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
+        penalize_extend_when_opening, penalize_end_gaps, align_globally,
+        anchored):
+    # This is the same dynamic programming as _make_score_matrix_fast,
+    # but only the previous and current rows of the score matrix are
+    # kept and there is no traceback, so the memory used is linear in
+    # the length of sequenceB.
+    #
+    # Returns a tuple of the best score and the (row, col) where it
+    # occurs, i.e. the best starting point _find_start would give for
+    # the traceback.  If anchored is true, only alignments starting
+    # with the first characters of both sequences aligned are
+    # considered (this is used to find where an alignment starts by
+    # running backwards from its end).
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+                                      penalize_extend_when_opening)
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+                                      penalize_extend_when_opening)
+    lenA, lenB = len(sequenceA), len(sequenceB)
+
+    # The first row of the score matrix.
+    codesB = _match_codes(match_fn, sequenceB)
+    match_scores = _match_score_row(match_fn, sequenceA[0], sequenceB, codesB)
+    prev_row = []
+    for col in range(lenB):
+        if anchored and col:
+            score = _MIN_SCORE
+        else:
+            score = match_scores[col]
+            if penalize_end_gaps:
+                score += calc_affine_penalty(
+                    col, open_A, extend_A, penalize_extend_when_opening)
+        prev_row.append(score)
+    col_cache_score = [score + first_B_gap for score in prev_row[:-1]]
+
+    if align_globally:
+        # Only the last row and column can start a traceback.
+        best_score = prev_row[-1]
+        if penalize_end_gaps:
+            best_score += calc_affine_penalty(
+                lenA-1, open_B, extend_B, penalize_extend_when_opening)
+        best_pos = (0, lenB-1)
+    else:
+        best_score, best_pos = prev_row[0], (0, 0)
+        for col in range(1, lenB):
+            if prev_row[col] > best_score:
+                best_score, best_pos = prev_row[col], (0, col)
+
+    for row in range(1, lenA):
+        match_scores = _match_score_row(match_fn, sequenceA[row],
+                                        sequenceB, codesB)
+        if anchored:
+            score = _MIN_SCORE
+        else:
+            score = match_scores[0]
+            if penalize_end_gaps:
+                score += calc_affine_penalty(
+                    row, open_B, extend_B, penalize_extend_when_opening)
+        current_row = [score] * lenB
+        row_cache_score = prev_row[0] + first_A_gap
+        for col in range(1, lenB):
+            nogap_score = prev_row[col-1]
+            if col > 1:
+                row_score = row_cache_score
+            else:
+                row_score = nogap_score - 1
+            if row > 1:
+                col_score = col_cache_score[col-1]
+            else:
+                col_score = nogap_score - 1
+            score = max(nogap_score, row_score, col_score) + \
+                    match_scores[col]
+            if not align_globally and score < 0:
+                score = 0
+            current_row[col] = score
+
+            # Update the cached scores, as in _make_score_matrix_fast.
+            open_score = nogap_score + first_B_gap
+            extend_score = col_cache_score[col-1] + extend_B
+            if rint(extend_score) > rint(open_score):
+                col_cache_score[col-1] = extend_score
+            else:
+                col_cache_score[col-1] = open_score
+            open_score = nogap_score + first_A_gap
+            extend_score = row_cache_score + extend_A
+            if rint(extend_score) > rint(open_score):
+                row_cache_score = extend_score
+            else:
+                row_cache_score = open_score
+
+        if align_globally:
+            score = current_row[-1]
+            if penalize_end_gaps:
+                score += calc_affine_penalty(
+                    lenA-row-1, open_B, extend_B, penalize_extend_when_opening)
+            if score > best_score:
+                best_score, best_pos = score, (row, lenB-1)
+        else:
+            for col in range(lenB):
+                if current_row[col] > best_score:
+                    best_score, best_pos = current_row[col], (row, col)
+        prev_row = current_row
+
+    if align_globally:
+        for col in range(lenB-1):
+            score = prev_row[col]
+            if penalize_end_gaps:
+                score += calc_affine_penalty(
+                    lenB-col-1, open_A, extend_A, penalize_extend_when_opening)
+            if score > best_score:
+                best_score, best_pos = score, (lenA-1, col)
+    return best_score, best_pos
+
+
+def _last_row_fast(sequenceA, sequenceB, match_fn, first_A_gap, extend_A,
+                   first_B_gap, extend_B, before, first):
+    # Score all of sequenceA against every prefix of sequenceB, keeping
+    # only two rows at a time.  This is the affine gap (Gotoh) form of
+    # the recursion in _make_score_matrix_fast, with three scores per
+    # cell depending on whether the alignment ends with a match, a gap
+    # in sequenceA or a gap in sequenceB.  As in the full matrix, a gap
+    # in one sequence may not directly follow a gap in the other.
+    #
+    # before is the kind of the column just before this piece of the
+    # alignment (_MATCH if there is none), so that a gap can carry on
+    # from it.  If first is not None, the alignment must start with
+    # that kind of column.  sequenceA should not be empty.
+    #
+    # Returns three lists of length len(sequenceB)+1, the last rows of
+    # the match, gap in A and gap in B score matrices.
+    lenB = len(sequenceB)
+    # The first row holds the empty alignment.  Its match score is
+    # only used for going diagonally into the first match.
+    if first is None or first == _MATCH:
+        match_row = [0] + [_MIN_SCORE] * lenB
+    else:
+        match_row = [_MIN_SCORE] * (lenB + 1)
+    gap_A_row = [_MIN_SCORE] * (lenB + 1)
+    gap_B_row = [_MIN_SCORE] * (lenB + 1)
+    if (first is None or first == _GAP_A) and before != _GAP_B:
+        if before == _GAP_A:
+            score = extend_A
+        else:
+            score = first_A_gap
+        for col in range(1, lenB+1):
+            gap_A_row[col] = score
+            score += extend_A
+    if (first is None or first == _GAP_B) and before != _GAP_A:
+        if before == _GAP_B:
+            first_gap_B_score = extend_B
+        else:
+            first_gap_B_score = first_B_gap
+    else:
+        first_gap_B_score = _MIN_SCORE
+
+    codesB = _match_codes(match_fn, sequenceB)
+    for row in range(len(sequenceA)):
+        match_scores = _match_score_row(match_fn, sequenceA[row],
+                                        sequenceB, codesB)
+        new_match_row = [_MIN_SCORE] * (lenB + 1)
+        new_gap_A_row = [_MIN_SCORE] * (lenB + 1)
+        new_gap_B_row = [_MIN_SCORE] * (lenB + 1)
+        if row:
+            new_gap_B_row[0] = gap_B_row[0] + extend_B
+        else:
+            new_gap_B_row[0] = first_gap_B_score
+        for col in range(1, lenB+1):
+            score = max(match_row[col-1], gap_A_row[col-1],
+                        gap_B_row[col-1])
+            new_match_row[col] = score + match_scores[col-1]
+            new_gap_A_row[col] = max(new_match_row[col-1] + first_A_gap,
+                                     new_gap_A_row[col-1] + extend_A)
+            new_gap_B_row[col] = max(match_row[col] + first_B_gap,
+                                     gap_B_row[col] + extend_B)
+        match_row, gap_A_row, gap_B_row = \
+                   new_match_row, new_gap_A_row, new_gap_B_row
+    return match_row, gap_A_row, gap_B_row
+
+
+def _align_linear_space(sequenceA, sequenceB, match_fn, open_A, extend_A,
+                        open_B, extend_B, penalize_extend_when_opening,
+                        penalize_end_gaps, gap_char):
+    # Find one best global alignment in linear space.  First find
+    # where the best alignment ends, then where it starts by running
+    # backwards from there, and finally recover the path in between by
+    # divide and conquer.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    best_score, (end_row, end_col) = _score_only_fast(
+        sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
+        penalize_extend_when_opening, penalize_end_gaps, 1, 0)
+    x = _score_only_fast(
+        sequenceA[:end_row+1][::-1], sequenceB[:end_col+1][::-1], match_fn,
+        open_A, extend_A, open_B, extend_B, penalize_extend_when_opening,
+        penalize_end_gaps, 1, 1)
+    start_row, start_col = end_row - x[1][0], end_col - x[1][1]
+
+    # The alignment starts and ends with a match.  Any unaligned
+    # characters before or after those are end gaps.
+    columns = []
+    if start_row:
+        columns.append((_GAP_B, start_row))
+    if start_col:
+        columns.append((_GAP_A, start_col))
+    columns.append((_MATCH, 1))
+    if (start_row, start_col) != (end_row, end_col):
+        gap_scores = (calc_affine_penalty(1, open_A, extend_A,
+                                          penalize_extend_when_opening),
+                      extend_A,
+                      calc_affine_penalty(1, open_B, extend_B,
+                                          penalize_extend_when_opening),
+                      extend_B)
+        _hirschberg(sequenceA, sequenceB, start_row+1, end_row,
+                    start_col+1, end_col, _MATCH, None,
+                    match_fn, gap_scores, columns)
+        columns.append((_MATCH, 1))
+    if end_row < lenA - 1:
+        columns.append((_GAP_B, lenA - 1 - end_row))
+    if end_col < lenB - 1:
+        columns.append((_GAP_A, lenB - 1 - end_col))
+
+    # Build the aligned sequences using slices, to keep the type of
+    # the sequences (see _recover_alignments).
+    seqA, seqB = sequenceA[0:0], sequenceB[0:0]
+    row = col = 0
+    for kind, length in columns:
+        if kind == _MATCH:
+            seqA += sequenceA[row:row+length]
+            seqB += sequenceB[col:col+length]
+            row += length
+            col += length
+        elif kind == _GAP_A:
+            seqA += gap_char * length
+            seqB += sequenceB[col:col+length]
+            col += length
+        else:
+            seqA += sequenceA[row:row+length]
+            seqB += gap_char * length
+            row += length
+    return [(seqA, seqB, best_score, 0, len(seqA))]
+
+
+def _hirschberg(sequenceA, sequenceB, startA, endA, startB, endB,
+                before, last, match_fn, gap_scores, columns):
+    # Append the columns of a best alignment of sequenceA[startA:endA]
+    # with sequenceB[startB:endB] to the list columns, as tuples of
+    # (kind, length).  before is the kind of the column before this
+    # piece (or _MATCH), and if last is not None the piece must end
+    # with that kind of column (or be empty, if before is that kind).
+    first_A_gap, extend_A, first_B_gap, extend_B = gap_scores
+    nA, nB = endA - startA, endB - startB
+    if nA == 0:
+        # Only gaps in sequenceA are possible.
+        if nB:
+            columns.append((_GAP_A, nB))
+        return
+    if nA == 1:
+        if nB == 0:
+            columns.append((_GAP_B, 1))
+            return
+        # The character in sequenceA must be matched, with gaps in
+        # sequenceA on either side of it.  Try each position.
+        charA = sequenceA[startA]
+        best_score, best_col = None, None
+        for col in range(nB):
+            if col == 0:
+                score = 0
+            elif before == _GAP_B:
+                continue
+            elif before == _GAP_A:
+                score = extend_A * col
+            else:
+                score = first_A_gap + extend_A * (col-1)
+            if col < nB - 1:
+                if last is not None and last != _GAP_A:
+                    continue
+                score += first_A_gap + extend_A * (nB-col-2)
+            elif last is not None and last != _MATCH:
+                continue
+            score += match_fn(charA, sequenceB[startB+col])
+            if best_score is None or score > best_score:
+                best_score, best_col = score, col
+        if best_col:
+            columns.append((_GAP_A, best_col))
+        columns.append((_MATCH, 1))
+        if best_col < nB - 1:
+            columns.append((_GAP_A, nB - 1 - best_col))
+        return
+
+    # Split sequenceA in half, and find the best place to cross the
+    # middle by scoring the first half forwards and the second half
+    # backwards.
+    midA = (startA + endA) // 2
+    subB = sequenceB[startB:endB]
+    forward = _last_row_fast(
+        sequenceA[startA:midA], subB, match_fn,
+        first_A_gap, extend_A, first_B_gap, extend_B, before, None)
+    backward = _last_row_fast(
+        sequenceA[midA:endA][::-1], subB[::-1], match_fn,
+        first_A_gap, extend_A, first_B_gap, extend_B, _MATCH, last)
+    # The second half starts with either a match or a gap in
+    # sequenceB.  A gap in sequenceB in both halves is one gap.
+    best_score, best = None, None
+    for col in range(nB+1):
+        match_score = forward[_MATCH][col]
+        gap_A_score = forward[_GAP_A][col]
+        gap_B_score = forward[_GAP_B][col]
+        back_match_score = backward[_MATCH][nB-col]
+        back_gap_B_score = backward[_GAP_B][nB-col]
+        for score, left, right in (
+                (match_score + back_match_score, _MATCH, _MATCH),
+                (gap_A_score + back_match_score, _GAP_A, _MATCH),
+                (gap_B_score + back_match_score, _GAP_B, _MATCH),
+                (match_score + back_gap_B_score, _MATCH, _GAP_B),
+                (gap_B_score + back_gap_B_score - first_B_gap + extend_B,
+                 _GAP_B, _GAP_B)):
+            if best_score is None or score > best_score:
+                best_score, best = score, (col, left, right)
+    col, left, right = best
+    _hirschberg(sequenceA, sequenceB, startA, midA, startB, startB+col,
+                before, left, match_fn, gap_scores, columns)
+    if right == _MATCH:
+        columns.append((_MATCH, 1))
+        _hirschberg(sequenceA, sequenceB, midA+1, endA, startB+col+1, endB,
+                    _MATCH, last, match_fn, gap_scores, columns)
+    else:
+        columns.append((_GAP_B, 1))
+        _hirschberg(sequenceA, sequenceB, midA+1, endA, startB+col, endB,
+                    _GAP_B, last, match_fn, gap_scores, columns)
+
+
 def _recover_alignments(sequenceA, sequenceB, starts,
                         score_matrix, trace_matrix, align_globally,
                         penalize_end_gaps, gap_char, one_alignment_only):
@@ -707,6 +1403,34 @@ def _find_local_start(score_matrix):
     return positions
 
 
+def _find_banded_start(score_matrix, sequenceA, sequenceB, gap_A_fn,
+                       gap_B_fn, penalize_end_gaps, align_globally):
+    # Like _find_start, for a score matrix from
+    # _make_score_matrix_banded, where only the cells filled in are
+    # possible starting points.
+    nrows, ncols = len(sequenceA), len(sequenceB)
+    positions = []
+    if not align_globally:
+        for row in range(nrows):
+            for col, score in sorted(score_matrix[row].items()):
+                positions.append((score, (row, col)))
+        return positions
+    for row in range(nrows):
+        score = score_matrix[row].get(ncols-1)
+        if score is None:
+            continue
+        if penalize_end_gaps:
+            score += gap_B_fn(ncols, nrows-row-1)
+        positions.append((score, (row, ncols-1)))
+    for col, score in sorted(score_matrix[nrows-1].items()):
+        if col == ncols-1:
+            continue
+        if penalize_end_gaps:
+            score += gap_A_fn(nrows, ncols-col-1)
+        positions.append((score, (nrows-1, col)))
+    return positions
+
+
 def _clean_alignments(alignments):
     # Take a list of alignments and return a cleaned version.  Remove
     # duplicates, make sure begin and end are set correctly, remove
@@ -810,6 +1534,73 @@ class dictionary_match:
         return self.score_dict[(charA, charB)]
 
 
+class matrix_match(dictionary_match):
+    """matrix_match(score_dict[, symmetric]) -> match_fn
+
+    Create a match function for use in an alignment, like
+    dictionary_match, from a dictionary of scores such as a
+    substitution matrix from Bio.SubsMat.MatrixInfo.  The scores for
+    single characters are also compiled into table, a list of lists
+    indexed by character code, so that when aligning strings the
+    scores are looked up directly rather than calling this function
+    for every pair of residues.  Pairs missing from score_dict give a
+    KeyError as for dictionary_match.
+
+    """
+    def __init__(self, score_dict, symmetric=1):
+        dictionary_match.__init__(self, score_dict, symmetric)
+        table = [[None] * 256 for i in range(256)]
+        codes = []
+        for (charA, charB), score in score_dict.items():
+            try:
+                codeA, codeB = ord(charA), ord(charB)
+                table[codeA][codeB] = score
+            except (TypeError, IndexError):
+                # Not a single character, or not 8 bit
+                continue
+            codes.append((codeA, codeB))
+        if symmetric:
+            for codeA, codeB in codes:
+                if table[codeB][codeA] is None:
+                    table[codeB][codeA] = table[codeA][codeB]
+        self.table = table
+
+
+def _match_codes(match_fn, sequence):
+    # Return the table indexes for the characters of sequence if the
+    # scores can be looked up in the table of a matrix_match, or None.
+    if not isinstance(match_fn, matrix_match):
+        return None
+    try:
+        codes = [ord(char) for char in sequence]
+    except TypeError:
+        return None
+    if codes and max(codes) > 255:
+        return None
+    return codes
+
+
+def _match_score_row(match_fn, charA, sequenceB, codesB,
+                     start=0, stop=None):
+    # Return a list of the match scores of charA against each
+    # character of sequenceB[start:stop].  codesB is from _match_codes.
+    if start or stop is not None:
+        sequenceB = sequenceB[start:stop]
+        if codesB is not None:
+            codesB = codesB[start:stop]
+    if codesB is not None:
+        try:
+            table_row = match_fn.table[ord(charA)]
+        except (TypeError, IndexError):
+            pass
+        else:
+            scores = [table_row[code] for code in codesB]
+            if None not in scores:
+                return scores
+            # Let match_fn raise the KeyError for the missing pair
+    return [match_fn(charA, charB) for charB in sequenceB]
+
+
 class affine_penalty:
     """affine_penalty(open, extend[, penalize_extend_when_opening]) -> gap_fn
 
@@ -871,7 +1662,8 @@ def format_alignment(align1, align2, score, begin, end):
 # Try and load C implementations of functions.  If I can't,
 # then just ignore and use the pure python implementations.
 try:
-    from cpairwise2 import rint, _make_score_matrix_fast
+    from cpairwise2 import rint, _make_score_matrix_fast, \
+         _score_only_fast, _last_row_fast
 except ImportError:
     pass
 
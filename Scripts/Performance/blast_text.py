@@ -0,0 +1,93 @@
+#/usr/bin/env python
+"""Small script to time parsing a large synthetic plain text BLAST file.
+
+The file is made by repeating the reports of Tests/Blast/text_2226_blastp_004.txt
+(three queries each), and is parsed with Bio.Blast.NCBIStandalone, using
+both an Iterator with a BlastParser (which copies each record's text into a
+StringIO and then scans it through an UndoHandle) and the streaming parse
+function, with and without the alignments.
+
+Usage: python blast_text.py [copies [filename]]
+"""
+import os
+import sys
+import time
+import warnings
+
+warnings.simplefilter('ignore', PendingDeprecationWarning)
+
+from Bio.Blast import NCBIStandalone
+
+try:
+    copies = int(sys.argv[1])
+except IndexError:
+    copies = 300
+try:
+    filename = sys.argv[2]
+except IndexError:
+    filename = "synthetic_blast.txt"
+
+template = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, os.pardir, "Tests", "Blast",
+                        "text_2226_blastp_004.txt")
+
+# -- write the synthetic file
+text = open(template).read()
+handle = open(filename, "w")
+for i in range(copies):
+    handle.write(text)
+handle.close()
+print "%s: %i reports, %0.1f MB" % (filename, 3 * copies,
+                                    os.path.getsize(filename) / 1024.0 ** 2)
+
+
+def count_hsps(records):
+    count = 0
+    for record in records:
+        for alignment in record.alignments:
+            for hsp in alignment.hsps:
+                count += hsp.expect < 1e-5
+    return count
+
+
+def count_descriptions(records):
+    count = 0
+    for record in records:
+        for description in record.descriptions:
+            count += description.e < 1e-5
+    return count
+
+# -- Iterator with BlastParser
+handle = open(filename)
+start_time = time.time()
+count = count_hsps(NCBIStandalone.Iterator(handle,
+                                           NCBIStandalone.BlastParser()))
+print "Iterator with BlastParser, %i HSPs with evalue < 1e-5" % count
+print "\t%f seconds" % (time.time() - start_time)
+handle.close()
+
+# -- parse
+handle = open(filename)
+start_time = time.time()
+count = count_hsps(NCBIStandalone.parse(handle))
+print "parse, %i HSPs with evalue < 1e-5" % count
+print "\t%f seconds" % (time.time() - start_time)
+handle.close()
+
+# -- descriptions only
+handle = open(filename)
+start_time = time.time()
+count = count_descriptions(NCBIStandalone.Iterator(handle,
+                                           NCBIStandalone.BlastParser()))
+print "Iterator with BlastParser, %i descriptions with evalue < 1e-5" % count
+print "\t%f seconds" % (time.time() - start_time)
+handle.close()
+
+handle = open(filename)
+start_time = time.time()
+count = count_descriptions(NCBIStandalone.parse(handle, alignments=False))
+print "parse without alignments, %i descriptions with evalue < 1e-5" % count
+print "\t%f seconds" % (time.time() - start_time)
+handle.close()
+
+os.remove(filename)
@@ -0,0 +1,78 @@
+#/usr/bin/env python
+"""Small script to time parsing a large synthetic BLAST XML file.
+
+The file is made by repeating the queries of Tests/Blast/mirna.xml (with new
+query IDs), and is parsed with both Bio.SearchIO (format 'blast-xml') and
+Bio.Blast.NCBIXML.  Only the scores of each HSP are looked at, which is what
+most filtering code does.  The peak memory use (as reported by the resource
+module, so not on Windows) should not grow with the number of queries.
+
+Usage: python blast_xml.py [copies [filename]]
+"""
+import os
+import resource
+import sys
+import time
+import warnings
+
+from Bio import BiopythonExperimentalWarning
+warnings.simplefilter('ignore', BiopythonExperimentalWarning)
+
+from Bio import SearchIO
+from Bio.Blast import NCBIXML
+
+try:
+    copies = int(sys.argv[1])
+except IndexError:
+    copies = 200
+try:
+    filename = sys.argv[2]
+except IndexError:
+    filename = "synthetic_blast.xml"
+
+template = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, os.pardir, "Tests", "Blast", "mirna.xml")
+
+# -- write the synthetic file
+text = open(template).read()
+start = text.index("<Iteration>")
+end = text.rindex("</Iteration>") + len("</Iteration>\n")
+iterations = text[start:end]
+handle = open(filename, "w")
+handle.write(text[:start])
+for i in range(copies):
+    handle.write(iterations.replace("<Iteration_query-ID>",
+                                    "<Iteration_query-ID>%i_" % i))
+handle.write(text[end:])
+handle.close()
+print "%s: %i queries, %0.1f MB" % (filename, 3 * copies,
+                                    os.path.getsize(filename) / 1024.0 ** 2)
+
+
+def peak_memory():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+# -- Bio.SearchIO
+start_time = time.time()
+count = 0
+for qresult in SearchIO.parse(filename, "blast-xml"):
+    for hsp in qresult.hsps:
+        count += hsp.evalue < 1e-5
+elapsed_time = time.time() - start_time
+print "Bio.SearchIO.parse, %i HSPs with evalue < 1e-5" % count
+print "\t%f seconds, peak memory %0.1f MB" % (elapsed_time, peak_memory())
+
+# -- Bio.Blast.NCBIXML
+start_time = time.time()
+count = 0
+handle = open(filename)
+for record in NCBIXML.parse(handle):
+    for alignment in record.alignments:
+        for hsp in alignment.hsps:
+            count += hsp.expect < 1e-5
+handle.close()
+elapsed_time = time.time() - start_time
+print "Bio.Blast.NCBIXML.parse, %i HSPs with evalue < 1e-5" % count
+print "\t%f seconds, peak memory %0.1f MB" % (elapsed_time, peak_memory())
+
+os.remove(filename)
@@ -0,0 +1,99 @@
+#/usr/bin/env python
+"""Small script to time parsing a large synthetic BLAT PSL file.
+
+The file is made by repeating the rows of Tests/Blat/psl_34_004.psl (with
+new query names, so each copy is a new query), as if the query had hit a
+repeat many times.  All the query results are kept in memory, and the peak
+memory use is reported (using the resource module, so not on Windows).
+
+The file is then read again as columns with Bio.SearchIO.read_table, the
+identity and coverage of each row are computed, the hit coordinates moved
+(as in a liftover) and the rows written back out, which is compared with
+doing the same using the parsed objects and the blat-psl writer.
+
+Usage: python blat_psl.py [copies [filename]]
+"""
+import os
+import resource
+import sys
+import time
+import warnings
+
+from Bio import BiopythonExperimentalWarning
+warnings.simplefilter('ignore', BiopythonExperimentalWarning)
+
+from Bio import SearchIO
+
+try:
+    copies = int(sys.argv[1])
+except IndexError:
+    copies = 2000
+try:
+    filename = sys.argv[2]
+except IndexError:
+    filename = "synthetic_blat.psl"
+
+template = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, os.pardir, "Tests", "Blat", "psl_34_004.psl")
+
+# -- write the synthetic file
+rows = [line for line in open(template) if line[:1].isdigit()]
+handle = open(filename, "w")
+for i in range(copies):
+    for row in rows:
+        cols = row.split("\t")
+        cols[9] = "%s_%i" % (cols[9], i)
+        handle.write("\t".join(cols))
+handle.close()
+print "%s: %i rows, %0.1f MB" % (filename, len(rows) * copies,
+                                 os.path.getsize(filename) / 1024.0 ** 2)
+
+
+def peak_memory():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+start_memory = peak_memory()
+start_time = time.time()
+qresults = list(SearchIO.parse(filename, "blat-psl"))
+elapsed_time = time.time() - start_time
+fragments = sum(len(hsp) for qresult in qresults for hsp in qresult.hsps)
+print "Bio.SearchIO.parse, %i queries, %i fragments" % (len(qresults),
+                                                       fragments)
+print "\t%f seconds, memory %0.1f MB" % (elapsed_time,
+                                         peak_memory() - start_memory)
+
+# -- Bio.SearchIO.parse and write
+start_time = time.time()
+count = 0
+qresults = []
+for qresult in SearchIO.parse(filename, "blat-psl"):
+    for hsp in qresult.hsps:
+        count += hsp.ident_pct > 95
+        for fragment in hsp:
+            fragment.hit_end += 1000
+            fragment.hit_start += 1000
+    qresults.append(qresult)
+SearchIO.write(qresults, filename + ".out", "blat-psl")
+elapsed_time = time.time() - start_time
+print "Bio.SearchIO.parse and write, %i rows with identity > 95%%" % count
+print "\t%f seconds" % elapsed_time
+del qresults
+
+# -- Bio.SearchIO.read_table
+start_time = time.time()
+count = 0
+handle = open(filename + ".out", "w")
+for table in SearchIO.read_table(filename, "blat-psl"):
+    count += sum(1 for pct in table.ident_pct() if pct > 95)
+    table.query_coverage()
+    for column in (table["tstart"], table["tend"], table["tstarts"]):
+        for i in range(len(column)):
+            column[i] += 1000
+    table.write(handle)
+handle.close()
+elapsed_time = time.time() - start_time
+print "Bio.SearchIO.read_table and write, %i rows with identity > 95%%" % count
+print "\t%f seconds" % elapsed_time
+
+os.remove(filename)
+os.remove(filename + ".out")
@@ -0,0 +1,72 @@
+#/usr/bin/env python
+"""Small script to time building a replacement dictionary from an alignment.
+
+This compares SummaryInfo.replacement_dictionary, which counts the residue
+pairs column by column, with the old approach of comparing every pair of
+records in turn using SummaryInfo._pair_replacement.
+
+Usage: python replacement_dictionary.py [records [length]]
+"""
+import random
+import sys
+import time
+
+from Bio.Alphabet import IUPAC, Gapped
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Align import MultipleSeqAlignment
+from Bio.Align.AlignInfo import SummaryInfo
+
+try:
+    num_records = int(sys.argv[1])
+except IndexError:
+    num_records = 100
+try:
+    length = int(sys.argv[2])
+except IndexError:
+    length = 1000
+
+# -- build a random weighted protein alignment
+random.seed(0)
+alphabet = Gapped(IUPAC.protein, "-")
+letters = IUPAC.protein.letters + "-"
+records = []
+for i in range(num_records):
+    seq = Seq("".join(random.choice(letters) for j in range(length)), alphabet)
+    record = SeqRecord(seq, id="seq%i" % i)
+    record.annotations["weight"] = random.uniform(0.5, 1.5)
+    records.append(record)
+alignment = MultipleSeqAlignment(records, alphabet)
+
+
+def old_replacement_dictionary(info, skip_chars=[]):
+    rep_dict, skip_items = info._get_base_replacements(skip_chars)
+    records = info.alignment._records
+    for rec_num1 in range(len(records)):
+        for rec_num2 in range(rec_num1 + 1, len(records)):
+            rep_dict = info._pair_replacement(
+                records[rec_num1].seq, records[rec_num2].seq,
+                records[rec_num1].annotations.get('weight', 1.0),
+                records[rec_num2].annotations.get('weight', 1.0),
+                rep_dict, skip_items)
+    return rep_dict
+
+print "Alignment of %i records of length %i" % (num_records, length)
+
+# -- do the pair by pair timing part
+start_time = time.time()
+old = old_replacement_dictionary(SummaryInfo(alignment))
+elapsed_time = time.time() - start_time
+print "Comparing every pair of records"
+print "\t%f seconds" % elapsed_time
+
+# -- do the column counting timing part
+start_time = time.time()
+new = SummaryInfo(alignment).replacement_dictionary()
+elapsed_time = time.time() - start_time
+print "Counting pairs in each column"
+print "\t%f seconds" % elapsed_time
+
+assert sorted(old) == sorted(new)
+for key in old:
+    assert abs(old[key] - new[key]) < 1e-6 * max(1, abs(old[key])), key
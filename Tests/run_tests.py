@@ -104,22 +104,28 @@ DOCTEST_MODULES = [
                    "Bio.Seq",
                    "Bio.SeqIO",
                    "Bio.SeqIO.FastaIO",
+                   "Bio.SeqIO.AbiIO",
                    "Bio.SeqIO.AceIO",
                    "Bio.SeqIO.PhdIO",
                    "Bio.SeqIO.QualityIO",
                    "Bio.SeqIO.SffIO",
+                   "Bio.SeqIO.UniprotIO",
                    "Bio.SeqFeature",
                    "Bio.SeqRecord",
                    "Bio.SeqUtils",
                    "Bio.SeqUtils.MeltingTemp",
                    "Bio.Sequencing.Applications._Novoalign",
                    "Bio.Sequencing.Applications._bwa",
+                   "Bio.SwissProt",
                    "Bio.Wise",
                    "Bio.Wise.psw",
                   ]
 #Silently ignore any doctests for modules requiring numpy!
 if is_numpy():
-    DOCTEST_MODULES.extend(["Bio.Statistics.lowess",
+    DOCTEST_MODULES.extend(["Bio.Align.ArrayAlignment",
+                            "Bio.AlignIO.ArrayIO",
+                            "Bio.SubsMat",
+                            "Bio.Statistics.lowess",
                             "Bio.PDB.Polypeptide",
                             "Bio.PDB.Selection"
                             ])
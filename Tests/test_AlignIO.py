@@ -39,6 +39,7 @@ test_files = [
     ("nexus", 2, 1, 'Nexus/codonposset.nex'),
     ("stockholm", 2, 1, 'Stockholm/simple.sth'),
     ("stockholm", 6, 1, 'Stockholm/funny.sth'),
+    ("stockholm-nometa", 2, 1, 'Stockholm/simple.sth'),
     ("phylip", 6, 1, 'Phylip/reference_dna.phy'),
     ("phylip", 6, 1, 'Phylip/reference_dna2.phy'),
     ("phylip",10, 1, 'Phylip/hennigian.phy'),
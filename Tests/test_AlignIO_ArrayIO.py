@@ -0,0 +1,107 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the memory mapped binary alignment files of Bio.AlignIO.ArrayIO."""
+
+import os
+import tempfile
+import unittest
+from StringIO import StringIO
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.AlignIO.ArrayIO.")
+
+from Bio import AlignIO
+from Bio.Alphabet import generic_dna
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Align import MultipleSeqAlignment
+from Bio.Align.ArrayAlignment import ArrayAlignment
+from Bio.AlignIO import ArrayIO
+
+
+class TestArrayIO(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix=".msa")
+        os.close(handle)
+
+    def tearDown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def compare(self, old, new):
+        self.assertEqual(len(old), len(new))
+        self.assertEqual(old.get_alignment_length(),
+                         new.get_alignment_length())
+        for old_record, new_record in zip(old, new):
+            self.assertEqual(old_record.id, new_record.id)
+            self.assertEqual(old_record.name, new_record.name)
+            self.assertEqual(old_record.description, new_record.description)
+            self.assertEqual(str(old_record.seq), str(new_record.seq))
+
+    def test_convert(self):
+        for filename, format in [("Clustalw/opuntia.aln", "clustal"),
+                                 ("Clustalw/protein.aln", "clustal"),
+                                 ("Phylip/interlaced.phy", "phylip"),
+                                 ("Stockholm/simple.sth", "stockholm"),
+                                 ("GFF/multi.fna", "fasta")]:
+            old = AlignIO.read(filename, format)
+            count = ArrayIO.convert(filename, format, self.filename)
+            self.assertEqual(count, len(old))
+            new = ArrayIO.load(self.filename)
+            self.assertTrue(isinstance(new.array, numpy.memmap))
+            self.compare(old, new)
+            del new
+
+    def test_write(self):
+        records = [SeqRecord(Seq("ACGT-A", generic_dna), id="Alpha",
+                             name="a", description="first"),
+                   SeqRecord(Seq("ACCT-A", generic_dna), id="Beta"),
+                   SeqRecord(Seq("AGGTTA", generic_dna), id="Gamma")]
+        msa = MultipleSeqAlignment(records, generic_dna,
+                                   annotations={"tool": "demo", "score": 3})
+        self.assertEqual(3, ArrayIO.write(msa, self.filename))
+        align = ArrayIO.load(self.filename, generic_dna)
+        self.compare(msa, align)
+        self.assertEqual(align.annotations, {"tool": "demo"})
+        self.assertEqual(align._alphabet, generic_dna)
+        self.assertEqual(align[:, 2], "GCG")
+        self.assertEqual(align[1:, 1:3].array.tolist(),
+                         [[ord("C"), ord("C")], [ord("G"), ord("G")]])
+        letters, counts = align[:, 2:5].column_counts()
+        self.assertEqual(letters, "-CGT")
+        self.assertEqual(counts.tolist(),
+                         [[0, 0, 2], [1, 0, 0], [2, 0, 0], [0, 3, 1]])
+        self.assertRaises(ValueError, align.array.__setitem__, (0, 0), 65)
+        del align
+
+        #From an iterator, and from an ArrayAlignment
+        self.assertEqual(3, ArrayIO.write(iter(records), self.filename))
+        self.compare(msa, ArrayIO.load(self.filename))
+        self.assertEqual(3, ArrayIO.write(ArrayAlignment(msa), self.filename))
+        self.compare(msa, ArrayIO.load(self.filename))
+
+    def test_empty(self):
+        self.assertEqual(0, ArrayIO.write([], self.filename))
+        align = ArrayIO.load(self.filename)
+        self.assertEqual(align.array.shape, (0, 0))
+
+    def test_bad(self):
+        records = [SeqRecord(Seq("ACGT"), id="Alpha"),
+                   SeqRecord(Seq("ACG"), id="Beta")]
+        self.assertRaises(ValueError, ArrayIO.write, records, StringIO())
+        handle = open(self.filename, "wb")
+        handle.write("Not an alignment at all")
+        handle.close()
+        self.assertRaises(ValueError, ArrayIO.load, self.filename)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
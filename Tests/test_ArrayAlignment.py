@@ -0,0 +1,201 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the NumPy array backed alignment in Bio.Align.ArrayAlignment."""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Align.ArrayAlignment.")
+
+from StringIO import StringIO
+
+from Bio import AlignIO
+from Bio.Alphabet import generic_dna
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Align import MultipleSeqAlignment
+from Bio.Align.ArrayAlignment import ArrayAlignment
+
+
+class TestArrayAlignment(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [SeqRecord(Seq("AAAACGT", generic_dna), id="Alpha"),
+                        SeqRecord(Seq("AAA-CGT", generic_dna), id="Beta"),
+                        SeqRecord(Seq("AAAAGGT", generic_dna), id="Gamma"),
+                        SeqRecord(Seq("AAAACGT", generic_dna), id="Delta"),
+                        SeqRecord(Seq("AAA-GGT", generic_dna), id="Epsilon")]
+        self.msa = MultipleSeqAlignment(self.records, generic_dna,
+                                        annotations={"tool": "demo"})
+        self.align = ArrayAlignment(self.msa)
+
+    def test_init(self):
+        self.assertEqual(self.align.array.shape, (5, 7))
+        self.assertEqual(len(self.align), 5)
+        self.assertEqual(self.align.get_alignment_length(), 7)
+        self.assertEqual(self.align.annotations, {"tool": "demo"})
+        self.assertEqual(str(self.align), str(self.msa))
+        align = ArrayAlignment(iter(self.records))
+        self.assertEqual(str(align), str(self.msa))
+        empty = ArrayAlignment([])
+        self.assertEqual((len(empty), empty.get_alignment_length()), (0, 0))
+
+    def test_bad_records(self):
+        records = self.records + [SeqRecord(Seq("AAA"), id="Short")]
+        self.assertRaises(ValueError, ArrayAlignment, records)
+        self.assertRaises(TypeError, ArrayAlignment, ["AAAACGT"])
+
+    def test_indexing(self):
+        msa, align = self.msa, self.align
+        for index in [0, -1, (1, slice(None)), (2, slice(1, 5))]:
+            self.assertEqual(str(align[index].seq), str(msa[index].seq))
+            self.assertEqual(align[index].id, msa[index].id)
+        for index in [(3, 4), (slice(None), 4), (slice(1, 3), 4)]:
+            self.assertEqual(align[index], msa[index])
+        for index in [slice(2, 5), slice(None, None, -1),
+                      (slice(1, 5), slice(3, 6))]:
+            self.assertEqual(str(align[index]), str(msa[index]))
+
+    def test_views(self):
+        sub = self.align[1:3, 2:5]
+        self.assertTrue(numpy.may_share_memory(sub.array, self.align.array))
+        self.align.array[1, 2] = ord("N")
+        self.assertEqual(str(sub[0].seq), "N-C")
+
+    def test_to_alignment(self):
+        msa = self.align.to_alignment()
+        self.assertTrue(isinstance(msa, MultipleSeqAlignment))
+        self.assertEqual(msa.format("fasta"), self.msa.format("fasta"))
+        self.assertEqual(msa.annotations, {"tool": "demo"})
+        self.assertEqual(self.align.format("clustal"),
+                         self.msa.format("clustal"))
+
+    def test_column_counts(self):
+        letters, counts = self.align.column_counts()
+        self.assertEqual(letters, "-ACGT")
+        self.assertEqual(counts.shape, (5, 7))
+        for col in range(7):
+            column = self.msa[:, col]
+            self.assertEqual(list(counts[:, col]),
+                             [column.count(letter) for letter in letters])
+        letters, counts = self.align.column_counts([1, 0.5, 1, 1, 0.5])
+        self.assertEqual(list(counts[:, 3]), [1.0, 3.0, 0, 0, 0])
+
+    def test_pair_counts(self):
+        for weights in (None, [1, 0.5, 1, 1, 0.5]):
+            letters, counts = self.align.pair_counts(weights)
+            self.assertEqual(letters, "-ACGT")
+            if weights is None:
+                weights = [1] * len(self.msa)
+            expected = {}
+            for i, record1 in enumerate(self.msa):
+                for j in range(i + 1, len(self.msa)):
+                    record2 = self.msa[j]
+                    for residue1, residue2 in zip(record1.seq, record2.seq):
+                        key = (letters.index(residue1),
+                               letters.index(residue2))
+                        expected[key] = expected.get(key, 0) \
+                                        + weights[i] * weights[j]
+            for i in range(len(letters)):
+                for j in range(len(letters)):
+                    self.assertAlmostEqual(counts[i, j],
+                                           expected.get((i, j), 0))
+
+    def test_gap_fractions(self):
+        self.assertEqual(list(self.align.gap_fractions()),
+                         [0, 0, 0, 0.4, 0, 0, 0])
+        self.assertEqual(list(self.align.letter_counts("G")),
+                         [0, 0, 0, 0, 2, 5, 0])
+
+    def test_large(self):
+        align = AlignIO.read("Clustalw/opuntia.aln", "clustal")
+        array_align = ArrayAlignment(align)
+        letters, counts = array_align.column_counts()
+        for col in range(align.get_alignment_length()):
+            column = align[:, col]
+            self.assertEqual(array_align[:, col], column)
+            for letter, count in zip(letters, counts[:, col]):
+                self.assertEqual(column.count(letter), count)
+
+
+class TestParseArrays(unittest.TestCase):
+
+    def check(self, filename, format, seq_count=None):
+        alignments = list(AlignIO.parse(filename, format, seq_count))
+        arrays = list(AlignIO.parse_arrays(filename, format, seq_count))
+        self.assertEqual(len(alignments), len(arrays))
+        for alignment, array_align in zip(alignments, arrays):
+            self.assertTrue(isinstance(array_align, ArrayAlignment))
+            self.assertEqual(len(alignment), len(array_align))
+            for old, new in zip(alignment, array_align):
+                self.assertEqual(old.id, new.id)
+                self.assertEqual(old.name, new.name)
+                self.assertEqual(old.description, new.description)
+                self.assertEqual(str(old.seq), str(new.seq))
+
+    def test_phylip(self):
+        for filename in ["interlaced.phy", "interlaced2.phy", "random.phy",
+                         "reference_dna.phy", "reference_dna2.phy",
+                         "hennigian.phy", "horses.phy"]:
+            self.check("Phylip/" + filename, "phylip")
+        self.check("Phylip/sequential.phy", "phylip-sequential")
+        self.check("Phylip/sequential2.phy", "phylip-sequential")
+
+    def test_fasta(self):
+        self.check("GFF/multi.fna", "fasta")
+        self.check("GFF/multi.fna", "fasta", 1)
+        self.assertRaises(ValueError, list,
+                          AlignIO.parse_arrays("GFF/multi.fna", "fasta", 2))
+
+    def test_other_format(self):
+        self.check("Clustalw/opuntia.aln", "clustal")
+
+    def make_replicates(self):
+        handle = StringIO()
+        align = AlignIO.read("Phylip/interlaced.phy", "phylip")
+        AlignIO.write([align, align[:, 5:], align[:, :-5], align[:, :-5]],
+                      handle, "phylip")
+        handle.seek(0)
+        return handle
+
+    def test_replicates(self):
+        alignments = list(AlignIO.parse_arrays(self.make_replicates(),
+                                               "phylip"))
+        self.assertEqual([a.array.shape for a in alignments],
+                         [(3, 384), (3, 379), (3, 379), (3, 379)])
+        self.assertFalse(alignments[1].array is alignments[2].array)
+        self.assertEqual(alignments[0][:, 5:].format("phylip"),
+                         alignments[1].format("phylip"))
+
+    def test_reuse(self):
+        shapes = []
+        arrays = []
+        infos = []
+        old = None
+        for align in AlignIO.parse_arrays(self.make_replicates(), "phylip",
+                                          reuse=True):
+            shapes.append(align.array.shape)
+            arrays.append(align.array)
+            infos.append(align._info)
+            if old is not None:
+                self.assertEqual(old[:, 5:].format("phylip"),
+                                 align.format("phylip"))
+            if align.get_alignment_length() == 384:
+                old = ArrayAlignment(align)
+            else:
+                old = None
+        self.assertEqual(shapes, [(3, 384), (3, 379), (3, 379), (3, 379)])
+        self.assertFalse(arrays[0] is arrays[1])
+        self.assertTrue(arrays[1] is arrays[2] is arrays[3])
+        self.assertTrue(infos[0] is infos[1] is infos[2] is infos[3])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -5,6 +5,8 @@
 
 import os
 import unittest
+from StringIO import StringIO
+
 from Bio.Blast import NCBIStandalone
 
 
@@ -14954,6 +14956,135 @@ class TestNCBITextParser(unittest.TestCase):
         handle.close()
 
 
+def record_dict(obj):
+    """Returns the attributes of a record (and its parts) as nested dicts."""
+    if isinstance(obj, (list, tuple)):
+        return [record_dict(x) for x in obj]
+    if hasattr(obj, '__dict__'):
+        return dict((k, record_dict(v)) for k, v in obj.__dict__.items())
+    return obj
+
+
+class TestStreamParser(unittest.TestCase):
+
+    def check_parse(self, filenames, psiblast=False):
+        """Checks parse gives the same records as Iterator with a parser."""
+        if psiblast:
+            parser = NCBIStandalone.PSIBlastParser()
+        else:
+            parser = NCBIStandalone.BlastParser()
+        text = "".join(open(os.path.join('Blast', filename)).read()
+                       for filename in filenames)
+        expected = [record_dict(record) for record in
+                    NCBIStandalone.Iterator(StringIO(text), parser)]
+        self.assertTrue(expected)
+        records = [record_dict(record) for record in
+                   NCBIStandalone.parse(StringIO(text), psiblast)]
+        self.assertEqual(expected, records)
+        # and without the alignments
+        for record in expected:
+            for part in record.get('rounds', [record]):
+                part['alignments'] = []
+                part['multiple_alignment'] = None
+        records = [record_dict(record) for record in
+                   NCBIStandalone.parse(StringIO(text), psiblast,
+                                        alignments=False)]
+        self.assertEqual(expected, records)
+
+    def test_blast_2010L(self):
+        "Test parse on BLAST 2.0.10 output"
+        self.check_parse(['text_2010L_blastn_001.txt',
+                          'text_2010L_blastp_001.txt',
+                          'text_2010L_blastp_006.txt',
+                          'text_2010L_blastx_001.txt',
+                          'text_2010L_tblastn_001.txt',
+                          'text_2010L_tblastx_001.txt'])
+
+    def test_psiblast(self):
+        "Test parse on PSI-BLAST output"
+        self.check_parse(['text_2012L_psiblast_001.txt',
+                          'text_2014L_psiblast_001.txt',
+                          'text_2208L_psiblast_001.txt'], psiblast=True)
+
+    def test_phiblast(self):
+        "Test parse on PHI-BLAST output"
+        self.check_parse(['text_2010L_phiblast_001.txt'], psiblast=True)
+        self.assertRaises(ValueError, list, NCBIStandalone.parse(
+            open(os.path.join('Blast', 'text_2010L_phiblast_001.txt'))))
+
+    def test_blast_2202L(self):
+        "Test parse on BLAST 2.2.2 output"
+        self.check_parse(['text_2202L_blastn_001.txt',
+                          'text_2202L_blastp_001.txt'])
+
+    def test_blast_2220L(self):
+        "Test parse on BLAST 2.2.20 output with several queries"
+        self.check_parse(['text_2220L_blastx_002.txt'])
+
+    def test_blast_2226(self):
+        "Test parse on BLAST+ 2.2.26 output with several queries"
+        self.check_parse(['text_2226_blastn_004.txt',
+                          'text_2226_blastp_004.txt'])
+        self.check_parse(['text_2226_blastx_004.txt'])
+        self.check_parse(['text_2226_tblastn_004.txt'])
+        self.check_parse(['text_2226_tblastx_004.txt'])
+
+    def test_no_hits(self):
+        "Test parse on output without hits"
+        self.check_parse(['text_2226_blastp_001.txt',
+                          'text_2226_blastp_002.txt'])
+
+    def test_empty(self):
+        "Test parse on an empty file"
+        self.assertEqual([], list(NCBIStandalone.parse(StringIO(""))))
+
+    def test_truncated(self):
+        "Test parse on a truncated report"
+        text = open(os.path.join('Blast', 'text_2226_blastp_003.txt')).read()
+        text = text[:text.index(' Identities')]
+        self.assertRaises(ValueError, list,
+                          NCBIStandalone.parse(StringIO(text)))
+
+    def check_cuts(self, filename):
+        """Checks parse fails on the same cuts of a file as Iterator."""
+        lines = open(os.path.join('Blast', filename)).readlines()
+        for cut in range(1, len(lines)):
+            text = "".join(lines[:cut])
+            try:
+                expected = len(list(NCBIStandalone.Iterator(StringIO(text),
+                               NCBIStandalone.BlastParser())))
+            except ValueError:
+                for alignments in (True, False):
+                    self.assertRaises(ValueError, list, NCBIStandalone.parse(
+                        StringIO(text), alignments=alignments))
+            else:
+                for alignments in (True, False):
+                    records = list(NCBIStandalone.parse(
+                        StringIO(text), alignments=alignments))
+                    self.assertEqual(expected, len(records))
+
+    def test_truncated_lines(self):
+        "Test parse on reports cut at each line"
+        text = open(os.path.join('Blast', 'text_2010L_blastn_001.txt')).read()
+        # in the descriptions
+        text = "".join(text.splitlines(True)[:60])
+        self.assertRaises(ValueError, list,
+                          NCBIStandalone.parse(StringIO(text)))
+        self.assertRaises(ValueError, list,
+                          NCBIStandalone.parse(StringIO(text),
+                                               alignments=False))
+        self.check_cuts('text_2010L_blastn_001.txt')
+        self.check_cuts('text_2226_blastp_004.txt')
+
+    def test_wrong_format(self):
+        "Test parse on a file without a BLAST report"
+        handle = open(os.path.join('Blast', 'tab_2226_tblastn_001.txt'))
+        self.assertRaises(ValueError, list, NCBIStandalone.parse(handle))
+        handle.close()
+        self.assertRaises(ValueError, list,
+                          NCBIStandalone.parse(StringIO("\n")))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
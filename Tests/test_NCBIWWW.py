@@ -0,0 +1,205 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Offline tests for Bio.Blast.NCBIWWW, using a local QBLAST server.
+
+See test_NCBI_qblast.py for tests against the NCBI server itself.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib2
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from cgi import parse_qs
+
+from Bio.Blast import NCBIWWW, NCBIXML
+
+# results given by the local server, for every search
+XML_FILE = os.path.join('Blast', 'xml_2212L_blastp_001.xml')
+
+
+class QblastHandler(BaseHTTPRequestHandler):
+    """Replies to QBLAST Put and Get requests with canned pages."""
+
+    def do_POST(self):
+        length = int(self.headers.getheader('content-length'))
+        query = parse_qs(self.rfile.read(length))
+        server = self.server
+        server.lock.acquire()
+        try:
+            server.requests.append(query)
+            if query['CMD'] == ['Put']:
+                server.count += 1
+                rid = "RID%i" % server.count
+                # first poll of each search is not ready
+                server.waiting[rid] = True
+                server.running += 1
+                server.max_running = max(server.max_running, server.running)
+                page = "    RID = %s\n    RTOE = 0\n" % rid
+            else:
+                rid = query['RID'][0]
+                if server.waiting.pop(rid):
+                    server.waiting[rid] = False
+                    page = "\n    Status=WAITING\n"
+                else:
+                    server.running -= 1
+                    page = server.results
+        finally:
+            server.lock.release()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QblastCases(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), QblastHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.waiting = {}
+        self.server.count = 0
+        self.server.running = 0
+        self.server.max_running = 0
+        self.server.results = open(XML_FILE).read()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.setDaemon(True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%i/Blast.cgi" % self.server.server_port
+        # don't wait between polls
+        self.poll_delays = NCBIWWW._poll_delays
+        NCBIWWW._poll_delays = lambda rtoe: iter([0] * 10)
+
+    def tearDown(self):
+        NCBIWWW._poll_delays = self.poll_delays
+        self.server.shutdown()
+        self.server.server_close()
+
+    def check_results(self, handle):
+        """Checks the handle gives the canned results."""
+        record = NCBIXML.read(handle)
+        self.assertEqual("gi|49176427|ref|NP_418280.3|", record.query_id)
+
+    def test_url_base(self):
+        "Test qblast with a local server"
+        handle = NCBIWWW.qblast("blastp", "nr", "MKAL", url_base=self.url,
+                                hitlist_size=5)
+        self.check_results(handle)
+        put, poll, get = self.server.requests
+        self.assertEqual(['MKAL'], put['QUERY'])
+        self.assertEqual(['5'], put['HITLIST_SIZE'])
+        self.assertEqual(['RID1'], poll['RID'])
+        self.assertEqual(['XML'], get['FORMAT_TYPE'])
+
+    def test_cache(self):
+        "Test qblast with a cache directory"
+        cache = tempfile.mkdtemp()
+        try:
+            self.check_results(NCBIWWW.qblast("blastp", "nr", "MKAL",
+                                              url_base=self.url, cache=cache))
+            self.assertEqual(3, len(self.server.requests))
+            self.assertEqual(1, len(os.listdir(cache)))
+            # the same search again is read from the cache
+            self.check_results(NCBIWWW.qblast("blastp", "nr", "MKAL",
+                                              url_base=self.url, cache=cache))
+            self.assertEqual(3, len(self.server.requests))
+            # but another one is not
+            self.check_results(NCBIWWW.qblast("blastp", "nr", "MKAL",
+                                              url_base=self.url, cache=cache,
+                                              expect=1e-5))
+            self.assertEqual(6, len(self.server.requests))
+            self.assertEqual(2, len(os.listdir(cache)))
+        finally:
+            shutil.rmtree(cache)
+
+    def test_transport(self):
+        "Test qblast with a transport function"
+        urls = []
+
+        def transport(url, message):
+            urls.append(url)
+            return urllib2.urlopen(self.url, message)
+
+        self.check_results(NCBIWWW.qblast("blastp", "nr", "MKAL",
+                                          url_base="local", transport=transport))
+        self.assertEqual(["local"] * 3, urls)
+
+    def test_error(self):
+        "Test qblast with an error page"
+        def transport(url, message):
+            from StringIO import StringIO
+            return StringIO('<p class="error">Query contains no data</p>')
+
+        self.assertRaises(ValueError, NCBIWWW.qblast, "blastp", "nr", "",
+                          transport=transport)
+
+    def test_batch(self):
+        "Test qblast_batch with at most two searches running"
+        sequences = ["MKAL", "MKAV", "MKAI", "MKAF", "MKAW"]
+        handles = NCBIWWW.qblast_batch("blastp", "nr", sequences,
+                                       max_running=2, url_base=self.url)
+        self.assertEqual(5, len(handles))
+        for handle in handles:
+            self.check_results(handle)
+        self.assertEqual(15, len(self.server.requests))
+        self.assertTrue(self.server.max_running <= 2)
+        self.assertEqual(sorted(sequences), sorted(query['QUERY'][0] for
+                         query in self.server.requests if 'QUERY' in query))
+
+    def test_batch_cache(self):
+        "Test qblast_batch with the same sequence several times and a cache"
+        cache = tempfile.mkdtemp()
+        try:
+            handles = NCBIWWW.qblast_batch("blastp", "nr", ["MKAL"] * 3,
+                                           url_base=self.url, cache=cache)
+            self.assertEqual(3, len(handles))
+            for handle in handles:
+                self.check_results(handle)
+            # searched once, leaving only the cache file
+            self.assertEqual(3, len(self.server.requests))
+            self.assertEqual(1, len(os.listdir(cache)))
+        finally:
+            shutil.rmtree(cache)
+
+    def test_cache_write(self):
+        "Test writing the same cache file from several threads"
+        cache = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(cache, "results")
+            threads = [threading.Thread(target=NCBIWWW._cache_write,
+                                        args=(filename, "results\n"))
+                       for i in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(["results"], os.listdir(cache))
+            self.assertEqual("results\n", open(filename).read())
+        finally:
+            shutil.rmtree(cache)
+
+    def test_batch_error(self):
+        "Test qblast_batch with a failing search"
+        def transport(url, message):
+            if "QUERY=bad" in message:
+                raise IOError("bad query")
+            return urllib2.urlopen(self.url, message)
+
+        self.assertRaises(IOError, NCBIWWW.qblast_batch, "blastp", "nr",
+                          ["MKAL", "bad", "MKAV"], transport=transport)
+        self.assertRaises(ValueError, NCBIWWW.qblast_batch, "blastp", "nr",
+                          ["MKAL"], max_running=0)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
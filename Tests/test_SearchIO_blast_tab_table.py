@@ -0,0 +1,192 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO read_table with the BLAST tabular format."""
+
+# For using with statement in Python 2.5 or Jython
+from __future__ import with_statement
+
+import os
+import unittest
+from StringIO import StringIO
+
+from Bio.SearchIO import parse, read_table, top_hits
+
+# test case files are in the Blast directory
+TEST_DIR = 'Blast'
+FMT = 'blast-tab'
+
+
+def get_file(filename):
+    """Returns the path of a test file."""
+    return os.path.join(TEST_DIR, filename)
+
+
+def hsp_rows(qresults):
+    """Returns (query id, hit id, evalue, bitscore) of each HSP."""
+    rows = []
+    for qresult in qresults:
+        for hit in qresult:
+            for hsp in hit:
+                rows.append((qresult.id, hit.id, hsp.evalue, hsp.bitscore))
+    return rows
+
+
+def table_rows(tables):
+    """Returns (query id, hit id, evalue, bitscore) of each table row."""
+    rows = []
+    for table in tables:
+        rows.extend(zip(table['qseqid'], table['sseqid'], table['evalue'],
+            table['bitscore']))
+    return rows
+
+
+class BlastTabTableCases(unittest.TestCase):
+
+    def check_parse(self, filename, **kwargs):
+        """Checks read_table gives the same rows as parse."""
+        tab_file = get_file(filename)
+        expected = hsp_rows(parse(tab_file, FMT, **kwargs))
+        self.assertEqual(expected, table_rows(read_table(tab_file, FMT,
+            **kwargs)))
+        # and the same again when split into small tables
+        self.assertEqual(expected, table_rows(read_table(tab_file, FMT,
+            chunk_size=2, **kwargs)))
+
+    def test_tab_2226_tblastn_001(self):
+        "Test read_table on TBLASTN 2.2.26+ tabular output (tab_2226_tblastn_001)"
+        self.check_parse('tab_2226_tblastn_001.txt')
+
+    def test_tab_2226_tblastn_004(self):
+        "Test read_table on TBLASTN 2.2.26+ tabular output (tab_2226_tblastn_004)"
+        self.check_parse('tab_2226_tblastn_004.txt')
+
+    def test_tab_2226_tblastn_008(self):
+        "Test read_table on TBLASTN 2.2.26+ commented tabular output (tab_2226_tblastn_008)"
+        self.check_parse('tab_2226_tblastn_008.txt', comments=True)
+
+    def test_tab_2226_tblastn_002(self):
+        "Test read_table on TBLASTN 2.2.26+ tabular output without hits (tab_2226_tblastn_002)"
+        self.assertEqual([], list(read_table(get_file('tab_2226_tblastn_002.txt'),
+            FMT)))
+
+    def test_mirna(self):
+        "Test read_table on BLASTN 2.2.26+ commented tabular output (mirna)"
+        self.check_parse('mirna.tab', comments=True)
+
+    def test_column_types(self):
+        "Test read_table column types"
+        table = read_table(get_file('tab_2226_tblastn_004.txt'), FMT).next()
+        self.assertEqual(['qseqid', 'sseqid', 'pident', 'length', 'mismatch',
+            'gapopen', 'qstart', 'qend', 'sstart', 'send', 'evalue',
+            'bitscore'], table.fields)
+        self.assertEqual(list, type(table['qseqid']))
+        self.assertEqual('d', table['evalue'].typecode)
+        self.assertEqual('l', table['qstart'].typecode)
+        self.assertEqual([1, 30], list(table['qstart'][:2]))
+        self.assertEqual([98, 96], list(table['qend'][:2]))
+        self.assertTrue('evalue' in table)
+        self.assertFalse('qseq' in table)
+        self.assertRaises(KeyError, table.__getitem__, 'qseq')
+
+    def test_columns(self):
+        "Test read_table with selected columns"
+        tables = list(read_table(get_file('tab_2226_tblastn_004.txt'), FMT,
+            columns=['sseqid', 'evalue']))
+        self.assertEqual(1, len(tables))
+        self.assertEqual(['sseqid', 'evalue'], tables[0].fields)
+        self.assertEqual(('gi|350596019|ref|XM_003360601.2|', 2e-67),
+                tables[0].rows().next())
+        self.assertFalse('qseqid' in tables[0])
+
+    def test_unknown_column(self):
+        "Test read_table with a column not in the fields"
+        tables = read_table(get_file('tab_2226_tblastn_004.txt'), FMT,
+            columns=['qseq'])
+        self.assertRaises(ValueError, tables.next)
+
+    def test_filters(self):
+        "Test read_table with evalue and identity filters"
+        tab_file = get_file('mirna.tab')
+        expected = [(qresult.id, hit.id, hsp.evalue, hsp.bitscore)
+                for qresult in parse(tab_file, FMT, comments=True)
+                for hit in qresult for hsp in hit
+                if hsp.evalue <= 1e-5 and hsp.ident_pct >= 95]
+        self.assertTrue(expected)
+        tables = read_table(tab_file, FMT, comments=True, max_evalue=1e-5,
+                min_ident_pct=95, chunk_size=10)
+        self.assertEqual(expected, table_rows(tables))
+
+    def test_top_hits(self):
+        "Test read_table keeping the best hits of each query"
+        for filename, comments in (('mirna.tab', True),
+                ('tab_2226_tblastn_004.txt', False)):
+            tab_file = get_file(filename)
+            for n in (1, 2, 5):
+                expected = hsp_rows(top_hits(parse(tab_file, FMT,
+                    comments=comments), n))
+                self.assertTrue(expected)
+                tables = read_table(tab_file, FMT, comments=comments,
+                        top_hits=n, chunk_size=3)
+                self.assertEqual(expected, table_rows(tables))
+        # the filters are applied first
+        tab_file = get_file('mirna.tab')
+        expected = [row for row in hsp_rows(parse(tab_file, FMT,
+            comments=True)) if row[2] <= 1e-22]
+        self.assertEqual(expected, table_rows(read_table(tab_file, FMT,
+            comments=True, max_evalue=1e-22, top_hits=2)))
+
+    def test_top_hits_errors(self):
+        "Test read_table top_hits with bad arguments"
+        self.assertRaises(ValueError, read_table(get_file('mirna.tab'), FMT,
+            comments=True, top_hits=0).next)
+        handle = StringIO("query1\thit1\t1e-5\n")
+        tables = read_table(handle, FMT, fields=['qseqid', 'sseqid',
+            'evalue'], top_hits=1)
+        self.assertRaises(ValueError, tables.next)
+
+    def test_filter_missing_field(self):
+        "Test read_table with a filter on a field not in the file"
+        handle = StringIO("query1\thit1\n")
+        tables = read_table(handle, FMT, fields=['qseqid', 'sseqid'],
+                max_evalue=1e-5)
+        self.assertRaises(ValueError, tables.next)
+
+    def test_chunk_size(self):
+        "Test read_table chunk sizes"
+        tables = list(read_table(get_file('mirna.tab'), FMT, comments=True,
+            chunk_size=100))
+        self.assertEqual([100, 100, 77], [len(table) for table in tables])
+        self.assertRaises(ValueError, read_table(get_file('mirna.tab'), FMT,
+            chunk_size=0).next)
+
+    def test_bad_row(self):
+        "Test read_table with a row of the wrong length"
+        handle = StringIO("query1\thit1\t1e-5\nquery1\thit2\n")
+        tables = read_table(handle, FMT, fields=['qseqid', 'sseqid',
+            'evalue'])
+        self.assertRaises(ValueError, tables.next)
+
+    def test_lazy_objects(self):
+        "Test read_table creating HSP and QueryResult objects"
+        tab_file = get_file('tab_2226_tblastn_004.txt')
+        expected = list(parse(tab_file, FMT))
+        table = read_table(tab_file, FMT, max_evalue=1e-60).next()
+        self.assertEqual(4, len(table))
+        qresults = list(table.qresults())
+        self.assertEqual(1, len(qresults))
+        self.assertEqual(expected[0].id, qresults[0].id)
+        self.assertEqual(4, len(qresults[0].hsps))
+        hsp = table.hsp(1)
+        self.assertEqual(table['sseqid'][1], hsp.hit_id)
+        self.assertEqual(table['evalue'][1], hsp.evalue)
+        self.assertEqual(table['bitscore'][1], hsp.bitscore)
+        self.assertEqual(table['sstart'][1] - 1, hsp.hit_start)
+        self.assertEqual(table['send'][1], hsp.hit_end)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
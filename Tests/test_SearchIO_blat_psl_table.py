@@ -0,0 +1,237 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO read_table with the BLAT PSL format."""
+
+import os
+import unittest
+from StringIO import StringIO
+
+from Bio.SearchIO import parse, read_table, top_hits
+from Bio.SearchIO import BlatIO
+
+# test case files are in the Blat directory
+TEST_DIR = 'Blat'
+
+# made up rows: plus strand DNA, minus strand DNA, and a protein query
+# against the minus strand of the hit
+ROWS = """\
+90\t5\t0\t0\t1\t3\t1\t2\t+\tq1\t200\t10\t110\tchr1\t1000\t100\t202\t2\t50,45,\t10,65,\t100,157,
+40\t0\t0\t0\t0\t0\t0\t0\t-\tq1\t200\t20\t60\tchr2\t500\t300\t340\t1\t40,\t140,\t300,
+28\t2\t0\t0\t0\t0\t0\t0\t+-\tq2\t100\t0\t30\tchr3\t1000\t710\t800\t1\t30,\t0,\t200,
+"""
+
+
+def get_file(filename):
+    """Returns the path of a test file."""
+    return os.path.join(TEST_DIR, filename)
+
+
+def hsp_rows(qresults):
+    """Returns (query id, hit id, score, identity, block starts) of each HSP,
+    sorted."""
+    rows = []
+    for qresult in qresults:
+        for hit in qresult:
+            for hsp in hit:
+                rows.append((qresult.id, hit.id, hsp.score, hsp.ident_pct,
+                    [frag.query_start for frag in hsp],
+                    [frag.hit_start for frag in hsp]))
+    return sorted(rows)
+
+
+def table_rows(tables):
+    """Returns (query id, hit id, score, identity, block starts) of each row,
+    sorted."""
+    rows = []
+    for table in tables:
+        offsets = table.block_offsets
+        qstarts = table.block_starts('query')
+        hstarts = table.block_starts('hit')
+        for i, row in enumerate(zip(table['qname'], table['tname'],
+                table.score(), table.ident_pct())):
+            start, end = offsets[i], offsets[i + 1]
+            rows.append(row + (list(qstarts[start:end]),
+                list(hstarts[start:end])))
+    return sorted(rows)
+
+
+def data_lines(filename):
+    """Returns the rows of a PSL file, without the header."""
+    return [line.rstrip() for line in open(filename) if line[:1].isdigit()]
+
+
+class BlatPslTableCases(unittest.TestCase):
+
+    def check_parse(self, filename, pslx=False):
+        """Checks read_table gives the same rows as parse."""
+        psl_file = get_file(filename)
+        expected = hsp_rows(parse(psl_file, 'blat-psl', pslx=pslx))
+        self.assertTrue(expected)
+        self.assertEqual(expected, table_rows(read_table(psl_file,
+            'blat-psl', pslx=pslx)))
+        # and the same again when split into small tables
+        self.assertEqual(expected, table_rows(read_table(psl_file,
+            'blat-psl', pslx=pslx, chunk_size=2)))
+        # and without NumPy
+        numpy = BlatIO.numpy
+        BlatIO.numpy = None
+        try:
+            self.assertEqual(expected, table_rows(read_table(psl_file,
+                'blat-psl', pslx=pslx, chunk_size=2)))
+        finally:
+            BlatIO.numpy = numpy
+
+    def test_psl_34_001(self):
+        "Test read_table on BLAT PSL output (psl_34_001.psl)"
+        self.check_parse('psl_34_001.psl')
+
+    def test_psl_34_002(self):
+        "Test read_table on BLAT PSL output (psl_34_002.psl)"
+        self.assertEqual([], list(read_table(get_file('psl_34_002.psl'),
+            'blat-psl')))
+
+    def test_psl_34_004(self):
+        "Test read_table on BLAT PSL output (psl_34_004.psl)"
+        self.check_parse('psl_34_004.psl')
+
+    def test_pslx_34_001(self):
+        "Test read_table on BLAT PSLX output (pslx_34_001.pslx)"
+        self.check_parse('pslx_34_001.pslx', pslx=True)
+
+    def test_top_hits(self):
+        "Test read_table PSL keeping the best hits of each query"
+        key = lambda hit: max(hsp.score for hsp in hit)
+        for filename, pslx in (('psl_34_004.psl', False),
+                ('pslx_34_004.pslx', True), ('psl_34_001.psl', False)):
+            psl_file = get_file(filename)
+            for n in (1, 3):
+                qresults = top_hits(parse(psl_file, 'blat-psl', pslx=pslx),
+                        n, key=key)
+                expected = [(qresult.id, [(hit.id, [hsp.score for hsp in
+                    hit]) for hit in qresult]) for qresult in qresults]
+                tables = read_table(psl_file, 'blat-psl', pslx=pslx,
+                        top_hits=n, chunk_size=2)
+                rows = [(qname, tname, score) for table in tables for
+                        qname, tname, score in zip(table['qname'],
+                            table['tname'], table.score())]
+                # the rows of each hit are together, best hit first
+                found = []
+                for qname, tname, score in rows:
+                    if not found or found[-1][0] != qname:
+                        found.append((qname, []))
+                    hits = found[-1][1]
+                    if not hits or hits[-1][0] != tname:
+                        hits.append((tname, []))
+                    hits[-1][1].append(score)
+                self.assertEqual(expected, found)
+
+    def test_columns(self):
+        "Test read_table PSL column types and blocks"
+        table = read_table(get_file('pslx_34_004.pslx'), 'blat-psl',
+                pslx=True).next()
+        self.assertEqual(BlatIO._PSLX_FIELDS, table.fields)
+        self.assertEqual(19, len(table))
+        self.assertEqual('l', table['matches'].typecode)
+        self.assertEqual('l', table['blocksizes'].typecode)
+        self.assertEqual(list, type(table['qname']))
+        self.assertEqual(list, type(table['tseqs']))
+        self.assertEqual(sum(table['blockcount']), len(table['blocksizes']))
+        self.assertEqual(len(table['blocksizes']), table.block_offsets[-1])
+        # the fourth row has two blocks
+        self.assertEqual('chr2', table['tname'][3])
+        self.assertEqual([6, 38], list(table.blocks('blocksizes', 3)))
+        self.assertEqual(['aaaaat', 'aaaggggctgggcgtggtggctcacacctgtaatccca'],
+                table.blocks('qseqs', 3))
+        self.assertRaises(ValueError, table.blocks, 'tname', 3)
+        row = list(table.rows())[3]
+        self.assertEqual('chr2', row[13])
+        self.assertEqual([6, 38], list(row[18]))
+
+    def test_select_columns(self):
+        "Test read_table PSL with some of the columns"
+        table = read_table(get_file('psl_34_004.psl'), 'blat-psl',
+                columns=['qname', 'tname', 'tstarts']).next()
+        self.assertEqual(['qname', 'tname', 'tstarts'], table.fields)
+        self.assertEqual(('hg19_dna', 'chr9'), list(table.rows())[0][:2])
+        self.assertEqual([85737865], list(list(table.rows())[0][2]))
+        self.assertRaises(ValueError, table.write, StringIO())
+
+    def test_made_up_rows(self):
+        "Test read_table PSL identity, score and coverage"
+        for numpy in (BlatIO.numpy, None):
+            old_numpy = BlatIO.numpy
+            BlatIO.numpy = numpy
+            try:
+                table = read_table(StringIO(ROWS), 'blat-psl').next()
+                self.assertEqual([0, 0, 1], list(table.is_protein()))
+                self.assertEqual([83, 40, 78], list(table.score()))
+                pcts = table.ident_pct()
+                self.assertAlmostEqual(100 - 600 / 95.0, pcts[0])
+                self.assertAlmostEqual(100.0, pcts[1])
+                self.assertAlmostEqual(100 - 600 / 90.0, pcts[2])
+                self.assertEqual([95 / 200.0, 40 / 200.0, 30 / 100.0],
+                        list(table.query_coverage()))
+                self.assertEqual([95 / 1000.0, 40 / 500.0, 90 / 1000.0],
+                        list(table.hit_coverage()))
+                # minus strand DNA queries are reoriented, protein ones not
+                self.assertEqual([10, 65, 20, 0],
+                        list(table.block_starts('query')))
+                self.assertEqual([100, 157, 300, 770],
+                        list(table.block_starts('hit')))
+                self.assertRaises(ValueError, table.block_starts, 'target')
+            finally:
+                BlatIO.numpy = old_numpy
+
+    def test_take(self):
+        "Test read_table PSL take"
+        table = read_table(StringIO(ROWS), 'blat-psl').next()
+        kept = table.take([2, 0])
+        self.assertEqual(['q2', 'q1'], kept['qname'])
+        self.assertEqual([0, 1, 3], list(kept.block_offsets))
+        self.assertEqual([30, 50, 45], list(kept['blocksizes']))
+        self.assertEqual('l', kept['qstarts'].typecode)
+        self.assertEqual([0, 10, 65], list(kept['qstarts']))
+        self.assertEqual([78, 83], list(kept.score()))
+        self.assertEqual(['q1'], [qresult.id for qresult in
+            kept.take([1]).qresults()])
+
+    def test_write(self):
+        "Test writing read_table PSL(X) tables"
+        for filename, pslx in (('psl_34_004.psl', False),
+                ('pslx_34_004.pslx', True), ('mirna.pslx', True)):
+            psl_file = get_file(filename)
+            handle = StringIO()
+            count = 0
+            for table in read_table(psl_file, 'blat-psl', pslx=pslx,
+                    chunk_size=5):
+                count += table.write(handle)
+            self.assertEqual(data_lines(psl_file),
+                    handle.getvalue().splitlines())
+            self.assertEqual(len(data_lines(psl_file)), count)
+
+    def test_write_changed(self):
+        "Test writing a read_table PSL table after changing coordinates"
+        table = read_table(StringIO(ROWS), 'blat-psl').next()
+        for column in (table['tstart'], table['tend'], table['tstarts']):
+            for i in range(len(column)):
+                column[i] += 1000
+        handle = StringIO()
+        self.assertEqual(3, table.write(handle, header=True))
+        handle.seek(0)
+        table = read_table(handle, 'blat-psl').next()
+        self.assertEqual([1100, 1300, 1710], list(table['tstart']))
+        self.assertEqual([1100, 1157, 1300, 1200], list(table['tstarts']))
+        # the written rows can be parsed
+        qresult = parse(StringIO(ROWS.split('\n', 1)[0]), 'blat-psl').next()
+        handle.seek(0)
+        moved = parse(handle, 'blat-psl').next()
+        self.assertEqual([start + 1000 for start in
+            qresult[0][0].hit_start_all], moved[0][0].hit_start_all)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -0,0 +1,204 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO read_table with the HMMER3 domain table formats."""
+
+import os
+import unittest
+from StringIO import StringIO
+
+from Bio.SearchIO import parse, read_table, top_hits
+from Bio.SearchIO.HmmerIO import hmmer3_domtab
+
+# test case files are in the Hmmer directory
+TEST_DIR = 'Hmmer'
+
+# made up hmmscan domains of two sequences, with overlaps
+OVERLAPS = """\
+# made up rows, only the coordinates and scores matter
+PF1 - 100 seq1 - 300 1e-10 50.0 0.1 1 1 1e-10 1e-10 50.0 0.1 1 100 1 100 1 100 0.9 first
+PF2 - 100 seq1 - 300 1e-10 40.0 0.1 1 1 1e-10 1e-10 40.0 0.1 1 100 91 190 91 195 0.9 second
+PF3 - 100 seq1 - 300 1e-10 45.0 0.1 1 1 1e-10 1e-10 45.0 0.1 1 50 150 199 150 199 0.9 third
+PF4 - 100 seq1 - 300 1e-10 30.0 0.1 1 1 1e-10 1e-10 30.0 0.1 1 100 201 300 195 300 0.9 fourth
+PF1 - 100 seq2 - 150 1e-10 20.0 0.1 1 1 1e-10 1e-10 20.0 0.1 1 100 1 100 1 100 0.9 first
+PF2 - 100 seq2 - 150 1e-10 25.0 0.1 1 1 1e-10 1e-10 25.0 0.1 1 100 51 150 51 150 0.9 second
+"""
+
+
+def get_file(filename):
+    """Returns the path of a test file."""
+    return os.path.join(TEST_DIR, filename)
+
+
+def hsp_rows(qresults):
+    """Returns (query id, hit id, evalue, bitscore, hit start) of each HSP."""
+    rows = []
+    for qresult in qresults:
+        for hit in qresult:
+            for hsp in hit:
+                rows.append((qresult.id, hit.id, hsp.evalue, hsp.bitscore,
+                    hsp.hit_start))
+    return rows
+
+
+def table_rows(tables, hmm_as_hit):
+    """Returns (query id, hit id, evalue, bitscore, hit start) of each row."""
+    if hmm_as_hit:
+        hit_start = 'hmm_from'
+    else:
+        hit_start = 'ali_from'
+    rows = []
+    for table in tables:
+        rows.extend((qid, hid, evalue, score, start - 1) for qid, hid,
+                evalue, score, start in zip(table['query_name'],
+                    table['target_name'], table['i_evalue'],
+                    table['domain_score'], table[hit_start]))
+    return rows
+
+
+class DomtabTableCases(unittest.TestCase):
+
+    def check_parse(self, filename, fmt, **kwargs):
+        """Checks read_table gives the same rows as parse."""
+        domtab_file = get_file(filename)
+        hmm_as_hit = fmt == 'hmmscan3-domtab'
+        expected = hsp_rows(parse(domtab_file, fmt))
+        self.assertTrue(expected)
+        self.assertEqual(expected, table_rows(read_table(domtab_file, fmt),
+            hmm_as_hit))
+        # and the same again when split into small tables
+        self.assertEqual(expected, table_rows(read_table(domtab_file, fmt,
+            chunk_size=2), hmm_as_hit))
+
+    def test_domtab_30_hmmscan_001(self):
+        "Test read_table on hmmscan domain table output (domtab_30_hmmscan_001)"
+        self.check_parse('domtab_30_hmmscan_001.out', 'hmmscan3-domtab')
+
+    def test_domtab_30_hmmscan_002(self):
+        "Test read_table on hmmscan domain table output (domtab_30_hmmscan_002)"
+        self.assertEqual([], list(read_table(
+            get_file('domtab_30_hmmscan_002.out'), 'hmmscan3-domtab')))
+
+    def test_domtab_30_hmmscan_003(self):
+        "Test read_table on hmmscan domain table output (domtab_30_hmmscan_003)"
+        self.check_parse('domtab_30_hmmscan_003.out', 'hmmscan3-domtab')
+
+    def test_domtab_30_hmmscan_004(self):
+        "Test read_table on hmmscan domain table output (domtab_30_hmmscan_004)"
+        self.check_parse('domtab_30_hmmscan_004.out', 'hmmscan3-domtab')
+
+    def test_domtab_30_hmmsearch_001(self):
+        "Test read_table on hmmsearch domain table output (domtab_30_hmmsearch_001)"
+        self.check_parse('domtab_30_hmmsearch_001.out', 'hmmsearch3-domtab')
+
+    def test_column_types(self):
+        "Test read_table domain table column types"
+        table = read_table(get_file('domtab_30_hmmscan_001.out'),
+                'hmmscan3-domtab').next()
+        self.assertEqual(hmmer3_domtab._DOMTAB_FIELDS, table.fields)
+        self.assertEqual(list, type(table['target_name']))
+        self.assertEqual('l', table['hmm_from'].typecode)
+        self.assertEqual('d', table['i_evalue'].typecode)
+        self.assertEqual('Globin', table['target_name'][0])
+        self.assertEqual(154, table['qlen'][0])
+        self.assertEqual(9.2e-21, table['i_evalue'][0])
+        self.assertEqual('Globin', table['description'][0])
+        self.assertEqual('Immunoglobulin domain', table['description'][1])
+
+    def test_filters(self):
+        "Test read_table on a domain table with evalue and bitscore filters"
+        domtab_file = get_file('domtab_30_hmmscan_001.out')
+        expected = [row for row in hsp_rows(parse(domtab_file,
+            'hmmscan3-domtab')) if row[2] <= 1e-5 and row[3] >= 20]
+        self.assertTrue(expected)
+        tables = read_table(domtab_file, 'hmmscan3-domtab', max_evalue=1e-5,
+                min_bitscore=20, chunk_size=3)
+        self.assertEqual(expected, table_rows(tables, True))
+
+    def test_top_hits(self):
+        "Test read_table on a domain table keeping the best targets"
+        for filename, fmt in (('domtab_30_hmmscan_001.out', 'hmmscan3-domtab'),
+                ('domtab_30_hmmsearch_001.out', 'hmmsearch3-domtab')):
+            domtab_file = get_file(filename)
+            hmm_as_hit = fmt == 'hmmscan3-domtab'
+            for n in (1, 2):
+                expected = hsp_rows(top_hits(parse(domtab_file, fmt), n))
+                self.assertTrue(expected)
+                self.assertEqual(expected, table_rows(read_table(domtab_file,
+                    fmt, top_hits=n, chunk_size=2), hmm_as_hit))
+        # a target with two domains, scored by its best one
+        table = read_table(StringIO(OVERLAPS), 'hmmscan3-domtab',
+                top_hits=1).next()
+        self.assertEqual(['PF1', 'PF2'], table['target_name'])
+        self.assertEqual(['seq1', 'seq2'], table['query_name'])
+
+    def test_coverage(self):
+        "Test domain table coverage"
+        table = read_table(StringIO(OVERLAPS), 'hmmscan3-domtab').next()
+        self.assertEqual([1.0, 1.0, 0.5, 1.0, 1.0, 1.0],
+                list(table.hmm_coverage()))
+        self.assertEqual([100 / 300.0, 100 / 300.0, 50 / 300.0, 100 / 300.0,
+            100 / 150.0, 100 / 150.0], list(table.seq_coverage()))
+        # hmmsearch, the HMM is the query and the sequence the target
+        table = read_table(StringIO(OVERLAPS), 'hmmsearch3-domtab').next()
+        self.assertEqual([100 / 300.0, 100 / 300.0, 50 / 300.0, 100 / 300.0,
+            100 / 150.0, 100 / 150.0], list(table.hmm_coverage()))
+        self.assertEqual([1.0, 1.0, 0.5, 1.0, 1.0, 1.0],
+                list(table.seq_coverage()))
+
+    def check_resolve_overlaps(self):
+        """Checks resolve_overlaps on the made up domains."""
+        table = read_table(StringIO(OVERLAPS), 'hmmscan3-domtab').next()
+        self.assertEqual([0, 2, 3, 5], table.resolve_overlaps())
+        self.assertEqual([0, 1, 2, 3, 4, 5],
+                table.resolve_overlaps(max_overlap=50))
+        self.assertEqual([0, 2, 5], table.resolve_overlaps(env=True))
+        # ties are taken in table order
+        self.assertEqual([0, 2, 3, 4], table.resolve_overlaps(
+            score_field='hmm_to'))
+        kept = table.take(table.resolve_overlaps())
+        self.assertEqual(4, len(kept))
+        self.assertEqual(['PF1', 'PF3', 'PF4', 'PF2'], kept['target_name'])
+        self.assertEqual('l', kept['ali_from'].typecode)
+        self.assertEqual([1, 150, 201, 51], list(kept['ali_from']))
+        self.assertEqual(['seq1', 'seq2'], [qresult.id for qresult in
+            kept.qresults()])
+
+    def test_resolve_overlaps(self):
+        "Test domain table resolve_overlaps"
+        self.check_resolve_overlaps()
+
+    def test_resolve_overlaps_pure_python(self):
+        "Test domain table resolve_overlaps without NumPy"
+        numpy = hmmer3_domtab.numpy
+        hmmer3_domtab.numpy = None
+        try:
+            self.check_resolve_overlaps()
+        finally:
+            hmmer3_domtab.numpy = numpy
+
+    def test_resolve_overlaps_file(self):
+        "Test domain table resolve_overlaps on hmmscan output"
+        table = read_table(get_file('domtab_30_hmmscan_001.out'),
+                'hmmscan3-domtab').next()
+        kept = table.resolve_overlaps()
+        numpy = hmmer3_domtab.numpy
+        hmmer3_domtab.numpy = None
+        try:
+            self.assertEqual(kept, table.resolve_overlaps())
+        finally:
+            hmmer3_domtab.numpy = numpy
+        # no two kept domains of a sequence overlap
+        for i in kept:
+            for j in kept:
+                if i < j and table['query_name'][i] == \
+                        table['query_name'][j]:
+                    self.assertTrue(table['ali_to'][i] < table['ali_from'][j]
+                            or table['ali_to'][j] < table['ali_from'][i])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -11,6 +11,7 @@ to all formats.
 
 """
 
+import pickle
 import unittest
 from copy import deepcopy
 
@@ -680,6 +681,7 @@ class HitCases(unittest.TestCase):
         """Test Hit.__getitem__, multiple items"""
         # getitem using slices should return another hit object
         # with the hsps sliced accordingly, but other attributes preserved
+        self.hit.seq_len = 100
         new_hit = self.hit[:2]
         self.assertEqual(2, len(new_hit))
         self.assertEqual([hsp111, hsp112], new_hit.hsps)
@@ -687,6 +689,7 @@ class HitCases(unittest.TestCase):
         self.assertEqual(self.hit.query_id, new_hit.query_id)
         self.assertEqual(5e-10, new_hit.evalue)
         self.assertEqual('test', new_hit.name)
+        self.assertEqual(100, new_hit.seq_len)
 
     def test_delitem(self):
         """Test Hit.__delitem__"""
@@ -980,6 +983,28 @@ class HSPMultipleFragmentCases(unittest.TestCase):
         self.assertTrue(self.frag1 is self.hsp[0])
         self.assertTrue(self.frag2 is self.hsp[1])
 
+    def test_getitem_slice_attrs(self):
+        """Test HSP.__getitem__, slice with attributes"""
+        # attributes kept in slots and in __dict__ are both preserved
+        self.hsp.evalue = 1e-5
+        self.hsp.domain_index = 3
+        new_hsp = self.hsp[1:]
+        self.assertEqual([self.frag2], new_hsp.fragments)
+        self.assertEqual(1e-5, new_hsp.evalue)
+        self.assertEqual(3, new_hsp.domain_index)
+        self.assertFalse(hasattr(new_hsp, 'bitscore'))
+
+    def test_pickle(self):
+        """Test pickling HSP objects"""
+        self.hsp.evalue = 1e-5
+        self.hsp.domain_index = 3
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            hsp = pickle.loads(pickle.dumps(self.hsp, protocol))
+            self.assertEqual(1e-5, hsp.evalue)
+            self.assertEqual(3, hsp.domain_index)
+            self.assertEqual([(15, 20), (158, 161)], hsp.hit_range_all)
+            self.assertEqual('AT-ACT', str(hsp[0].query.seq))
+
     def test_setitem_single(self):
         """Test HSP.__setitem___, single item"""
         frag3 = HSPFragment('hit_id', 'query_id', 'AAA', 'AAT')
@@ -1217,6 +1242,27 @@ class HSPFragmentCases(unittest.TestCase):
         self.assertTrue(self.fragment.hit.seq.alphabet is generic_dna)
         self.assertTrue(self.fragment.query.seq.alphabet is generic_dna)
 
+    def test_lazy_seq(self):
+        """Test HSPFragment string sequences made into SeqRecord when used"""
+        # strings are kept as they are until the sequence is accessed
+        self.assertEqual('ATG--AGCTAGG', self.fragment._query)
+        self.assertEqual('ATGCTAGCTACA', self.fragment._hit)
+        self.assertEqual(12, len(self.fragment))
+        # values set before then are used
+        self.fragment.alphabet = generic_dna
+        self.fragment.query_id = 'new_query_id'
+        self.fragment.hit_description = 'new hit description'
+        self.assertEqual('ATG--AGCTAGG', self.fragment._query)
+        self.assertTrue(isinstance(self.fragment.query, SeqRecord))
+        self.assertEqual('new_query_id', self.fragment.query.id)
+        self.assertTrue(self.fragment.query.seq.alphabet is generic_dna)
+        self.assertEqual('ATGCTAGCTACA', self.fragment._hit)
+        self.assertEqual('new hit description', self.fragment.aln[1].description)
+        self.assertTrue(isinstance(self.fragment._hit, SeqRecord))
+        # and values set later are passed on to the SeqRecord
+        self.fragment.hit_id = 'new_hit_id'
+        self.assertEqual('new_hit_id', self.fragment.hit.id)
+
     def test_seq_unequal_hit_query_len(self):
         """Test HSPFragment sequence setter with unequal hit and query lengths"""
         for seq_type in ('hit', 'query'):
@@ -1247,6 +1293,20 @@ class HSPFragmentCases(unittest.TestCase):
         self.assertEqual('ATGCT', str(sliced_fragment.hit.seq))
         self.assertEqual('ATG--', str(sliced_fragment.query.seq))
 
+    def test_getitem_lazy_seq(self):
+        """Test HSPFragment.__getitem__, with string sequences"""
+        # sequences still stored as strings are sliced without making
+        # SeqRecord objects, in the original or the sliced fragment
+        self.fragment.query_id = 'new_query_id'
+        sliced_fragment = self.fragment[2:7]
+        self.assertEqual('ATG--AGCTAGG', self.fragment._query)
+        self.assertEqual('ATGCTAGCTACA', self.fragment._hit)
+        self.assertEqual('G--AG', sliced_fragment._query)
+        self.assertEqual('GCTAG', sliced_fragment._hit)
+        self.assertEqual(5, len(sliced_fragment))
+        self.assertEqual('new_query_id', sliced_fragment.query.id)
+        self.assertEqual('G--AG', str(sliced_fragment.query.seq))
+
     def test_getitem_attrs(self):
         """Test HSPFragment.__getitem__, with attributes"""
         # attributes from the original instance should not be present in the new
@@ -1276,6 +1336,39 @@ class HSPFragmentCases(unittest.TestCase):
         new_hsp = self.fragment[:5]
         self.assertEqual('18271', new_hsp.aln_annotation['test'])
 
+    def test_slots(self):
+        """Test HSPFragment attributes kept in slots"""
+        fragment = HSPFragment('hit_id', 'query_id')
+        fragment.hit_start = 5
+        fragment.hit_strand = -1
+        # the annotation and features are only created when used
+        self.assertTrue(fragment._aln_annotation is None)
+        self.assertTrue(fragment._hit_features is None)
+        fragment.aln_annotation['homology'] = '|||'
+        self.assertEqual({'homology': '|||'}, fragment.aln_annotation)
+        self.assertEqual([], fragment.hit_features)
+        self.assertTrue(fragment.hit_features is fragment.hit_features)
+        self.assertEqual(0, len(fragment.__dict__))
+        # other attributes still work
+        fragment.attr_original = 1000
+        self.assertEqual({'attr_original': 1000}, fragment.__dict__)
+
+    def test_pickle(self):
+        """Test pickling HSPFragment objects"""
+        self.fragment.hit_start = 5
+        self.fragment.hit_end = 17
+        self.fragment.aln_annotation['homology'] = '|||  |||||  '
+        self.fragment.attr_original = 1000
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            fragment = pickle.loads(pickle.dumps(self.fragment, protocol))
+            self.assertEqual((5, 17), fragment.hit_range)
+            self.assertEqual('|||  |||||  ', fragment.aln_annotation['homology'])
+            self.assertEqual(1000, fragment.attr_original)
+            self.assertEqual('ATG--AGCTAGG', str(fragment.query.seq))
+        fragment = deepcopy(self.fragment)
+        self.assertEqual((5, 17), fragment.hit_range)
+        self.assertEqual(1000, fragment.attr_original)
+
     def test_default_attrs(self):
         """Test HSPFragment attributes' default values"""
         fragment = HSPFragment()
@@ -0,0 +1,104 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO parse_parallel."""
+
+import os
+import pickle
+import sys
+import unittest
+
+try:
+    import multiprocessing
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError("Install Python 2.6 or later to use "
+                                       "SearchIO.parse_parallel.")
+
+from Bio.SearchIO import parse, parse_parallel
+
+
+def summary(qresult):
+    """Returns the query ID, number of hits and HSPs of a QueryResult."""
+    return qresult.id, len(qresult), len(qresult.hsps)
+
+
+class ParseParallelCases(unittest.TestCase):
+
+    def check_summary(self, filename, format, **kwargs):
+        """Checks parse_parallel gives the same summaries as parse."""
+        expected = [summary(qresult) for qresult in parse(filename, format,
+            **kwargs)]
+        self.assertTrue(expected)
+        for processes in (1, 2):
+            for batch_size in (1, 100):
+                results = list(parse_parallel(filename, format, summary,
+                    processes=processes, batch_size=batch_size, **kwargs))
+                self.assertEqual(expected, results)
+
+    def test_blast_xml(self):
+        "Test parse_parallel on BLAST XML output (wnts.xml)"
+        self.check_summary(os.path.join('Blast', 'wnts.xml'), 'blast-xml')
+
+    def test_blast_tab(self):
+        "Test parse_parallel on BLAST tabular output (mirna.tab)"
+        self.check_summary(os.path.join('Blast', 'mirna.tab'), 'blast-tab',
+                comments=True)
+
+    def test_hmmer3_text(self):
+        "Test parse_parallel on HMMER3 text output (text_30_hmmscan_001.out)"
+        self.check_summary(os.path.join('Hmmer', 'text_30_hmmscan_001.out'),
+                'hmmer3-text')
+
+    def test_hmmer3_domtab(self):
+        "Test parse_parallel on HMMER3 domain table output (domtab_30_hmmscan_001.out)"
+        self.check_summary(os.path.join('Hmmer', 'domtab_30_hmmscan_001.out'),
+                'hmmscan3-domtab')
+
+    def test_lambda(self):
+        "Test parse_parallel with a lambda function"
+        # the function is passed to the workers by the pool initializer, so
+        # it does not need to be picklable on platforms which fork
+        filename = os.path.join('Blast', 'mirna.xml')
+        if sys.platform == 'win32':
+            all_processes = (1,)
+        else:
+            all_processes = (1, 2)
+        for processes in all_processes:
+            results = list(parse_parallel(filename, 'blast-xml',
+                lambda qresult: qresult.id, processes=processes,
+                batch_size=1))
+            self.assertEqual(['33211', '33212', '33213'], results)
+
+    def test_qresults(self):
+        "Test parse_parallel without a function"
+        filename = os.path.join('Blast', 'mirna.xml')
+        expected = list(parse(filename, 'blast-xml'))
+        qresults = list(parse_parallel(filename, 'blast-xml', processes=2))
+        self.assertEqual(len(expected), len(qresults))
+        for exp, qresult in zip(expected, qresults):
+            self.assertEqual(exp.id, qresult.id)
+            self.assertEqual(exp.hit_keys, qresult.hit_keys)
+            self.assertEqual(exp[0][0].evalue, qresult[0][0].evalue)
+
+    def test_pickle(self):
+        "Test pickling a QueryResult"
+        qresult = parse(os.path.join('Blast', 'mirna.xml'),
+                'blast-xml').next()
+        other = pickle.loads(pickle.dumps(qresult, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(qresult.hit_keys, other.hit_keys)
+        self.assertEqual(str(qresult[0][0].query.seq),
+                str(other[0][0].query.seq))
+
+    def test_bad_batch_size(self):
+        "Test parse_parallel with a bad batch size"
+        self.assertRaises(ValueError, list,
+                parse_parallel(os.path.join('Blast', 'mirna.xml'), 'blast-xml',
+                    summary, batch_size=0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -0,0 +1,142 @@
+# Copyright 2013 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO top_hits and reciprocal_best_hits."""
+
+import os
+import unittest
+from StringIO import StringIO
+
+from Bio.SearchIO import parse, index, top_hits, reciprocal_best_hits
+
+# test case files are in the Blast directory
+TEST_DIR = 'Blast'
+
+FIELDS = ['qseqid', 'sseqid', 'evalue', 'bitscore']
+
+# forward search, proteome A against proteome B
+A_VS_B = """\
+a1\tb1\t1e-50\t200
+a1\tb2\t1e-20\t90
+a2\tb2\t1e-10\t50
+a2\tb2\t1e-30\t120
+a2\tb1\t1e-40\t110
+a3\tb3\t1e-40\t150
+a4\tb4\t1e-40\t150
+"""
+
+# reverse search, proteome B against proteome A
+B_VS_A = """\
+b1\ta2\t1e-40\t110
+b1\ta1\t1e-50\t200
+b2\ta2\t1e-30\t120
+b3\ta4\t1e-40\t160
+b3\ta3\t1e-40\t150
+b5\ta4\t1e-40\t150
+"""
+
+
+def tab_parse(text):
+    """Returns a parse iterator of the given BLAST tabular text."""
+    return parse(StringIO(text), 'blast-tab', fields=FIELDS)
+
+
+class TopHitsCases(unittest.TestCase):
+
+    def test_top_hits(self):
+        "Test top_hits keeping the best hits of each query"
+        tab_file = os.path.join(TEST_DIR, 'mirna.tab')
+        expected = [qresult.sort(key=lambda hit: max(hsp.bitscore for hsp
+                in hit.hsps), reverse=True, in_place=False)[:5]
+                for qresult in parse(tab_file, 'blast-tab', comments=True)]
+        qresults = list(top_hits(parse(tab_file, 'blast-tab', comments=True),
+            5))
+        self.assertEqual(3, len(qresults))
+        for exp, qresult in zip(expected, qresults):
+            self.assertEqual(exp.id, qresult.id)
+            self.assertEqual(exp.program, qresult.program)
+            self.assertEqual(exp.hit_keys, qresult.hit_keys)
+
+    def test_top_hits_default(self):
+        "Test top_hits keeping the best hit by default"
+        qresults = list(top_hits(tab_parse(A_VS_B)))
+        self.assertEqual(['a1', 'a2', 'a3', 'a4'],
+                [qresult.id for qresult in qresults])
+        self.assertEqual([['b1'], ['b2'], ['b3'], ['b4']],
+                [qresult.hit_keys for qresult in qresults])
+        # all the HSPs of the hit are kept
+        self.assertEqual(2, len(qresults[1]['b2']))
+
+    def test_top_hits_key(self):
+        "Test top_hits with a key function"
+        evalue = lambda hit: -min(hsp.evalue for hsp in hit.hsps)
+        qresults = list(top_hits(tab_parse(A_VS_B), 2, evalue))
+        self.assertEqual([['b1', 'b2'], ['b1', 'b2'], ['b3'], ['b4']],
+                [qresult.hit_keys for qresult in qresults])
+
+    def test_top_hits_score(self):
+        "Test top_hits on a format without bitscores"
+        psl_file = os.path.join('Blat', 'psl_34_001.psl')
+        expected = [qresult.sort(key=lambda hit: max(hsp.score for hsp
+                in hit.hsps), reverse=True, in_place=False)[:1]
+                for qresult in parse(psl_file, 'blat-psl')]
+        qresults = list(top_hits(parse(psl_file, 'blat-psl')))
+        self.assertEqual(2, len(qresults))
+        for exp, qresult in zip(expected, qresults):
+            self.assertEqual(exp.id, qresult.id)
+            self.assertEqual(exp.hit_keys, qresult.hit_keys)
+
+    def test_top_hits_evalue(self):
+        "Test top_hits on tabular output without bitscores"
+        text = "".join(line.rsplit("\t", 1)[0] + "\n"
+                for line in A_VS_B.splitlines())
+        qresults = list(top_hits(parse(StringIO(text), 'blast-tab',
+                fields=FIELDS[:3])))
+        self.assertEqual([['b1'], ['b1'], ['b3'], ['b4']],
+                [qresult.hit_keys for qresult in qresults])
+        text = "".join(line.rsplit("\t", 1)[0] + "\n"
+                for line in text.splitlines())
+        qresults = parse(StringIO(text), 'blast-tab', fields=FIELDS[:2])
+        self.assertRaises(ValueError, top_hits(qresults).next)
+
+    def test_top_hits_bad_n(self):
+        "Test top_hits with a bad number of hits"
+        self.assertRaises(ValueError, top_hits(tab_parse(A_VS_B), 0).next)
+
+
+class ReciprocalBestHitsCases(unittest.TestCase):
+
+    def test_iterables(self):
+        "Test reciprocal_best_hits on two parsed searches"
+        pairs = list(reciprocal_best_hits(tab_parse(A_VS_B),
+            tab_parse(B_VS_A)))
+        self.assertEqual([('a1', 'b1'), ('a2', 'b2')], pairs)
+
+    def test_index(self):
+        "Test reciprocal_best_hits on an indexed reverse search"
+        filename = 'Blast/b_vs_a.tab.tmp'
+        handle = open(filename, 'w')
+        handle.write(B_VS_A)
+        handle.close()
+        try:
+            other = index(filename, 'blast-tab', fields=FIELDS)
+            pairs = list(reciprocal_best_hits(tab_parse(A_VS_B), other))
+            self.assertEqual([('a1', 'b1'), ('a2', 'b2')], pairs)
+            other.close()
+        finally:
+            os.remove(filename)
+
+    def test_dict_key(self):
+        "Test reciprocal_best_hits on a dictionary, with a key function"
+        other = dict((qresult.id, qresult) for qresult in tab_parse(B_VS_A))
+        evalue = lambda hit: -min(hsp.evalue for hsp in hit.hsps)
+        pairs = list(reciprocal_best_hits(tab_parse(A_VS_B), other, evalue))
+        # a2 now has b1 as its best hit, which is not reciprocal
+        self.assertEqual([('a1', 'b1')], pairs)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
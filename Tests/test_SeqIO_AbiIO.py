@@ -8,6 +8,7 @@ import unittest
 from os.path import join, basename
 
 from Bio import SeqIO
+from Bio.SeqIO.AbiIO import _abi_base_calls
 from Bio._py3k import _as_bytes
 
 test_data = {
@@ -123,6 +124,51 @@ class TestAbi(unittest.TestCase):
             else:
                 self.assertEqual(str(record.seq), test_data[trace]['seq'])
 
+    def test_raw_tags(self):
+        """Test the lazily decoded raw tags."""
+        for trace in test_data:
+            record = SeqIO.read(test_data[trace]['handle'], 'abi')
+            raw = record.annotations['abif_raw']
+            self.assertTrue('DATA9' in raw)
+            self.assertEqual(len(raw['DATA9']), len(raw['DATA12']))
+            self.assertEqual(test_data[trace]['seq'], raw['PBAS2'])
+            self.assertEqual(test_data[trace]['sample'], raw['SMPL1'])
+            self.assertEqual(None, raw.get('XXXX1'))
+
+    def test_base_calls(self):
+        """Test the fast base calls only path."""
+        for trace in test_data:
+            sample, seq, qual = _abi_base_calls(test_data[trace]['handle'])
+            self.assertEqual(test_data[trace]['sample'], sample)
+            self.assertEqual(test_data[trace]['seq'], seq)
+            self.assertEqual(test_data[trace]['qual'],
+                             [ord(val) for val in qual])
+            record = SeqIO.read(test_data[trace]['handle'], 'abi-trim')
+            sample, seq, qual = _abi_base_calls(test_data[trace]['handle'],
+                                                trim=True)
+            self.assertEqual(str(record.seq), seq)
+
+    def test_base_calls_reads(self):
+        """Test the fast path only reads the tags it needs."""
+        class CountingHandle(object):
+            def __init__(self, handle):
+                self.handle = handle
+                self.count = 0
+
+            def seek(self, *args):
+                self.handle.seek(*args)
+
+            def read(self, *args):
+                data = self.handle.read(*args)
+                self.count += len(data)
+                return data
+
+        handle = CountingHandle(test_data['data_3730']['handle'])
+        sample, seq, qual = _abi_base_calls(handle)
+        self.assertEqual(test_data['data_3730']['seq'], seq)
+        count = handle.count
+        handle.seek(0)
+        self.assertTrue(count < len(handle.read()) // 10)
 
 class TestAbiWrongMode(unittest.TestCase):
 
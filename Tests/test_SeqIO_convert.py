@@ -181,6 +181,15 @@ tests = [
     ("EMBL/TRBG361.embl", "embl", None),
     ("GenBank/NC_005816.gb", "gb", None),
     ("GenBank/cor6_6.gb", "genbank", None),
+    ("Roche/E3MFGYR02_random_10_reads.sff", "sff", None),
+    ("Roche/E3MFGYR02_random_10_reads.sff", "sff-trim", None),
+    ("Roche/E3MFGYR02_index_in_middle.sff", "sff", generic_dna),
+    ("Roche/greek.sff", "sff", None),
+    ("Roche/paired.sff", "sff-trim", None),
+    ("Abi/3730.ab1", "abi", None),
+    ("Abi/3100.ab1", "abi-trim", None),
+    ("Abi/310.ab1", "abi", generic_dna),
+    ("Abi/empty.ab1", "abi-trim", None),
     ]
 for filename, format, alphabet in tests:
     for (in_format, out_format) in converter_dict:
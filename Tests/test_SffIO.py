@@ -1,6 +1,10 @@
 import re
 import unittest
+from io import BytesIO
+
 from Bio import SeqIO
+from Bio.SeqIO.SffIO import SffWriter, AddRocheIndex, _sff_read_roche_index
+from Bio.SeqIO.SffIO import _sff_iterate, _sff_read_seq_qual
 
 # sffinfo E3MFGYR02_random_10_reads.sff | sed -n '/>\|Run Prefix\|Region\|XY/p'
 test_data = """
@@ -77,5 +81,46 @@ class TestUAN(unittest.TestCase):
         for record in self.records:
             self.assertEqual(record.annotations["coords"], self.test_annotations[record.name]["coords"])
 
+
+class TestFastIteration(unittest.TestCase):
+    def check(self, filename, format, trim):
+        records = list(SeqIO.parse(filename, format))
+        handle = open(filename, "rb")
+        fast = list(_sff_iterate(handle, _sff_read_seq_qual, trim))
+        handle.close()
+        self.assertEqual(len(records), len(fast))
+        for record, (name, seq, qual) in zip(records, fast):
+            self.assertEqual(record.id, name)
+            self.assertEqual(str(record.seq), seq)
+            self.assertEqual(record.letter_annotations["phred_quality"],
+                             [ord(val) for val in qual])
+
+    def test_untrimmed(self):
+        self.check("Roche/E3MFGYR02_index_in_middle.sff", "sff", False)
+
+    def test_trimmed(self):
+        self.check("Roche/paired.sff", "sff-trim", True)
+
+
+class TestAddRocheIndex(unittest.TestCase):
+    def test_add_index(self):
+        filename = "Roche/E3MFGYR02_random_10_reads.sff"
+        records = list(SeqIO.parse(filename, "sff"))
+        handle = BytesIO()
+        SffWriter(handle, index=False).write_file(records)
+        self.assertRaises(ValueError, list, _sff_read_roche_index(handle))
+        self.assertEqual(10, AddRocheIndex(handle))
+        index = sorted(_sff_read_roche_index(handle))
+        self.assertEqual(sorted(r.id for r in records),
+                         [name for name, offset in index])
+        for name, offset in index:
+            handle.seek(offset)
+            self.assertEqual(name, handle.read(16 + len(name))[16:])
+        handle.seek(0)
+        self.assertEqual([r.id for r in records],
+                         [r.id for r in SeqIO.parse(handle, "sff")])
+        #Can't add a second index
+        self.assertRaises(ValueError, AddRocheIndex, handle)
+
 if __name__ == '__main__':
     unittest.main()
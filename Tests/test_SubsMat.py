@@ -87,3 +87,23 @@ except ImportError:
     #test into two, and have one raise MissingExternalDependencyError cheat:
     f.write("BLOSUM30 & BLOSUM90 0.88\n")
     f.write("BLOSUM90 & BLOSUM30 0.88\n")
+
+#Check the NumPy array representation of a matrix
+import numpy
+acc_rep_array = acc_rep_mat.to_array()
+assert acc_rep_array.shape == (20, 20)
+assert (acc_rep_array == acc_rep_array.T).all()
+assert SubsMat.AcceptedReplacementsMatrix(acc_rep_array,
+                                          acc_rep_mat.alphabet) == acc_rep_mat
+#Making several log-odds matrices at once should match one at a time
+stack = numpy.array([acc_rep_array, acc_rep_array + 1, acc_rep_array * 2])
+lo_arrays = SubsMat.make_log_odds_arrays(stack, round_digit=1)
+assert lo_arrays.shape == (3, 20, 20)
+for acc_rep, lo_array in zip(stack, lo_arrays):
+    lo_mat = SubsMat.make_log_odds_matrix(
+        SubsMat.AcceptedReplacementsMatrix(acc_rep, acc_rep_mat.alphabet),
+        round_digit=1)
+    assert (lo_mat.to_array() == lo_array).all()
+assert (lo_arrays[0] == lo_arrays[2]).all()
+assert lo_mat_prot == SubsMat.LogOddsMatrix(lo_arrays[0],
+                                            acc_rep_mat.alphabet)
@@ -4,6 +4,10 @@
 import os
 import unittest
 
+from StringIO import StringIO
+
+from Bio._py3k import _as_bytes
+
 from Bio import SeqIO
 from Bio import SwissProt
 from Bio.SeqRecord import SeqRecord
@@ -1614,6 +1618,70 @@ class TestSwissProt(unittest.TestCase):
         self.assertEqual(records[0].entry_name, record.entry_name)
         self.assertEqual(records[0].accessions, record.accessions)
 
+    def test_line_types(self):
+        "Parsing SwissProt file multi_ex.txt decoding only some lines"
+        datafile = os.path.join('SwissProt', 'multi_ex.txt')
+        handle = open(datafile)
+        full = list(SwissProt.parse(handle))
+        handle.close()
+
+        handle = open(datafile)
+        records = list(SwissProt.parse(handle, ["AC", "OX", "SQ"]))
+        handle.close()
+
+        self.assertEqual(len(records), len(full))
+        for record, old in zip(records, full):
+            self.assertEqual(record.entry_name, old.entry_name)
+            self.assertEqual(record.sequence_length, old.sequence_length)
+            self.assertEqual(record.accessions, old.accessions)
+            self.assertEqual(record.taxonomy_id, old.taxonomy_id)
+            self.assertEqual(record.seqinfo, old.seqinfo)
+            self.assertEqual(record.sequence, old.sequence)
+            #These were skipped:
+            self.assertEqual(record.description, "")
+            self.assertEqual(record.comments, [])
+            self.assertEqual(record.cross_references, [])
+            self.assertEqual(record.features, [])
+            self.assertEqual(record.references, [])
+
+        #Asking for one reference line type gives all of them
+        handle = open(datafile)
+        records = list(SwissProt.parse(handle, ["RA"]))
+        handle.close()
+        for record, old in zip(records, full):
+            self.assertEqual(record.sequence, "")
+            self.assertEqual(len(record.references), len(old.references))
+            for ref, old_ref in zip(record.references, old.references):
+                self.assertEqual(ref.authors, old_ref.authors)
+                self.assertEqual(ref.title, old_ref.title)
+                self.assertEqual(ref.references, old_ref.references)
+
+        handle = open(os.path.join('SwissProt', 'sp008'))
+        record = SwissProt.read(handle, ["DE"])
+        handle.close()
+        self.assertEqual(record.entry_name, "1A02_HUMAN")
+        self.assertTrue(record.description)
+        self.assertEqual(record.sequence, "")
+
+    def test_parse_raw(self):
+        "Splitting SwissProt file multi_ex.txt into raw records"
+        datafile = os.path.join('SwissProt', 'multi_ex.txt')
+        handle = open(datafile)
+        raw_records = list(SwissProt.parse_raw(handle))
+        handle.close()
+
+        handle = open(datafile)
+        self.assertEqual("".join(raw_records), handle.read())
+        handle.close()
+
+        index = SeqIO.index(datafile, "swiss")
+        self.assertEqual(len(raw_records), len(index))
+        for raw in raw_records:
+            record = SwissProt.read(StringIO(raw))
+            self.assertEqual(_as_bytes(raw),
+                             index.get_raw(record.accessions[0]))
+        index.close()
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
@@ -5,6 +5,7 @@ from __future__ import with_statement
 
 import os
 import unittest
+from StringIO import StringIO
 
 from Bio import SeqIO
 from Bio.SeqRecord import SeqRecord
@@ -344,6 +345,42 @@ class TestUniprot(unittest.TestCase):
         txt_index.close()
         xml_index.close()
 
+    def test_multi_ex_skip_tags(self):
+        """Parse uniprot XML skipping comments, references and features."""
+        xml_list = list(SeqIO.parse("SwissProt/multi_ex.xml", "uniprot-xml"))
+        with open("SwissProt/multi_ex.xml") as handle:
+            skip_list = list(SeqIO.UniprotIO.UniprotIterator(
+                handle, skip_tags=["comment", "reference", "feature"]))
+        self.assertEqual(len(xml_list), len(skip_list))
+        for xml, skip in zip(xml_list, skip_list):
+            self.assertEqual(xml.id, skip.id)
+            self.assertEqual(str(xml.seq), str(skip.seq))
+            self.assertEqual(xml.annotations["organism"],
+                             skip.annotations["organism"])
+            self.assertEqual(xml.annotations["taxonomy"],
+                             skip.annotations["taxonomy"])
+            self.assertEqual([], skip.features)
+            self.assertFalse("references" in skip.annotations)
+            self.assertFalse("comment_function" in skip.annotations)
+
+    def test_entry_root(self):
+        """Parse uniprot XML with an entry as the root element."""
+        with open("SwissProt/Q13639.xml") as handle:
+            data = handle.read()
+        old = SeqIO.read(StringIO(data), "uniprot-xml")
+        # drop the <uniprot> element, moving its namespace to the entry
+        start = data.index("<entry ")
+        end = data.index("</entry>") + len("</entry>")
+        data = '<entry xmlns="http://uniprot.org/uniprot"' + \
+            data[start + len("<entry"):end]
+        new = SeqIO.read(StringIO(data), "uniprot-xml")
+        compare_record(old, new)
+        skip = list(SeqIO.UniprotIO.UniprotIterator(StringIO(data),
+                                                    skip_tags=["feature"]))
+        self.assertEqual(1, len(skip))
+        self.assertEqual(old.id, skip[0].id)
+        self.assertEqual([], skip[0].features)
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
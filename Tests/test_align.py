@@ -129,6 +129,29 @@ print 'Column 7:', align_info.get_column(7)
 print 'IC for column 7: %0.2f' % align_info.ic_vector[7]
 print 'test print_info_content'
 AlignInfo.print_info_content(align_info)
+
+#The PSSM uses the sequence weights, the consensus does not
+weighted = MultipleSeqAlignment([SeqRecord(Seq("GTATC"), id="one"),
+                                 SeqRecord(Seq("AT--C"), id="two"),
+                                 SeqRecord(Seq("CTGTC"), id="three")])
+weighted[0].annotations["weight"] = 0.5
+weighted[1].annotations["weight"] = 0.8
+weighted_info = AlignInfo.SummaryInfo(weighted)
+pssm = weighted_info.pos_specific_score_matrix(chars_to_ignore=['-'])
+assert pssm[0] == {'A': 0.8, 'C': 1.0, 'G': 0.5, 'T': 0}
+assert pssm[3] == {'A': 0, 'C': 0, 'G': 0, 'T': 1.5}
+assert str(weighted_info.dumb_consensus(threshold=0.6)) == "XTXTC"
+assert str(weighted_info.gap_consensus(threshold=0.6)) == "XTXTC"
+assert str(weighted_info.gap_consensus(threshold=0.3)) == "XTXTC"
+rep_dict = weighted_info.replacement_dictionary(['-'])
+assert abs(rep_dict[('G', 'A')] - 0.4) < 1e-9
+assert abs(rep_dict[('G', 'C')] - 0.5) < 1e-9
+assert abs(rep_dict[('A', 'C')] - 0.8) < 1e-9
+assert abs(rep_dict[('A', 'G')] - 0.5) < 1e-9
+assert abs(rep_dict[('T', 'T')] - 2.2) < 1e-9
+assert rep_dict[('C', 'A')] == 0
+del weighted, weighted_info, pssm, rep_dict
+
 print "testing reading and writing fasta format..."
 
 to_parse = os.path.join(os.curdir, 'Quality', 'example.fasta')
@@ -329,6 +329,40 @@ ATAT
   Score=3
 """)
 
+    def test_match_dictionary_missing(self):
+        self.assertRaises(KeyError, pairwise2.align.globalds,
+                          "ATAG", "ATT", self.match_dict, -1, 0)
+        self.assertRaises(KeyError, pairwise2.align.globalds,
+                          "ATAG", "ATT", self.match_dict, -1, 0,
+                          score_only=True)
+
+
+class TestPairwiseMatrixMatch(unittest.TestCase):
+    """Check the compiled matrix_match against dictionary_match."""
+
+    seq1 = "KEVLAHHWQERTYPLMNDCKEVL"
+    seq2 = "EVLWQRTYPMNDCAKHEV"
+
+    def test_matrix_match(self):
+        from Bio.SubsMat.MatrixInfo import blosum62
+        match_fn = pairwise2.matrix_match(blosum62)
+        self.assertEqual(match_fn.table[ord("W")][ord("C")],
+                         blosum62[("W", "C")])
+        self.assertEqual(match_fn.table[ord("C")][ord("W")],
+                         blosum62[("W", "C")])
+        self.assertEqual(match_fn.table[ord("C")][ord("J")], None)
+        self.assertEqual(match_fn("C", "W"), blosum62[("W", "C")])
+        dict_fn = pairwise2.dictionary_match(blosum62)
+        for function, callback in (
+                (pairwise2.align.globalds, pairwise2.align.globalcs),
+                (pairwise2.align.localds, pairwise2.align.localcs)):
+            self.assertEqual(function(self.seq1, self.seq2, blosum62, -10, -1),
+                             callback(self.seq1, self.seq2, dict_fn, -10, -1))
+            self.assertEqual(function(self.seq1, self.seq2, blosum62, -10, -1,
+                                      score_only=True),
+                             callback(self.seq1, self.seq2, dict_fn, -10, -1,
+                                      score_only=True))
+
 
 class TestPairwiseOneCharacter(unittest.TestCase):
 
@@ -429,6 +463,136 @@ AAAABBBAAAACCCCCCCCCCCCCCAAAABBBAAAA
 """)
 
 
+class TestPairwiseLinearSpace(unittest.TestCase):
+    """Check the score only and linear space (Hirschberg) code paths."""
+
+    seq1 = "GAACTGGTACCATTGACCGTTAGCGA"
+    seq2 = "GACTTGGAACCATGACGTTAGGCA"
+
+    def test_score_only(self):
+        for penalize_end_gaps in (0, 1):
+            for function in (pairwise2.align.globalms,
+                             pairwise2.align.localms):
+                args = (self.seq1, self.seq2, 2, -1, -2, -0.5)
+                keywds = {"penalize_end_gaps": penalize_end_gaps}
+                best = max([a[2] for a in function(*args, **keywds)])
+                score = function(score_only=1, *args, **keywds)
+                generic = function(score_only=1, force_generic=1,
+                                   *args, **keywds)
+                self.assertAlmostEqual(score, best)
+                self.assertAlmostEqual(score, generic)
+
+    def test_linear_space_simple(self):
+        aligns = pairwise2.align.globalxx("GAACT", "GAT")
+        linear = pairwise2.align.globalxx("GAACT", "GAT", linear_space=1)
+        self.assertEqual(len(linear), 1)
+        self.assertTrue(linear[0] in aligns)
+
+    def test_linear_space(self):
+        for penalize_end_gaps in (0, 1):
+            for pe in (0, 1):
+                args = (self.seq1, self.seq2, 2, -1, -3, -0.5, -2, -1)
+                keywds = {"penalize_end_gaps": penalize_end_gaps,
+                          "penalize_extend_when_opening": pe}
+                best = pairwise2.align.globalmd(*args, **keywds)[0][2]
+                linear = pairwise2.align.globalmd(linear_space=1,
+                                                  *args, **keywds)
+                self.assertEqual(len(linear), 1)
+                seqA, seqB, score, begin, end = linear[0]
+                self.assertAlmostEqual(score, best)
+                self.assertEqual(seqA.replace("-", ""), self.seq1)
+                self.assertEqual(seqB.replace("-", ""), self.seq2)
+                self.assertEqual((begin, end), (0, len(seqA)))
+
+    def test_linear_space_local(self):
+        self.assertRaises(ValueError, pairwise2.align.localxx,
+                          self.seq1, self.seq2, linear_space=1)
+
+
+class TestPairwiseBanded(unittest.TestCase):
+    """Check the banded and x-drop alignments."""
+
+    seq1 = "GAACTGGTACCATTGACCGTTAGCGA"
+    seq2 = "GACTTGGAACCATGACGTTAGGCA"
+
+    def test_wide_band(self):
+        # With enough room, the results are the same as without a band
+        for function in (pairwise2.align.globalms, pairwise2.align.localms):
+            args = (self.seq1, self.seq2, 2, -1, -2, -0.5)
+            aligns = function(*args)
+            for keywds in ({"band": 10}, {"xdrop": 100},
+                           {"band": 10, "xdrop": 100}):
+                self.assertEqual(sorted(function(*args, **keywds)),
+                                 sorted(aligns))
+                self.assertAlmostEqual(function(score_only=1,
+                                                *args, **keywds),
+                                       aligns[0][2])
+
+    def test_narrow_band(self):
+        aligns = pairwise2.align.globalxx("GAACT", "GAT")
+        banded = pairwise2.align.globalxx("GAACT", "GAT", band=0)
+        self.assertTrue(banded)
+        for seqA, seqB, score, begin, end in banded:
+            self.assertTrue((seqA, seqB, score, begin, end) in aligns)
+            # Only gaps within the length difference of two
+            self.assertTrue(seqB.index("T") >= 3)
+        self.assertEqual(pairwise2.align.globalxx("ACGT", "TACG", band=0,
+                                                  score_only=1), 0)
+        self.assertEqual(pairwise2.align.globalxx("ACGT", "TACG", band=1,
+                                                  score_only=1), 3)
+
+    def test_xdrop(self):
+        # The alignment of the matching ends has to cross a region
+        # scoring 10 below the best seen.
+        seq1 = "ACGTACGT" + "A" * 10 + "GGCC"
+        seq2 = "ACGTACGT" + "C" * 10 + "GGCC"
+        args = (seq1, seq2, 1, -1, -5, -5)
+        self.assertEqual(pairwise2.align.globalms(score_only=1, *args), 2)
+        self.assertEqual(pairwise2.align.globalms(xdrop=20, *args),
+                         pairwise2.align.globalms(*args))
+        self.assertEqual(pairwise2.align.globalms(xdrop=5, *args), [])
+        aligns = pairwise2.align.localms(xdrop=5, *args)
+        self.assertEqual([a[2] for a in aligns], [8])
+
+    def test_band_errors(self):
+        self.assertRaises(ValueError, pairwise2.align.globalxx,
+                          self.seq1, self.seq2, band=2, linear_space=1)
+        self.assertRaises(ValueError, pairwise2.align.globalxx,
+                          self.seq1, self.seq2, band=2, force_generic=1)
+
+
+class TestPairwiseBatch(unittest.TestCase):
+    """Check align_many and align_all match aligning pair by pair."""
+
+    seqs = ["GAACTGGTACCATTGACC", "GACTTGGAACCATGACG", "TTGACCGTTAG",
+            "GAACT", "CCATTGACCGTT"]
+
+    def test_align_many(self):
+        expected = [pairwise2.align.globalms(self.seqs[0], s, 2, -1, -2, -0.5)
+                    for s in self.seqs]
+        results = pairwise2.align_many(self.seqs[0], iter(self.seqs),
+                                       "globalms", 2, -1, -2, -0.5)
+        self.assertEqual(list(results), expected)
+        results = pairwise2.align_many(self.seqs[0], self.seqs,
+                                       pairwise2.align.globalms,
+                                       2, -1, -2, -0.5, processes=2,
+                                       chunksize=2)
+        self.assertEqual(list(results), expected)
+
+    def test_align_all(self):
+        expected = []
+        for i in range(len(self.seqs)):
+            for j in range(i+1, len(self.seqs)):
+                score = pairwise2.align.localxs(self.seqs[i], self.seqs[j],
+                                                -1, -0.5, score_only=True)
+                expected.append((i, j, score))
+        for processes in (1, 2):
+            results = pairwise2.align_all(self.seqs, "localxs", -1, -0.5,
+                                          score_only=True,
+                                          processes=processes)
+            self.assertEqual(list(results), expected)
+
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)